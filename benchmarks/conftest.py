@@ -0,0 +1,175 @@
+"""Benchmark fixture for offline performance tests of viser's hot paths.
+
+The `benchmark` fixture mirrors the basic API of `pytest-benchmark`, but has no
+dependencies and also measures peak memory. Run with:
+
+    pytest benchmarks --bench-json results.json
+    pytest benchmarks --bench-compare results.json
+
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    name: str
+    rounds: int
+    mean_sec: float
+    median_sec: float
+    min_sec: float
+    stddev_sec: float
+    peak_memory_bytes: int
+    """Peak memory allocated during a single call, as traced by tracemalloc."""
+    extra_info: Dict[str, Any]
+
+
+class Benchmark:
+    """Times a function over many rounds, and measures its peak memory."""
+
+    def __init__(self, name: str, min_time_sec: float, min_rounds: int) -> None:
+        self.name = name
+        self.extra_info: Dict[str, Any] = {}
+        self.result: Optional[BenchmarkResult] = None
+        self._min_time_sec = min_time_sec
+        self._min_rounds = min_rounds
+
+    def __call__(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Benchmark `fn(*args, **kwargs)`, and return its result."""
+        return self.pedantic(fn, args=args, kwargs=kwargs)
+
+    def pedantic(
+        self,
+        fn: Callable[..., Any],
+        *,
+        args: Tuple[Any, ...] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        setup: Optional[Callable[[], Optional[Tuple[Tuple, Dict]]]] = None,
+        rounds: Optional[int] = None,
+        max_rounds: int = 10_000,
+    ) -> Any:
+        """Benchmark with an optional untimed `setup()` before each round, which
+        can return `(args, kwargs)` for the round."""
+
+        def prepare() -> Tuple[Tuple, Dict]:
+            if setup is not None:
+                out = setup()
+                if out is not None:
+                    return out
+            return args, kwargs or {}
+
+        # Measure memory in a separate call, since tracing slows down
+        # allocations.
+        call_args, call_kwargs = prepare()
+        tracemalloc.start()
+        try:
+            out = fn(*call_args, **call_kwargs)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        times: List[float] = []
+        total = 0.0
+        while (
+            len(times) < (rounds or self._min_rounds)
+            or (rounds is None and total < self._min_time_sec)
+        ) and len(times) < max_rounds:
+            call_args, call_kwargs = prepare()
+            start = time.perf_counter()
+            fn(*call_args, **call_kwargs)
+            elapsed = time.perf_counter() - start
+            times.append(elapsed)
+            total += elapsed
+
+        self.result = BenchmarkResult(
+            name=self.name,
+            rounds=len(times),
+            mean_sec=statistics.mean(times),
+            median_sec=statistics.median(times),
+            min_sec=min(times),
+            stddev_sec=statistics.stdev(times) if len(times) > 1 else 0.0,
+            peak_memory_bytes=peak_memory,
+            extra_info=self.extra_info,
+        )
+        return out
+
+
+_results: List[BenchmarkResult] = []
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("viser benchmarks")
+    group.addoption("--bench-json", type=Path, help="Write results to a JSON file.")
+    group.addoption(
+        "--bench-compare", type=Path, help="Compare against results from a JSON file."
+    )
+    group.addoption(
+        "--bench-min-time",
+        type=float,
+        default=0.5,
+        help="Minimum time to spend timing each benchmark, in seconds.",
+    )
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Any:
+    min_time_sec = request.config.getoption("--bench-min-time")
+    assert isinstance(min_time_sec, float)
+    bench = Benchmark(request.node.name, min_time_sec=min_time_sec, min_rounds=5)
+    yield bench
+    if bench.result is not None:
+        _results.append(bench.result)
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    if len(_results) == 0:
+        return
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    compare_path = config.getoption("--bench-compare")
+    if compare_path is not None:
+        baseline = {r["name"]: r for r in json.loads(compare_path.read_text())}
+
+    terminalreporter.section("benchmarks")
+    name_width = max(len(r.name) for r in _results)
+    terminalreporter.write_line(
+        f"{'name':<{name_width}}  {'median':>10}  {'min':>10}  {'rounds':>6}"
+        f"  {'peak memory':>12}" + ("  vs. baseline" if baseline else "")
+    )
+    for r in _results:
+        line = (
+            f"{r.name:<{name_width}}  {_format_seconds(r.median_sec):>10}"
+            f"  {_format_seconds(r.min_sec):>10}  {r.rounds:>6}"
+            f"  {r.peak_memory_bytes / 1e6:>9.2f} MB"
+        )
+        if r.name in baseline:
+            time_ratio = r.median_sec / baseline[r.name]["median_sec"]
+            memory_ratio = r.peak_memory_bytes / max(
+                baseline[r.name]["peak_memory_bytes"], 1
+            )
+            line += f"  time x{time_ratio:.2f}, memory x{memory_ratio:.2f}"
+        terminalreporter.write_line(line)
+
+    json_path = config.getoption("--bench-json")
+    if json_path is not None:
+        json_path.write_text(
+            json.dumps([dataclasses.asdict(r) for r in _results], indent=2)
+        )
+        terminalreporter.write_line(f"Wrote results to {json_path}.")
@@ -0,0 +1,140 @@
+"""Benchmarks for `AsyncMessageBuffer` and viser's buffer garbage collection."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+import viser
+import viser._client_autobuild
+from viser import _messages
+from viser.infra._async_message_buffer import AsyncMessageBuffer
+
+
+def _pose_updates(num_messages: int, num_nodes: int) -> List[_messages.Message]:
+    """Position updates that cycle over a set of scene nodes, like an
+    animation loop."""
+    positions = np.random.default_rng(0).normal(size=(num_messages, 3))
+    return [
+        _messages.SetPositionMessage(f"/frames/{i % num_nodes}", tuple(p))  # type: ignore
+        for i, p in enumerate(positions.tolist())
+    ]
+
+
+@pytest.fixture
+def event_loop_for_buffer():
+    event_loop = asyncio.new_event_loop()
+    yield event_loop
+    event_loop.close()
+
+
+@pytest.fixture(scope="module")
+def server():
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+    server = viser.ViserServer(port=8130, verbose=False)
+    yield server
+    server.stop()
+
+
+def test_push_pose_updates(benchmark, event_loop_for_buffer) -> None:
+    """10k position updates for 100 nodes. Most messages are culled."""
+    messages = _pose_updates(10_000, 100)
+
+    def push_all(buffer: AsyncMessageBuffer) -> None:
+        for message in messages:
+            buffer.push(message)
+
+    benchmark.pedantic(
+        push_all,
+        setup=lambda: (
+            (AsyncMessageBuffer(event_loop_for_buffer, persistent_messages=True),),
+            {},
+        ),
+    )
+
+
+def test_push_point_clouds(benchmark, event_loop_for_buffer, server) -> None:
+    """100 point clouds with 10k points each, which are kept in the buffer."""
+    server.scene.reset()
+    rng = np.random.default_rng(0)
+    for i in range(100):
+        server.scene.add_point_cloud(
+            f"/clouds/{i}",
+            points=rng.normal(size=(10_000, 3)).astype(np.float32),
+            colors=(255, 0, 0),
+        )
+    messages = [
+        m
+        for m in server._websock_server._broadcast_buffer.message_from_id.values()
+        if isinstance(m, _messages.PointCloudMessage)
+    ]
+
+    def push_all(buffer: AsyncMessageBuffer) -> None:
+        for message in messages:
+            buffer.push(message)
+
+    benchmark.pedantic(
+        push_all,
+        setup=lambda: (
+            (AsyncMessageBuffer(event_loop_for_buffer, persistent_messages=True),),
+            {},
+        ),
+    )
+
+
+@pytest.mark.parametrize("persistent_messages", [True, False])
+def test_window_generator(
+    benchmark, event_loop_for_buffer, persistent_messages: bool
+) -> None:
+    """Drain 10k buffered messages through the window generator."""
+    messages = _pose_updates(10_000, 10_000)
+
+    def setup():
+        buffer = AsyncMessageBuffer(
+            event_loop_for_buffer,
+            persistent_messages=persistent_messages,
+            window_duration_sec=0.0,
+        )
+        for message in messages:
+            buffer.push(message)
+        return (buffer,), {}
+
+    async def drain(buffer: AsyncMessageBuffer) -> None:
+        window_generator = buffer.window_generator(client_id=0)
+        count = 0
+        while count < len(messages):
+            count += len(await window_generator.__anext__())
+        await window_generator.aclose()
+
+    def run(buffer: AsyncMessageBuffer) -> None:
+        event_loop_for_buffer.run_until_complete(drain(buffer))
+        # Clean up the generator's pending flush task.
+        for task in asyncio.all_tasks(event_loop_for_buffer):
+            task.cancel()
+        event_loop_for_buffer.run_until_complete(asyncio.sleep(0))
+
+    benchmark.pedantic(run, setup=setup)
+
+
+def test_garbage_collector(benchmark, server) -> None:
+    """Garbage collection after removing half of 1000 animated scene nodes."""
+    buffer = server._websock_server._broadcast_buffer
+
+    def setup():
+        server.scene.reset()
+        frames = [server.scene.add_frame(f"/frames/{i}") for i in range(1000)]
+        for step in range(5):
+            for frame in frames:
+                frame.position = (step, 0.0, 0.0)
+        for frame in frames[::2]:
+            frame.remove()
+        benchmark.extra_info["buffered_messages"] = len(buffer.message_from_id)
+        return (), {}
+
+    benchmark.pedantic(
+        lambda: server._run_garbage_collector(force=True), setup=setup, rounds=10
+    )
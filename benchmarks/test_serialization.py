@@ -0,0 +1,143 @@
+"""Benchmarks for message serialization, deserialization, and `StateSerializer`."""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import msgspec
+import numpy as np
+import pytest
+
+import viser
+import viser._client_autobuild
+from viser import _messages
+
+
+@pytest.fixture(scope="module")
+def server():
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+    server = viser.ViserServer(port=8131, verbose=False)
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="module")
+def scene_messages(server) -> Dict[str, _messages.Message]:
+    """One message of each type in a realistic scene."""
+    rng = np.random.default_rng(0)
+    server.scene.reset()
+    frame = server.scene.add_frame("/frame")
+    frame.position = (1.0, 2.0, 3.0)
+    server.scene.add_point_cloud(
+        "/points",
+        points=rng.normal(size=(100_000, 3)).astype(np.float32),
+        colors=rng.integers(0, 255, size=(100_000, 3), dtype=np.uint8),
+    )
+    server.scene.add_mesh_simple(
+        "/mesh",
+        vertices=rng.normal(size=(10_000, 3)).astype(np.float32),
+        faces=rng.integers(0, 10_000, size=(20_000, 3), dtype=np.uint32),
+    )
+    server.scene.add_gaussian_splats(
+        "/splats",
+        centers=rng.normal(size=(10_000, 3)),
+        covariances=np.tile(np.eye(3) * 1e-4, (10_000, 1, 1)),
+        rgbs=rng.uniform(size=(10_000, 3)),
+        opacities=rng.uniform(size=(10_000, 1)),
+    )
+    slider = server.gui.add_slider(
+        "Slider", min=0.0, max=1.0, step=0.01, initial_value=0.0
+    )
+    slider.value = 0.5
+
+    buffer = server._websock_server._broadcast_buffer
+    out: Dict[str, _messages.Message] = {}
+    for message in buffer.message_from_id.values():
+        out.setdefault(type(message).__name__, message)
+    return out
+
+
+@pytest.mark.parametrize(
+    "message_type",
+    [
+        "SetPositionMessage",
+        "GuiUpdateMessage",
+        "FrameMessage",
+        "PointCloudMessage",
+        "MeshMessage",
+        "GaussianSplatsMessage",
+    ],
+)
+def test_as_serializable_dict(benchmark, scene_messages, message_type: str) -> None:
+    benchmark(scene_messages[message_type].as_serializable_dict)
+
+
+def test_encode_window(benchmark, scene_messages) -> None:
+    """Encode a window of 128 messages, as done for each websocket frame."""
+    window = [scene_messages["SetPositionMessage"]] * 127 + [
+        scene_messages["PointCloudMessage"]
+    ]
+    benchmark(
+        lambda: msgspec.msgpack.encode(
+            tuple(message.as_serializable_dict() for message in window)
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        _messages.ViewerCameraMessage(
+            wxyz=(1.0, 0.0, 0.0, 0.0),
+            position=(3.0, 3.0, 3.0),
+            fov=0.8,
+            near=0.01,
+            far=1000.0,
+            aspect=1.5,
+            look_at=(0.0, 0.0, 0.0),
+            up_direction=(0.0, 0.0, 1.0),
+        ),
+        _messages.GuiUpdateMessage("uuid", {"value": 0.5}),
+        _messages.TransformControlsUpdateMessage(
+            "/controls", (1.0, 0.0, 0.0, 0.0), (0.0, 0.0, 1.0)
+        ),
+    ],
+    ids=lambda message: type(message).__name__,
+)
+def test_deserialize(benchmark, message: _messages.Message) -> None:
+    """Deserialize messages sent by clients."""
+    serialized = msgspec.msgpack.encode(message.as_serializable_dict())
+    benchmark(_messages.Message.deserialize, serialized)
+
+
+def test_deserialize_window(benchmark, scene_messages) -> None:
+    """Deserialize a window of messages sent by the server, as done by
+    headless clients."""
+    window = [scene_messages["SetPositionMessage"]] * 127 + [
+        scene_messages["PointCloudMessage"]
+    ]
+    serialized = msgspec.msgpack.encode(
+        tuple(message.as_serializable_dict() for message in window)
+    )
+    benchmark(_messages.Message.deserialize_window, serialized)
+
+
+def test_state_serializer(benchmark, server, scene_messages) -> None:
+    """Save the scene, with 100 animation steps, to a .viser recording."""
+    frame = [
+        m
+        for m in server._websock_server._broadcast_buffer.message_from_id.values()
+        if isinstance(m, _messages.FrameMessage)
+    ][0]
+    del scene_messages
+
+    def save() -> bytes:
+        serializer = server.get_scene_serializer()
+        for step in range(100):
+            server.scene.add_frame(frame.name, position=(step, 0.0, 0.0))
+            serializer.insert_sleep(1.0 / 30.0)
+        return serializer.serialize()
+
+    out = benchmark.pedantic(save, rounds=5)
+    benchmark.extra_info["serialized_bytes"] = len(out)
@@ -22,13 +22,25 @@ from ._gui_handles import GuiUploadButtonHandle as GuiUploadButtonHandle
 from ._gui_handles import GuiVector2Handle as GuiVector2Handle
 from ._gui_handles import GuiVector3Handle as GuiVector3Handle
 from ._gui_handles import UploadedFile as UploadedFile
+from ._headless_client import HeadlessClient as HeadlessClient
+from ._headless_client import HeadlessGuiComponent as HeadlessGuiComponent
+from ._headless_client import HeadlessSceneNode as HeadlessSceneNode
 from ._icons_enum import Icon as Icon
 from ._icons_enum import IconName as IconName
 from ._notification_handle import NotificationHandle as NotificationHandle
+from ._recording_player import RecordingPlayer as RecordingPlayer
+from ._recording_player import load_recording as load_recording
+from ._scene_api import MemoryReport as MemoryReport
 from ._scene_api import SceneApi as SceneApi
 from ._scene_handles import AmbientLightHandle as AmbientLightHandle
 from ._scene_handles import BatchedAxesHandle as BatchedAxesHandle
+from ._scene_handles import (
+    BatchedCameraFrustumHandle as BatchedCameraFrustumHandle,
+)
+from ._scene_handles import BatchedGlbHandle as BatchedGlbHandle
+from ._scene_handles import BatchedMeshHandle as BatchedMeshHandle
 from ._scene_handles import CameraFrustumHandle as CameraFrustumHandle
+from ._scene_handles import DepthImagePointCloudHandle as DepthImagePointCloudHandle
 from ._scene_handles import DirectionalLightHandle as DirectionalLightHandle
 from ._scene_handles import FrameHandle as FrameHandle
 from ._scene_handles import GaussianSplatHandle as GaussianSplatHandle
@@ -51,6 +63,8 @@ from ._scene_handles import ScenePointerEvent as ScenePointerEvent
 from ._scene_handles import SplineCatmullRomHandle as SplineCatmullRomHandle
 from ._scene_handles import SplineCubicBezierHandle as SplineCubicBezierHandle
 from ._scene_handles import SpotLightHandle as SpotLightHandle
+from ._scene_handles import TimelineEvent as TimelineEvent
+from ._scene_handles import TimelineHandle as TimelineHandle
 from ._scene_handles import TransformControlsHandle as TransformControlsHandle
 from ._viser import CameraHandle as CameraHandle
 from ._viser import ClientHandle as ClientHandle
@@ -0,0 +1,270 @@
+"""Load benchmark for viser servers. Exposed as the `viser-bench` command."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import psutil
+import rich
+import tyro
+
+from . import __version__, _messages
+from ._headless_client import HeadlessClient
+from ._viser import ViserServer
+
+_PROBE_NAME = "/bench/probe"
+"""Frame that is moved on every update tick. Its x position is the wall-clock
+time that the update was queued, relative to the start of the benchmark, which
+clients use to measure end-to-end latency."""
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Percentiles of latencies, converted from seconds to milliseconds."""
+    if len(latencies) == 0:
+        return {"count": 0}
+    ms = np.asarray(latencies) * 1000.0
+    return {
+        "count": len(latencies),
+        "mean": float(np.mean(ms)),
+        "p50": float(np.percentile(ms, 50)),
+        "p90": float(np.percentile(ms, 90)),
+        "p99": float(np.percentile(ms, 99)),
+        "max": float(np.max(ms)),
+    }
+
+
+def _run_clients(
+    url: str,
+    num_clients: int,
+    start_time: float,
+    stop_event: Any,
+    result_queue: Any,
+) -> None:
+    """Connect simulated clients, and report what they received. Runs in a
+    separate process, so the server's CPU usage can be measured on its own."""
+
+    async def main() -> List[Dict[str, Any]]:
+        clients = [HeadlessClient(url) for _ in range(num_clients)]
+        latencies: List[List[float]] = [[] for _ in clients]
+        for client, client_latencies in zip(clients, latencies):
+
+            def record(
+                message: _messages.SetPositionMessage,
+                client_latencies: List[float] = client_latencies,
+            ) -> None:
+                if message.name == _PROBE_NAME:
+                    queued_time = start_time + message.position[0]
+                    client_latencies.append(time.time() - queued_time)
+
+            client.register_handler(_messages.SetPositionMessage, record)
+
+        await asyncio.gather(*[client.connect() for client in clients])
+        while not stop_event.is_set():
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*[client.close() for client in clients])
+        return [
+            {
+                "windows_received": client.windows_received,
+                "messages_received": client.messages_received,
+                "bytes_received": client.bytes_received,
+                "latencies": client_latencies,
+            }
+            for client, client_latencies in zip(clients, latencies)
+        ]
+
+    result_queue.put(asyncio.run(main()))
+
+
+def run_benchmark(
+    duration_sec: float = 10.0,
+    clients: int = 4,
+    frames: int = 100,
+    update_rate_hz: float = 30.0,
+    point_clouds: int = 1,
+    points_per_cloud: int = 100_000,
+    point_cloud_rate_hz: float = 0.0,
+    splats: int = 0,
+    gui_elements: int = 10,
+    gui_rate_hz: float = 10.0,
+    port: int = 8300,
+    output: Path = Path("viser_bench.json"),
+) -> Dict[str, Any]:
+    """Benchmark a viser server with a synthetic scene workload and simulated
+    websocket clients. Results are written as JSON to `output`.
+
+    Args:
+        duration_sec: Duration of the benchmark, after all clients connect.
+        clients: Number of simulated websocket clients.
+        frames: Number of coordinate frames, which are all moved on every
+            update tick.
+        update_rate_hz: Rate of frame updates.
+        point_clouds: Number of point clouds.
+        points_per_cloud: Number of points in each point cloud.
+        point_cloud_rate_hz: Rate at which point clouds are regenerated. 0 for
+            static point clouds.
+        splats: Number of Gaussian splats. 0 to disable.
+        gui_elements: Number of GUI sliders.
+        gui_rate_hz: Rate at which all GUI slider values are updated.
+        port: Port for the benchmark server.
+        output: Path to write JSON results to.
+
+    Returns:
+        Benchmark results.
+    """
+    config = {k: v for k, v in locals().items() if k != "output"}
+    rng = np.random.default_rng(0)
+
+    server = ViserServer(port=port, verbose=False)
+    frame_handles = [
+        server.scene.add_frame(f"/bench/frames/{i}", axes_length=0.1)
+        for i in range(frames)
+    ]
+    probe = server.scene.add_frame(_PROBE_NAME, show_axes=False)
+    cloud_handles = [
+        server.scene.add_point_cloud(
+            f"/bench/clouds/{i}",
+            points=rng.normal(size=(points_per_cloud, 3)).astype(np.float32),
+            colors=rng.integers(0, 255, size=(points_per_cloud, 3), dtype=np.uint8),
+        )
+        for i in range(point_clouds)
+    ]
+    if splats > 0:
+        server.scene.add_gaussian_splats(
+            "/bench/splats",
+            centers=rng.normal(size=(splats, 3)),
+            covariances=np.tile(np.eye(3) * 1e-4, (splats, 1, 1)),
+            rgbs=rng.uniform(size=(splats, 3)),
+            opacities=rng.uniform(size=(splats, 1)),
+        )
+    sliders = [
+        server.gui.add_slider(
+            f"Slider {i}", min=0.0, max=1.0, step=0.001, initial_value=0.0
+        )
+        for i in range(gui_elements)
+    ]
+
+    # Connect clients in a separate process.
+    mp_context = multiprocessing.get_context("spawn")
+    stop_event = mp_context.Event()
+    result_queue = mp_context.Queue()
+    start_time = time.time()
+    client_process = mp_context.Process(
+        target=_run_clients,
+        args=(
+            f"ws://localhost:{server.get_port()}",
+            clients,
+            start_time,
+            stop_event,
+            result_queue,
+        ),
+        daemon=True,
+    )
+    client_process.start()
+    while len(server.get_clients()) < clients:
+        assert client_process.is_alive(), "Client process exited early."
+        time.sleep(0.01)
+
+    # Run workloads.
+    process = psutil.Process(os.getpid())
+    stats_before = server.get_stats()
+    cpu_before = process.cpu_times()
+    rss_peak = process.memory_info().rss
+    bench_start = time.perf_counter()
+    next_update = next_cloud = next_gui = bench_start
+    while (now := time.perf_counter()) < bench_start + duration_sec:
+        if now >= next_update:
+            next_update += 1.0 / update_rate_hz
+            positions = rng.normal(size=(frames, 3))
+            with server.atomic():
+                for handle, position in zip(frame_handles, positions):
+                    handle.position = position
+            probe.position = (time.time() - start_time, 0.0, 0.0)
+        if point_cloud_rate_hz > 0.0 and now >= next_cloud:
+            next_cloud += 1.0 / point_cloud_rate_hz
+            for handle in cloud_handles:
+                handle.points = rng.normal(size=(points_per_cloud, 3)).astype(
+                    np.float16
+                )
+        if gui_rate_hz > 0.0 and now >= next_gui:
+            next_gui += 1.0 / gui_rate_hz
+            for slider in sliders:
+                slider.value = float(rng.uniform())
+        rss_peak = max(rss_peak, process.memory_info().rss)
+
+        next_due = [next_update]
+        if point_cloud_rate_hz > 0.0:
+            next_due.append(next_cloud)
+        if gui_rate_hz > 0.0:
+            next_due.append(next_gui)
+        time.sleep(max(min(next_due) - time.perf_counter(), 0.0))
+    elapsed = time.perf_counter() - bench_start
+    cpu_after = process.cpu_times()
+    stats_after = server.get_stats()
+
+    # Collect client results.
+    stop_event.set()
+    client_results: List[Dict[str, Any]] = result_queue.get(timeout=30.0)
+    client_process.join(timeout=10.0)
+    server.stop()
+
+    cpu_seconds = (cpu_after.user + cpu_after.system) - (
+        cpu_before.user + cpu_before.system
+    )
+    results: Dict[str, Any] = {
+        "viser_version": __version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": start_time,
+        "config": config,
+        "elapsed_sec": elapsed,
+        "server": {
+            "cpu_percent": 100.0 * cpu_seconds / elapsed,
+            "rss_bytes_peak": rss_peak,
+            "rss_bytes_end": process.memory_info().rss,
+            "buffered_bytes": stats_after.buffered_bytes,
+            "messages_pushed": stats_after.messages_pushed
+            - stats_before.messages_pushed,
+            "messages_sent": stats_after.total.messages_sent
+            - stats_before.total.messages_sent,
+            "bytes_sent": stats_after.total.bytes_sent - stats_before.total.bytes_sent,
+            "max_event_loop_lag_sec": stats_after.max_event_loop_lag_seconds,
+        },
+        "throughput": {
+            "messages_per_sec": sum(c["messages_received"] for c in client_results)
+            / elapsed,
+            "bytes_per_sec": sum(c["bytes_received"] for c in client_results) / elapsed,
+        },
+        "latency_ms": _latency_summary(
+            [x for c in client_results for x in c["latencies"]]
+        ),
+        "clients": [
+            {
+                "windows_received": c["windows_received"],
+                "messages_received": c["messages_received"],
+                "bytes_received": c["bytes_received"],
+                "latency_ms": _latency_summary(c["latencies"]),
+            }
+            for c in client_results
+        ],
+    }
+
+    output.write_text(json.dumps(results, indent=2))
+    latency = results["latency_ms"]
+    rich.print(
+        f"[bold](viser)[/bold] {results['throughput']['messages_per_sec']:.0f}"
+        f" messages/s, latency p50={latency.get('p50', float('nan')):.1f} ms"
+        f" p99={latency.get('p99', float('nan')):.1f} ms, server CPU"
+        f" {results['server']['cpu_percent']:.0f}%. Wrote results to {output}."
+    )
+    return results
+
+
+bench_entrypoint = lambda: tyro.cli(run_benchmark)
@@ -282,7 +282,9 @@ class GuiApi:
                 assert False
 
             if asyncio.iscoroutinefunction(cb):
-                await cb(GuiEvent(client, client_id, handle))
+                await self._websock_interface._callback_monitor.run(
+                    cb, GuiEvent(client, client_id, handle)
+                )
             else:
                 self._thread_executor.submit(
                     cb, GuiEvent(client, client_id, handle)
@@ -369,7 +371,11 @@ class GuiApi:
                 assert False
 
             if asyncio.iscoroutinefunction(cb):
-                self._event_loop.create_task(cb(GuiEvent(client, client_id, handle)))
+                self._event_loop.create_task(
+                    self._websock_interface._callback_monitor.run(
+                        cb, GuiEvent(client, client_id, handle)
+                    )
+                )
             else:
                 self._thread_executor.submit(
                     cb, GuiEvent(client, client_id, handle)
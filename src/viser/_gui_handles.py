@@ -238,7 +238,10 @@ class _GuiInputHandle(
             # reduces the likelihood of many common race conditions.
             cb_out = cb(GuiEvent(client_id=None, client=None, target=self))
             if isinstance(cb_out, Coroutine):
-                self._impl.gui_api._event_loop.create_task(cb_out)
+                gui_api = self._impl.gui_api
+                gui_api._event_loop.create_task(
+                    gui_api._websock_interface._callback_monitor.timed(cb, cb_out)
+                )
 
     @property
     def update_timestamp(self) -> float:
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from . import _messages, infra
+from . import transforms as tf
+
+
+@dataclasses.dataclass
+class HeadlessSceneNode:
+    """Mirrored state of a scene node, as seen by a :class:`HeadlessClient`."""
+
+    message_type: str
+    """Type of the message that created the node, like `"FrameMessage"`."""
+    props: Dict[str, Any]
+    """Properties of the node, with any updates applied. Arrays are kept as
+    raw bytes."""
+    wxyz: Tuple[float, float, float, float] = (1.0, 0.0, 0.0, 0.0)
+    position: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    visible: bool = True
+
+
+@dataclasses.dataclass
+class HeadlessGuiComponent:
+    """Mirrored state of a GUI component, as seen by a :class:`HeadlessClient`."""
+
+    message_type: str
+    """Type of the message that created the component, like
+    `"GuiSliderMessage"`."""
+    value: Any
+    """Value of the component. None for components without values."""
+    props: Dict[str, Any]
+    """Properties of the component, with any updates applied."""
+
+
+class HeadlessClient(infra.WebsockClient):
+    """Headless client for a :class:`ViserServer`, which can be used for load
+    tests and end-to-end tests without a browser. Clients run on an asyncio
+    event loop, and many can be connected from the same process.
+
+    The server considers a client to be connected once it has sent a camera
+    message, which :meth:`connect()` does automatically.
+
+    .. code-block:: python
+
+        async with viser.HeadlessClient("ws://localhost:8080") as client:
+            await client.wait_until(lambda: "/frame" in client.scene_nodes)
+            await client.update_gui(client.find_gui("Slider"), 5.0)
+
+    Args:
+        url: Websocket URL of the server.
+    """
+
+    def __init__(self, url: str = "ws://localhost:8080") -> None:
+        super().__init__(url, message_class=_messages.Message, client_api_version=1)
+        self.scene_nodes: Dict[str, HeadlessSceneNode] = {}
+        """Mirrored scene nodes, keyed by name."""
+        self.gui: Dict[str, HeadlessGuiComponent] = {}
+        """Mirrored GUI components, keyed by UUID."""
+
+    async def connect(self) -> None:
+        """Connect to the server, and send an initial camera message."""
+        await super().connect()
+        await self.send_camera()
+
+    async def send_camera(
+        self,
+        position: Tuple[float, float, float] = (3.0, 3.0, 3.0),
+        look_at: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+        up_direction: Tuple[float, float, float] = (0.0, 0.0, 1.0),
+        fov: float = np.pi / 180.0 * 50.0,
+        aspect: float = 16.0 / 9.0,
+        near: float = 0.01,
+        far: float = 1000.0,
+    ) -> None:
+        """Send a camera pose to the server, as if the user moved the camera.
+
+        Args:
+            position: Camera position, in world coordinates.
+            look_at: Point that the camera looks at.
+            up_direction: Up direction of the camera.
+            fov: Vertical field of view, in radians.
+            aspect: Aspect ratio of the viewport.
+            near: Near clipping plane.
+            far: Far clipping plane.
+        """
+        # Orientation in the OpenCV convention: +Z forward, +Y down.
+        forward = np.asarray(look_at) - np.asarray(position)
+        forward = forward / np.linalg.norm(forward)
+        right = np.cross(forward, np.asarray(up_direction))
+        right = right / np.linalg.norm(right)
+        down = np.cross(forward, right)
+        wxyz = tf.SO3.from_matrix(np.stack([right, down, forward], axis=1)).wxyz
+        await self.send(
+            _messages.ViewerCameraMessage(
+                wxyz=tuple(float(x) for x in wxyz),  # type: ignore
+                position=position,
+                fov=fov,
+                near=near,
+                far=far,
+                aspect=aspect,
+                look_at=look_at,
+                up_direction=up_direction,
+            )
+        )
+
+    async def update_gui(self, uuid: str, value: Any) -> None:
+        """Set the value of a GUI component, as if the user changed it. For
+        buttons, this triggers a click.
+
+        Args:
+            uuid: UUID of the GUI component. See :meth:`find_gui()`.
+            value: New value.
+        """
+        message = _messages.GuiUpdateMessage(uuid, {"value": value})
+        self._mirror(message)
+        await self.send(message)
+
+    async def update_transform_controls(
+        self,
+        name: str,
+        wxyz: Tuple[float, float, float, float],
+        position: Tuple[float, float, float],
+    ) -> None:
+        """Move transform controls, as if the user dragged them.
+
+        Args:
+            name: Name of the transform controls scene node.
+            wxyz: New orientation, relative to the parent frame.
+            position: New position, relative to the parent frame.
+        """
+        await self.send(_messages.TransformControlsUpdateMessage(name, wxyz, position))
+
+    def find_gui(self, label: str) -> str:
+        """Get the UUID of a GUI component from its label.
+
+        Args:
+            label: Label of the GUI component.
+
+        Returns:
+            UUID of the first GUI component with the label.
+        """
+        for uuid, component in self.gui.items():
+            if component.props.get("label", None) == label:
+                return uuid
+        raise KeyError(f"No GUI component with label {label!r}.")
+
+    def _mirror(self, message: infra.Message) -> None:
+        super()._mirror(message)
+        if isinstance(message, _messages._CreateSceneNodeMessage):
+            self.scene_nodes[message.name] = HeadlessSceneNode(
+                type(message).__name__, getattr(message, "props", {})
+            )
+        elif isinstance(message, _messages.RemoveSceneNodeMessage):
+            self.scene_nodes.pop(message.name, None)
+        elif isinstance(message, _messages.SceneNodeUpdateMessage):
+            node = self.scene_nodes.get(message.name, None)
+            if node is not None:
+                node.props = {**node.props, **message.updates}
+        elif isinstance(message, _messages.SetPositionMessage):
+            if message.name in self.scene_nodes:
+                self.scene_nodes[message.name].position = message.position
+        elif isinstance(message, _messages.SetOrientationMessage):
+            if message.name in self.scene_nodes:
+                self.scene_nodes[message.name].wxyz = message.wxyz
+        elif isinstance(message, _messages.SetPosesMessage):
+            poses = np.frombuffer(message.poses, dtype=np.float32).reshape((-1, 7))
+            for name, pose in zip(message.names, poses):
+                if name in self.scene_nodes:
+                    node = self.scene_nodes[name]
+                    node.wxyz = tuple(float(x) for x in pose[:4])  # type: ignore
+                    node.position = tuple(float(x) for x in pose[4:])  # type: ignore
+        elif isinstance(message, _messages.SetSceneNodeVisibilityMessage):
+            if message.name in self.scene_nodes:
+                self.scene_nodes[message.name].visible = message.visible
+        elif isinstance(message, _messages._CreateGuiComponentMessage):
+            self.gui[message.uuid] = HeadlessGuiComponent(
+                type(message).__name__,
+                getattr(message, "value", None),
+                getattr(message, "props", {}),
+            )
+        elif isinstance(message, _messages.GuiRemoveMessage):
+            self.gui.pop(message.uuid, None)
+        elif isinstance(message, _messages.GuiUpdateMessage):
+            component = self.gui.get(message.uuid, None)
+            if component is not None:
+                updates = dict(message.updates)
+                if "value" in updates:
+                    component.value = updates.pop("value")
+                component.props = {**component.props, **updates}
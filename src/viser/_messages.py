@@ -5,7 +5,17 @@ from __future__ import annotations
 
 import dataclasses
 import uuid
-from typing import Any, ClassVar, Dict, Optional, Tuple, Type, TypeVar, Union
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Hashable,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
 import numpy.typing as npt
@@ -66,6 +76,21 @@ class Message(infra.Message):
 
         return "_".join(parts)
 
+    @override
+    def memory_owners(self) -> Tuple[Hashable, ...]:
+        """Returns ("scene", name) for scene node messages and ("gui", uuid) for
+        GUI and notification messages."""
+        node_names = getattr(self, "names", None)
+        if node_names is not None:
+            return tuple(("scene", name) for name in node_names)
+        node_name = getattr(self, "name", None)
+        if node_name is not None:
+            return (("scene", node_name),)
+        gui_uuid = getattr(self, "uuid", None)
+        if gui_uuid is not None:
+            return (("gui", gui_uuid),)
+        return ()
+
     @classmethod
     def __init_subclass__(cls, tag: TagLiteral | None = None):
         """Tag will be used to create a union type in TypeScript."""
@@ -243,6 +268,53 @@ class CameraFrustumProps:
     """Optional image to be displayed on the frustum. Synchronized automatically when assigned."""
 
 
+@dataclasses.dataclass
+class BatchedCameraFrustumsMessage(_CreateSceneNodeMessage):
+    """Batched camera frustums message. Frustums are instanced on the client, and
+    images are read from a single texture atlas.
+
+    OpenCV convention, +Z forward. Positions and orientations should follow a
+    `T_parent_local` convention."""
+
+    props: BatchedCameraFrustumsProps
+
+
+@dataclasses.dataclass
+class BatchedCameraFrustumsProps:
+    batched_wxyzs: npt.NDArray[np.float32]
+    """Float array of shape (N, 4) representing quaternion rotations. Synchronized automatically when assigned."""
+    batched_positions: npt.NDArray[np.float32]
+    """Float array of shape (N, 3) representing positions. Synchronized automatically when assigned."""
+    batched_fovs: npt.NDArray[np.float32]
+    """Vertical field of view of each camera (in radians). Should have shape (N,). Synchronized automatically when assigned."""
+    batched_aspects: npt.NDArray[np.float32]
+    """Aspect ratio of each camera (width over height). Should have shape (N,). Synchronized automatically when assigned."""
+    batched_colors: npt.NDArray[np.uint8]
+    """Color of each frustum. Should have shape (N, 3). Synchronized automatically when assigned."""
+    batched_visible: npt.NDArray[np.bool_]
+    """Visibility of each frustum. Should have shape (N,). Synchronized automatically when assigned."""
+    scale: float
+    """Scale factor for the size of the frustums. Synchronized automatically when assigned."""
+    line_width: float
+    """Width of the frustum lines. Synchronized automatically when assigned."""
+    atlas_media_type: Optional[Literal["image/jpeg", "image/png"]]
+    """Format of the image atlas ('image/jpeg' or 'image/png'). Synchronized automatically when assigned."""
+    _atlas_data: Optional[bytes]
+    """Optional image atlas, containing one thumbnail for each frustum. Synchronized automatically when assigned."""
+    atlas_grid: Tuple[int, int]
+    """Number of (columns, rows) in the image atlas. Thumbnails are stored in row-major order. Synchronized automatically when assigned."""
+
+    def __post_init__(self):
+        # Check shapes.
+        num_frustums = self.batched_wxyzs.shape[0]
+        assert self.batched_wxyzs.shape == (num_frustums, 4)
+        assert self.batched_positions.shape == (num_frustums, 3)
+        assert self.batched_fovs.shape == (num_frustums,)
+        assert self.batched_aspects.shape == (num_frustums,)
+        assert self.batched_colors.shape == (num_frustums, 3)
+        assert self.batched_visible.shape == (num_frustums,)
+
+
 @dataclasses.dataclass
 class GlbMessage(_CreateSceneNodeMessage):
     """GlTF message."""
@@ -397,6 +469,37 @@ class PointCloudProps:
         assert self.colors.dtype == np.uint8
 
 
+@dataclasses.dataclass
+class DepthImagePointCloudMessage(_CreateSceneNodeMessage):
+    """Point cloud message, which is unprojected from a depth image on the client.
+
+    Depth is sent as a 3-channel PNG containing 24-bit fixed-point values, with the
+    same encoding as background image depths. Points are placed in the OpenCV camera
+    frame, with +Z forward. Pixels with zero depth are skipped."""
+
+    props: DepthImagePointCloudProps
+
+
+@dataclasses.dataclass
+class DepthImagePointCloudProps:
+    _depth_data: bytes
+    """PNG-encoded fixed-point depth image. Synchronized automatically when assigned."""
+    rgb_media_type: Literal["image/jpeg", "image/png"]
+    """Format of the color image ('image/jpeg' or 'image/png'). Synchronized automatically when assigned."""
+    _rgb_data: bytes
+    """Binary data of the color image. Synchronized automatically when assigned."""
+    K: Tuple[
+        Tuple[float, float, float],
+        Tuple[float, float, float],
+        Tuple[float, float, float],
+    ]
+    """Camera intrinsics matrix of the color image. Synchronized automatically when assigned."""
+    point_size: float
+    """Size of each point. Synchronized automatically when assigned."""
+    point_ball_norm: float
+    """Norm value determining the shape of each point. Synchronized automatically when assigned."""
+
+
 @dataclasses.dataclass
 class DirectionalLightMessage(_CreateSceneNodeMessage):
     """Directional light message."""
@@ -584,6 +687,30 @@ class MeshProps:
         assert self.faces.shape[-1] == 3
 
 
+@dataclasses.dataclass
+class MeshVerticesMessage(Message):
+    """Server -> client message to update the vertex positions of a mesh, without
+    resending its faces or recreating it. Used for deforming meshes."""
+
+    name: str
+    encoding: Literal["float32", "float16", "delta_int16"]
+    data: bytes
+    """Encoded (V, 3) vertex positions. For `delta_int16`, these are offsets from
+    the previous positions, in units of `delta_scale`."""
+    delta_scale: float
+    delta_index: int
+    """Number of deltas since the last absolute update. Zero for absolute
+    updates."""
+
+    @override
+    def redundancy_key(self) -> str:
+        # Deltas need to be kept until the next absolute update.
+        key = type(self).__name__ + "-" + self.name
+        if self.delta_index > 0:
+            key += "-" + str(self.delta_index)
+        return key
+
+
 @dataclasses.dataclass
 class SkinnedMeshMessage(_CreateSceneNodeMessage):
     """Skinned mesh message."""
@@ -651,6 +778,134 @@ class SetBonePositionMessage(Message):
         return type(self).__name__ + "-" + self.name + "-" + str(self.bone_index)
 
 
+@dataclasses.dataclass
+class SetBonePosesMessage(Message):
+    """Server -> client message to set the poses of all bones in a skinned mesh.
+
+    As with all other messages, transforms take the `T_parent_local` convention."""
+
+    name: str
+    poses: npt.NDArray[np.float32]
+    """Packed (B, 7) array of bone poses. Each row is `(w, x, y, z, x, y, z)`: an
+    orientation followed by a position."""
+
+    def __post_init__(self):
+        assert len(self.poses.shape) == 2 and self.poses.shape[-1] == 7
+        assert self.poses.dtype == np.float32
+
+
+@dataclasses.dataclass
+class SkinnedMeshAnimationMessage(Message):
+    """Server -> client message to upload a bone animation clip for a skinned
+    mesh. The clip is interpolated and played back on the client; an empty clip
+    clears the animation.
+
+    As with all other messages, transforms take the `T_parent_local` convention."""
+
+    name: str
+    timestamps: npt.NDArray[np.float32]
+    """Timestamps of each keyframe in seconds, with shape (T,). Should be
+    increasing."""
+    poses: npt.NDArray[np.float32]
+    """Packed (T, B, 7) array of bone poses. Each pose is `(w, x, y, z, x, y, z)`:
+    an orientation followed by a position."""
+    loop: bool
+
+    def __post_init__(self):
+        assert self.timestamps.shape == (self.poses.shape[0],)
+        assert len(self.poses.shape) == 3 and self.poses.shape[-1] == 7
+        assert self.timestamps.dtype == self.poses.dtype == np.float32
+
+
+@dataclasses.dataclass
+class SkinnedMeshAnimationPlaybackMessage(Message):
+    """Server -> client message to control playback of a skinned mesh animation
+    clip."""
+
+    name: str
+    playing: bool
+    time: float
+    """Clip time to play or pause from, in seconds."""
+    rate: float
+
+
+@dataclasses.dataclass
+class BatchedMeshesMessage(_CreateSceneNodeMessage):
+    """Batched meshes message. A single geometry is instanced once for each
+    transform, scale, and color.
+
+    Positions and orientations should follow a `T_parent_local` convention, which
+    corresponds to the R matrix and t vector in `p_parent = [R | t] p_local`."""
+
+    props: BatchedMeshesProps
+
+
+@dataclasses.dataclass
+class BatchedMeshesProps:
+    vertices: npt.NDArray[np.float32]
+    """A numpy array of vertex positions. Should have shape (V, 3). Synchronized automatically when assigned."""
+    faces: npt.NDArray[np.uint32]
+    """A numpy array of faces, where each face is represented by indices of vertices. Should have shape (F, 3). Synchronized automatically when assigned."""
+    batched_wxyzs: npt.NDArray[np.float32]
+    """Float array of shape (N, 4) representing quaternion rotations. Synchronized automatically when assigned."""
+    batched_positions: npt.NDArray[np.float32]
+    """Float array of shape (N, 3) representing positions. Synchronized automatically when assigned."""
+    batched_scales: npt.NDArray[np.float32]
+    """Float array of shape (N, 3) representing per-axis scales. Synchronized automatically when assigned."""
+    batched_colors: npt.NDArray[np.uint8]
+    """Colors of each instance. Should have shape (N, 3). Synchronized automatically when assigned."""
+    wireframe: bool
+    """Boolean indicating if the meshes should be rendered as wireframes. Synchronized automatically when assigned."""
+    opacity: Optional[float]
+    """Opacity of the meshes. None means opaque. Synchronized automatically when assigned."""
+    flat_shading: bool
+    """Whether to do flat shading. Synchronized automatically when assigned."""
+    side: Literal["front", "back", "double"]
+    """Side of the surface to render. Synchronized automatically when assigned."""
+    material: Literal["standard", "toon3", "toon5"]
+    """Material type of the meshes. Synchronized automatically when assigned."""
+
+    def __post_init__(self):
+        # Check shapes.
+        num_instances = self.batched_wxyzs.shape[0]
+        assert self.vertices.shape[-1] == 3
+        assert self.faces.shape[-1] == 3
+        assert self.batched_wxyzs.shape == (num_instances, 4)
+        assert self.batched_positions.shape == (num_instances, 3)
+        assert self.batched_scales.shape == (num_instances, 3)
+        assert self.batched_colors.shape == (num_instances, 3)
+
+
+@dataclasses.dataclass
+class BatchedGlbMessage(_CreateSceneNodeMessage):
+    """Batched GlTF message. The GLB asset is instanced once for each transform
+    and scale.
+
+    Positions and orientations should follow a `T_parent_local` convention, which
+    corresponds to the R matrix and t vector in `p_parent = [R | t] p_local`."""
+
+    props: BatchedGlbProps
+
+
+@dataclasses.dataclass
+class BatchedGlbProps:
+    glb_data: bytes
+    """A binary payload containing the GLB data. Synchronized automatically when assigned."""
+    batched_wxyzs: npt.NDArray[np.float32]
+    """Float array of shape (N, 4) representing quaternion rotations. Synchronized automatically when assigned."""
+    batched_positions: npt.NDArray[np.float32]
+    """Float array of shape (N, 3) representing positions. Synchronized automatically when assigned."""
+    batched_scales: npt.NDArray[np.float32]
+    """Float array of shape (N, 3) representing per-axis scales. Synchronized automatically when assigned."""
+
+    def __post_init__(self):
+        # Check shapes.
+        num_instances = self.batched_wxyzs.shape[0]
+        assert self.batched_wxyzs.shape == (num_instances, 4)
+        assert self.batched_positions.shape == (num_instances, 3)
+        assert self.batched_scales.shape == (num_instances, 3)
+
+
 @dataclasses.dataclass
 class TransformControlsMessage(_CreateSceneNodeMessage):
     """Message for transform gizmos."""
@@ -752,6 +1007,28 @@ class SetPositionMessage(Message):
     position: Tuple[float, float, float]
 
 
+@dataclasses.dataclass
+class SetPosesMessage(Message):
+    """Server -> client message to set the poses of many scene nodes at once.
+
+    As with all other messages, transforms take the `T_parent_local` convention."""
+
+    names: Tuple[str, ...]
+    poses: npt.NDArray[np.float32]
+    """Packed (N, 7) array of poses. Each row is `(w, x, y, z, x, y, z)`: an
+    orientation followed by a position."""
+
+    def __post_init__(self):
+        assert self.poses.shape == (len(self.names), 7)
+        assert self.poses.dtype == np.float32
+
+    @override
+    def redundancy_key(self) -> str:
+        # Only pose updates for the same set of nodes are redundant.
+        # `SceneApi.set_poses()` always sends every node that it was passed.
+        return type(self).__name__ + "-" + "\0".join(self.names)
+
+
 @dataclasses.dataclass
 class TransformControlsUpdateMessage(Message):
     """Client -> server message when a transform control is updated.
@@ -813,12 +1090,55 @@ class SceneNodeClickMessage(Message):
 
     name: str
     instance_index: Optional[int]
-    """Instance index. Currently only used for batched axes."""
+    """Instance index. Currently only used for batched axes, meshes, GLBs, and
+    camera frustums."""
     ray_origin: Tuple[float, float, float]
     ray_direction: Tuple[float, float, float]
     screen_pos: Tuple[float, float]
 
 
+@dataclasses.dataclass
+class TimelineMessage(Message):
+    """Server -> client message to configure the scene timeline. Playback and
+    scrubbing of the timeline happen on the client."""
+
+    playing: bool
+    time: float
+    """Timeline time to play or pause from, in seconds."""
+    rate: float
+    loop: bool
+    show_controls: bool
+    notify_time: bool
+    """Whether the client should send the current time back to the server."""
+
+
+@dataclasses.dataclass
+class TimelineFrameMessage(Message):
+    """Server -> client message to add a frame to the scene timeline. Nodes in a
+    frame are only shown while that frame is active."""
+
+    index: int
+    timestamp: float
+    node_names: Tuple[str, ...]
+
+    @override
+    def redundancy_key(self) -> str:
+        return type(self).__name__ + "-" + str(self.index)
+
+
+@dataclasses.dataclass
+class TimelineRemoveMessage(Message):
+    """Server -> client message to remove the scene timeline."""
+
+
+@dataclasses.dataclass
+class TimelineTimeMessage(Message):
+    """Client -> server message with the current time of the scene timeline."""
+
+    time: float
+    frame_index: Optional[int]
+
+
 @dataclasses.dataclass
 class ResetGuiMessage(Message):
     """Reset GUI."""
@@ -0,0 +1,443 @@
+"""Size and time breakdown of ``.viser`` recordings. Exposed as the
+`viser-analyze-recording` command."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import heapq
+import json
+import struct
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import msgspec
+import rich
+import tyro
+from rich.table import Table
+
+from . import _messages
+from .infra._recording import (
+    _MIN_BLOB_BYTES,
+    BLOB_EXT_CODE,
+    iter_chunks,
+    read_member_size,
+)
+
+_EXT_REF_BYTES = 6
+"""Encoded size of a blob reference, which is a msgpack fixext4 value."""
+
+_MSGPACK_FORMATS: Dict[int, Tuple[str, int]] = {
+    0xC4: ("data", 1),
+    0xC5: ("data", 2),
+    0xC6: ("data", 4),
+    0xC7: ("ext", 1),
+    0xC8: ("ext", 2),
+    0xC9: ("ext", 4),
+    **{
+        tag: ("fixed", size)
+        for tag, size in zip(range(0xCA, 0xD4), (4, 8, 1, 2, 4, 8, 1, 2, 4, 8))
+    },
+    **{tag: ("fixed", size) for tag, size in zip(range(0xD4, 0xD9), (2, 3, 5, 9, 17))},
+    0xD9: ("data", 1),
+    0xDA: ("data", 2),
+    0xDB: ("data", 4),
+    0xDC: ("array", 2),
+    0xDD: ("array", 4),
+    0xDE: ("map", 2),
+    0xDF: ("map", 4),
+}
+"""Encodings of msgpack type tags, other than fixed-width ones, as (kind,
+number of bytes). For `data` and `ext`, the bytes hold a length."""
+
+
+class _MsgpackReader:
+    """Reads msgpack values from a stream one at a time, so large objects can
+    be walked without loading them into memory."""
+
+    def __init__(self, file: IO[bytes]) -> None:
+        self._file = file
+
+    def _read(self, size: int) -> bytes:
+        data = self._file.read(size)
+        assert len(data) == size, "Unexpected end of recording."
+        return data
+
+    def _read_uint(self, size: int) -> int:
+        return int.from_bytes(self._read(size), "big")
+
+    def read_container_header(self) -> int:
+        """Read the header of an array or map, and return its length."""
+        tag = self._read(1)[0]
+        if 0x80 <= tag <= 0x9F:
+            return tag & 0x0F
+        kind, size = _MSGPACK_FORMATS.get(tag, ("", 0))
+        assert kind in ("array", "map"), f"Expected an array or map, got {tag:#x}."
+        return self._read_uint(size)
+
+    def skip_bin(self) -> int:
+        """Skip a bin value, and return its size."""
+        tag = self._read(1)[0]
+        assert 0xC4 <= tag <= 0xC6, f"Expected bytes, got {tag:#x}."
+        remaining = size = self._read_uint(_MSGPACK_FORMATS[tag][1])
+        while remaining > 0:
+            remaining -= len(self._read(min(remaining, 1 << 20)))
+        return size
+
+    def read_value(self) -> Any:
+        """Read and decode a complete value."""
+        out = bytearray()
+        remaining = 1
+        while remaining > 0:
+            remaining -= 1
+            tag = self._read(1)[0]
+            out.append(tag)
+            if tag <= 0x7F or tag >= 0xE0 or tag in (0xC0, 0xC2, 0xC3):
+                continue
+            elif tag <= 0x8F:
+                remaining += 2 * (tag & 0x0F)
+            elif tag <= 0x9F:
+                remaining += tag & 0x0F
+            elif tag <= 0xBF:
+                out += self._read(tag & 0x1F)
+            else:
+                kind, size = _MSGPACK_FORMATS[tag]
+                header = self._read(size)
+                out += header
+                if kind == "data":
+                    out += self._read(int.from_bytes(header, "big"))
+                elif kind == "ext":
+                    out += self._read(int.from_bytes(header, "big") + 1)
+                elif kind == "array":
+                    remaining += int.from_bytes(header, "big")
+                elif kind == "map":
+                    remaining += 2 * int.from_bytes(header, "big")
+        return msgspec.msgpack.decode(out)
+
+
+class _RecordingStats:
+    """Accumulates statistics, one message at a time."""
+
+    def __init__(self, top_k: int, bucket_sec: float) -> None:
+        self._top_k = top_k
+        self._bucket_sec = bucket_sec
+        self.blob_sizes: Dict[int, int] = {}
+        self.duration_seconds = 0.0
+        self.message_count = 0
+        self.message_bytes = 0
+        self.by_type: Dict[str, List[int]] = {}
+        self.by_node: Dict[str, List[int]] = {}
+        self.by_prop: Dict[str, List[int]] = {}
+        self.timeline: Dict[int, List[int]] = {}
+
+        # Heap of (size, insertion order, payload info).
+        self._largest: List[Tuple[int, int, Dict[str, Any]]] = []
+        self._payload_count = 0
+        self._payload_bytes = 0
+        self._unique_payload_bytes = 0
+        self._seen_payloads: Set[Any] = set()
+
+        # Sizes of messages by redundancy key, in the current frame and in the
+        # compacted scene state.
+        self._frame_time: Optional[float] = None
+        self._frame: Dict[str, int] = {}
+        self._superseded_bytes = 0
+        self._state: Dict[str, int] = {}
+
+    def _size(self, value: Any) -> int:
+        """Encoded size of a value, after resolving blob references."""
+        size = len(msgspec.msgpack.encode(value))
+        for blob_id in self._blob_refs(value):
+            size += self.blob_sizes[blob_id] - _EXT_REF_BYTES
+        return size
+
+    def _blob_refs(self, value: Any) -> Iterator[int]:
+        if isinstance(value, dict):
+            for v in value.values():
+                yield from self._blob_refs(v)
+        elif isinstance(value, list):
+            for v in value:
+                yield from self._blob_refs(v)
+        elif isinstance(value, msgspec.msgpack.Ext) and value.code == BLOB_EXT_CODE:
+            yield struct.unpack("<I", value.data)[0]
+
+    def _iter_payloads(self, value: Any, path: str) -> Iterator[Tuple[str, int, Any]]:
+        """Iterate over `(path, size, dedup key)` for byte payloads."""
+        if isinstance(value, dict):
+            for k, v in value.items():
+                yield from self._iter_payloads(v, f"{path}.{k}" if path else k)
+        elif isinstance(value, list):
+            for v in value:
+                yield from self._iter_payloads(v, path)
+        elif isinstance(value, msgspec.msgpack.Ext) and value.code == BLOB_EXT_CODE:
+            blob_id = struct.unpack("<I", value.data)[0]
+            yield path, self.blob_sizes[blob_id], ("blob", blob_id)
+        elif isinstance(value, bytes):
+            yield (
+                path,
+                len(value),
+                hashlib.blake2b(value, digest_size=16).digest()
+                if len(value) >= _MIN_BLOB_BYTES
+                else None,
+            )
+
+    def add_message(self, t: float, message: Dict[str, Any]) -> None:
+        size = self._size(message)
+        message_type = message["type"]
+        node = message.get("name")
+        self.duration_seconds = max(self.duration_seconds, t)
+        self.message_count += 1
+        self.message_bytes += size
+
+        _accumulate(self.by_type, message_type, size)
+        if isinstance(node, str):
+            _accumulate(self.by_node, node, size)
+        props = message.get("props", message.get("updates"))
+        if isinstance(props, dict):
+            for k, v in props.items():
+                _accumulate(self.by_prop, k, self._size(v))
+        _accumulate(self.timeline, int(t // self._bucket_sec), size)
+
+        for path, payload_size, dedup_key in self._iter_payloads(message, ""):
+            self._payload_count += 1
+            self._payload_bytes += payload_size
+            if dedup_key is None or dedup_key not in self._seen_payloads:
+                self._unique_payload_bytes += payload_size
+                if dedup_key is not None:
+                    self._seen_payloads.add(dedup_key)
+            info = {"time": t, "type": message_type, "node": node, "path": path}
+            entry = (payload_size, self._payload_count, info)
+            if len(self._largest) < self._top_k:
+                heapq.heappush(self._largest, entry)
+            elif payload_size > self._largest[0][0]:
+                heapq.heapreplace(self._largest, entry)
+
+        # Messages that are superseded before the next sleep are never seen.
+        key = _messages.Message._from_decoded(message).redundancy_key()
+        if t != self._frame_time:
+            self._frame_time = t
+            self._frame.clear()
+        self._superseded_bytes += self._frame.get(key, 0)
+        self._frame[key] = size
+        self._state[key] = size
+
+    def report(self) -> Dict[str, Any]:
+        def breakdown(stats: Dict[str, List[int]]) -> List[Dict[str, Any]]:
+            return [
+                {"name": name, "count": count, "bytes": size}
+                for name, (count, size) in sorted(
+                    stats.items(), key=lambda item: -item[1][1]
+                )
+            ]
+
+        return {
+            "duration_seconds": self.duration_seconds,
+            "message_count": self.message_count,
+            "message_bytes": self.message_bytes,
+            "by_type": breakdown(self.by_type),
+            "by_node": breakdown(self.by_node),
+            "by_prop": breakdown(self.by_prop),
+            "timeline": [
+                {
+                    "time": bucket * self._bucket_sec,
+                    "messages_per_sec": count / self._bucket_sec,
+                    "bytes_per_sec": size / self._bucket_sec,
+                }
+                for bucket, (count, size) in (
+                    (bucket, self.timeline.get(bucket, (0, 0)))
+                    for bucket in range(max(self.timeline, default=-1) + 1)
+                )
+            ],
+            "largest_payloads": [
+                {**info, "bytes": size}
+                for size, _, info in sorted(self._largest, key=lambda x: -x[0])
+            ],
+            "savings": {
+                "payload_bytes": self._payload_bytes,
+                "deduplicated_payload_bytes": self._unique_payload_bytes,
+                "dedup_saved_bytes": self._payload_bytes - self._unique_payload_bytes,
+                "superseded_bytes": self._superseded_bytes,
+                "compacted_state_bytes": sum(self._state.values()),
+            },
+        }
+
+
+def _accumulate(stats: Dict[Any, List[int]], key: Any, size: int) -> None:
+    entry = stats.setdefault(key, [0, 0])
+    entry[0] += 1
+    entry[1] += size
+
+
+def _format_bytes(size: float) -> str:
+    for unit, scale in (("GB", 1e9), ("MB", 1e6), ("kB", 1e3)):
+        if size >= scale:
+            return f"{size / scale:.2f} {unit}"
+    return f"{size:.0f} B"
+
+
+def _analyze_chunked(
+    file: IO[bytes], stats: _RecordingStats
+) -> Dict[str, Dict[str, int]]:
+    """Read a chunked recording. Returns compressed bytes by chunk type."""
+    chunk_bytes: Dict[str, Dict[str, int]] = {}
+    for offset, chunk in iter_chunks(file):
+        entry = chunk_bytes.setdefault(chunk["type"], {"count": 0, "bytes": 0})
+        entry["count"] += 1
+        entry["bytes"] += file.tell() - offset
+        if chunk["type"] in ("keyframe", "messages"):
+            # Keyframes repeat earlier state, so we only read their blobs.
+            stats.blob_sizes.update((i, len(blob)) for i, blob in chunk["blobs"])
+        if chunk["type"] == "messages":
+            for t, message in chunk["messages"]:
+                stats.add_message(t, message)
+        elif chunk["type"] == "end":
+            stats.duration_seconds = chunk["durationSeconds"]
+    return chunk_bytes
+
+
+def _analyze_serialized(file: IO[bytes], stats: _RecordingStats) -> None:
+    """Read a recording from :meth:`StateSerializer.serialize()`, which is a
+    single msgpack map. The map is walked instead of decoded, so the
+    recording is never fully loaded into memory."""
+    reader = _MsgpackReader(file)
+    duration_seconds = 0.0
+    for _ in range(reader.read_container_header()):
+        key = reader.read_value()
+        if key == "blobs":
+            for _ in range(reader.read_container_header()):
+                assert reader.read_container_header() == 2
+                blob_id = reader.read_value()
+                stats.blob_sizes[blob_id] = reader.skip_bin()
+        elif key == "blobFiles":
+            # Exported bundles store large payloads in separate files.
+            for _ in range(reader.read_container_header()):
+                blob_id, _, size = reader.read_value()
+                stats.blob_sizes[blob_id] = size
+        elif key == "messages":
+            for _ in range(reader.read_container_header()):
+                assert reader.read_container_header() == 2
+                t = reader.read_value()
+                stats.add_message(t, reader.read_value())
+        elif key == "durationSeconds":
+            duration_seconds = reader.read_value()
+        else:
+            reader.read_value()
+    stats.duration_seconds = duration_seconds
+
+
+def analyze_recording(
+    path: Path,
+    top_k: int = 10,
+    bucket_sec: float = 1.0,
+    output: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Print a size and time breakdown of a ``.viser`` recording. The
+    recording is read incrementally, so large files can be analyzed with
+    little memory.
+
+    Sizes are uncompressed, with deduplicated payloads counted each time that
+    they're sent.
+
+    Args:
+        path: Path to the recording.
+        top_k: Number of rows to print in each table, and number of largest
+            payloads to report.
+        bucket_sec: Duration of time buckets for message rates.
+        output: Optional path to write the full report to, as JSON.
+
+    Returns:
+        The report.
+    """
+    stats = _RecordingStats(top_k=top_k, bucket_sec=bucket_sec)
+    with path.open("rb") as file:
+        chunked = read_member_size(file.read(20)) is not None
+        file.seek(0)
+        if chunked:
+            chunk_bytes = _analyze_chunked(file, stats)
+        else:
+            chunk_bytes = None
+            with gzip.GzipFile(fileobj=file) as gzip_file:
+                _analyze_serialized(gzip_file, stats)  # type: ignore
+
+    report = {
+        "path": str(path),
+        "format": "chunked" if chunked else "serialized",
+        "file_bytes": path.stat().st_size,
+        **({"chunks": chunk_bytes} if chunk_bytes is not None else {}),
+        **stats.report(),
+    }
+    _print_report(report, top_k)
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2))
+        rich.print(f"[bold](viser)[/bold] Wrote report to {output}.")
+    return report
+
+
+def _print_report(report: Dict[str, Any], top_k: int) -> None:
+    rich.print(
+        f"[bold](viser)[/bold] {report['path']}: {report['format']} recording,"
+        f" {_format_bytes(report['file_bytes'])} on disk,"
+        f" {report['duration_seconds']:.1f} seconds,"
+        f" {report['message_count']} messages"
+        f" ({_format_bytes(report['message_bytes'])} uncompressed)."
+    )
+    if "chunks" in report:
+        table = Table("chunk type", "count", "compressed", title="Chunks")
+        for chunk_type, entry in report["chunks"].items():
+            table.add_row(
+                chunk_type, str(entry["count"]), _format_bytes(entry["bytes"])
+            )
+        rich.print(table)
+
+    for key, title in (
+        ("by_type", "Message type"),
+        ("by_node", "Scene node"),
+        ("by_prop", "Prop"),
+    ):
+        table = Table(title.lower(), "count", "bytes", "share", title=title)
+        for row in report[key][:top_k]:
+            table.add_row(
+                row["name"],
+                str(row["count"]),
+                _format_bytes(row["bytes"]),
+                f"{100.0 * row['bytes'] / max(report['message_bytes'], 1):.1f}%",
+            )
+        rich.print(table)
+
+    # Merge time buckets, so long recordings still fit on screen.
+    timeline = report["timeline"]
+    table = Table("time", "messages/s", "bytes/s", title="Rates over time")
+    step = max(len(timeline) // 20 + (len(timeline) % 20 > 0), 1)
+    for i in range(0, len(timeline), step):
+        rows = timeline[i : i + step]
+        table.add_row(
+            f"{rows[0]['time']:.1f}s",
+            f"{sum(r['messages_per_sec'] for r in rows) / len(rows):.1f}",
+            _format_bytes(sum(r["bytes_per_sec"] for r in rows) / len(rows)),
+        )
+    rich.print(table)
+
+    table = Table("bytes", "time", "type", "node", "path", title="Largest payloads")
+    for row in report["largest_payloads"]:
+        table.add_row(
+            _format_bytes(row["bytes"]),
+            f"{row['time']:.2f}s",
+            row["type"],
+            str(row["node"]),
+            row["path"],
+        )
+    rich.print(table)
+
+    savings = report["savings"]
+    rich.print(
+        f"[bold](viser)[/bold] Deduplicating payloads: "
+        f"{_format_bytes(savings['payload_bytes'])} ->"
+        f" {_format_bytes(savings['deduplicated_payload_bytes'])}."
+        f" Messages superseded before the next frame:"
+        f" {_format_bytes(savings['superseded_bytes'])}."
+        f" Compacted final scene state:"
+        f" {_format_bytes(savings['compacted_state_bytes'])}."
+    )
+
+
+analyze_recording_entrypoint = lambda: tyro.cli(analyze_recording)
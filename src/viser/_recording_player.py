@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import bisect
+import gzip
+import itertools
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Set, Tuple
+
+import msgspec
+
+from . import _messages, infra
+from .infra._recording import iter_chunks, read_index, read_member_size, resolve_blobs
+
+if TYPE_CHECKING:
+    from ._viser import ViserServer
+
+
+def load_recording(path: str | Path) -> RecordingPlayer:
+    """Load a ``.viser`` recording, for replaying into a :class:`ViserServer`.
+
+    .. code-block:: python
+
+        server = viser.ViserServer()
+        player = viser.load_recording("recording.viser")
+        player.play(server, loop=True)
+        server.sleep_forever()
+
+    Args:
+        path: Path to a recording from :meth:`ViserServer.get_scene_serializer`
+            or :meth:`ViserServer.get_streaming_scene_serializer`.
+
+    Returns:
+        Player for the recording.
+    """
+    return RecordingPlayer(path)
+
+
+class _ChunkedRecording:
+    """Messages from a chunked recording, which are read lazily."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        with open(path, "rb") as file:
+            index = read_index(file)
+        if index is None:
+            # Unfinished recording: we can only read from the start.
+            self.duration_seconds: Optional[float] = None
+            self._seek_points: List[Tuple[float, int]] = [(0.0, 0)]
+        else:
+            self.duration_seconds = index["durationSeconds"]
+            self._seek_points = [(t, offset) for t, offset in index["seekPoints"]]
+
+    def iter_messages(self, start_time: float) -> Iterator[Tuple[float, Any]]:
+        """Iterate over messages that reproduce the scene from `start_time`
+        onwards. This can include messages from before `start_time`."""
+        i = bisect.bisect_right([t for t, _ in self._seek_points], start_time) - 1
+        with open(self._path, "rb") as file:
+            file.seek(self._seek_points[max(i, 0)][1])
+            blobs: dict[int, bytes] = {}
+            for j, (_, chunk) in enumerate(iter_chunks(file)):
+                if chunk["type"] == "keyframe":
+                    # Blobs aren't referenced across keyframes.
+                    blobs = dict(chunk["blobs"])
+                    if j == 0:
+                        for _, message in chunk["messages"]:
+                            yield chunk["time"], resolve_blobs(message, blobs)
+                elif chunk["type"] == "messages":
+                    blobs.update(chunk["blobs"])
+                    for t, message in chunk["messages"]:
+                        yield t, resolve_blobs(message, blobs)
+                elif chunk["type"] == "end":
+                    return
+
+
+class _SerializedRecording:
+    """Messages from a recording written by :meth:`StateSerializer.serialize()`.
+    These are a single msgpack object, which is decoded in full."""
+
+    def __init__(self, path: Path) -> None:
+        data = msgspec.msgpack.decode(gzip.decompress(path.read_bytes()))
+        self.duration_seconds: Optional[float] = data["durationSeconds"]
+        self._blobs = dict(data.get("blobs", []))
+
+        # Exported bundles store large payloads in separate files.
+        for blob_id, name, _ in data.get("blobFiles", []):
+            self._blobs[blob_id] = (path.parent / name).read_bytes()
+        self._messages = data["messages"]
+
+    def iter_messages(self, start_time: float) -> Iterator[Tuple[float, Any]]:
+        """Iterate over messages that reproduce the scene from `start_time`
+        onwards. This can include messages from before `start_time`."""
+        for t, message in self._messages:
+            yield t, resolve_blobs(message, self._blobs)
+
+
+class RecordingPlayer:
+    """Replays a ``.viser`` recording into a :class:`ViserServer`, with the
+    recorded timing. Should be created via :func:`viser.load_recording()`.
+
+    Recordings from :meth:`ViserServer.get_streaming_scene_serializer` are read
+    one chunk at a time, and seeking uses their keyframes. Recordings from
+    :meth:`ViserServer.get_scene_serializer` are decoded into memory.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        path = Path(path)
+        with open(path, "rb") as file:
+            header = file.read(20)
+        self._recording = (
+            _ChunkedRecording(path)
+            if read_member_size(header) is not None
+            else _SerializedRecording(path)
+        )
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ViserServer] = None
+
+        # Playback position is `_anchor_time`, plus elapsed time since
+        # `_anchor_wall` when playing.
+        self._anchor_time = 0.0
+        self._anchor_wall = time.monotonic()
+        self._rate = 1.0
+        self._paused = False
+        self._seek_time: Optional[float] = 0.0
+        self._stop = False
+        self._end_time: Optional[float] = None
+
+        self.loop: bool = False
+        """Restart from the beginning when playback reaches the end."""
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        """Duration of the recording. None for unfinished streaming
+        recordings, until playback reaches the end."""
+        if self._recording.duration_seconds is not None:
+            return self._recording.duration_seconds
+        return self._end_time
+
+    @property
+    def time(self) -> float:
+        """Current playback time, in seconds."""
+        with self._lock:
+            return self._position()
+
+    @property
+    def rate(self) -> float:
+        """Playback rate. For example, 2.0 plays at double speed."""
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: float) -> None:
+        assert rate > 0.0, "Playback rate must be positive."
+        with self._lock:
+            self._anchor_time = self._position()
+            self._anchor_wall = time.monotonic()
+            self._rate = rate
+        self._wake.set()
+
+    @property
+    def paused(self) -> bool:
+        """Whether playback is paused."""
+        return self._paused
+
+    def play(
+        self, server: ViserServer, *, rate: float = 1.0, loop: bool = False
+    ) -> None:
+        """Start playback into a server, in a background thread. Returns
+        immediately; see :meth:`wait()`.
+
+        Replayed scene nodes are sent to all clients, but are not added to
+        :attr:`ViserServer.scene`.
+
+        Args:
+            server: Server to replay the recording into.
+            rate: Playback rate.
+            loop: Restart from the beginning when playback reaches the end.
+        """
+        assert self._thread is None, "play() was already called!"
+        assert rate > 0.0, "Playback rate must be positive."
+        self._server = server
+        self.loop = loop
+        with self._lock:
+            self._anchor_wall = time.monotonic()
+            self._rate = rate
+        self._thread = threading.Thread(
+            target=self._run, name="viser-recording-player", daemon=True
+        )
+        self._thread.start()
+
+    def pause(self) -> None:
+        """Pause playback."""
+        with self._lock:
+            self._anchor_time = self._position()
+            self._paused = True
+        self._wake.set()
+
+    def resume(self) -> None:
+        """Resume playback after :meth:`pause()`."""
+        with self._lock:
+            self._anchor_wall = time.monotonic()
+            self._paused = False
+        self._wake.set()
+
+    def seek(self, time_seconds: float) -> None:
+        """Jump to a time in the recording. Playback continues from this time
+        unless paused.
+
+        Args:
+            time_seconds: Time to seek to, in seconds.
+        """
+        with self._lock:
+            self._seek_time = max(time_seconds, 0.0)
+            self._anchor_time = self._seek_time
+            self._anchor_wall = time.monotonic()
+            self._done.clear()
+        self._wake.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until playback reaches the end of the recording. Never returns
+        when looping, unless a timeout is set.
+
+        Args:
+            timeout: Maximum time to wait, in seconds.
+
+        Returns:
+            True if playback reached the end, False if the timeout expired.
+        """
+        return self._done.wait(timeout)
+
+    def stop(self) -> None:
+        """Stop playback. Replayed scene nodes are left in the scene."""
+        with self._lock:
+            self._stop = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _position(self) -> float:
+        if self._thread is None or self._paused or self._done.is_set():
+            return self._anchor_time
+        elapsed = time.monotonic() - self._anchor_wall
+        position = self._anchor_time + elapsed * self._rate
+        if self.duration_seconds is not None:
+            position = min(position, self.duration_seconds)
+        return position
+
+    def _iter_frames(
+        self, start_time: float
+    ) -> Iterator[Tuple[float, List[infra.Message]]]:
+        """Iterate over groups of messages with the same time."""
+        for t, group in itertools.groupby(
+            self._recording.iter_messages(start_time), key=lambda x: x[0]
+        ):
+            yield (
+                t,
+                [_messages.Message._from_decoded(message) for _, message in group],
+            )
+
+    def _run(self) -> None:
+        assert self._server is not None
+        frames: Iterator[Tuple[float, List[infra.Message]]] = iter(())
+        pending: Optional[Tuple[float, List[infra.Message]]] = None
+        scene_nodes: Set[str] = set()
+        last_time = 0.0
+
+        while True:
+            with self._lock:
+                if self._stop:
+                    return
+                seek_time = self._seek_time
+                self._seek_time = None
+                paused = self._paused
+                delay = (
+                    0.0
+                    if pending is None
+                    else (pending[0] - self._position()) / self._rate
+                )
+
+            if seek_time is not None:
+                self._clear_scene(scene_nodes)
+                frames = self._iter_frames(seek_time)
+                pending = None
+                continue
+            if self._done.is_set():
+                self._wake.wait()
+                self._wake.clear()
+                continue
+
+            if pending is None:
+                pending = next(frames, None)
+                if pending is not None:
+                    continue
+
+                # Reached the end of the recording.
+                self._end_time = last_time
+                if self.loop:
+                    self.seek(0.0)
+                else:
+                    with self._lock:
+                        self._anchor_time = self.duration_seconds or last_time
+                        self._done.set()
+                continue
+
+            # Wait until the next frame, unless playback is changed. When
+            # paused, frames up to the current time are still sent, so seeking
+            # while paused updates the scene.
+            if delay > 0.0:
+                if self._wake.wait(None if paused else delay):
+                    self._wake.clear()
+                    continue
+
+            last_time, messages = pending
+            pending = None
+            self._send(messages, scene_nodes)
+
+    def _send(self, messages: List[infra.Message], scene_nodes: Set[str]) -> None:
+        assert self._server is not None
+        with self._server.atomic():
+            for message in messages:
+                if isinstance(message, _messages._CreateSceneNodeMessage):
+                    scene_nodes.add(message.name)
+                elif isinstance(message, _messages.RemoveSceneNodeMessage):
+                    scene_nodes.discard(message.name)
+                self._server._websock_server.queue_message(message)
+
+    def _clear_scene(self, scene_nodes: Set[str]) -> None:
+        """Remove replayed scene nodes, before seeking or looping. Nodes that
+        the server also created are left in place."""
+        assert self._server is not None
+        server_nodes = self._server.scene._handle_from_node_name
+        with self._server.atomic():
+            for name in sorted(scene_nodes):
+                if name not in server_nodes:
+                    self._server._websock_server.queue_message(
+                        _messages.RemoveSceneNodeMessage(name)
+                    )
+        scene_nodes.clear()
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import io
 import time
 import warnings
 from collections.abc import Coroutine
 from concurrent.futures import ThreadPoolExecutor
-from typing import TYPE_CHECKING, Callable, Tuple, TypeVar, Union, cast, get_args
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+    get_args,
+)
 
 import imageio.v3 as iio
 import numpy as np
@@ -17,8 +27,12 @@ from . import transforms as tf
 from ._scene_handles import (
     AmbientLightHandle,
     BatchedAxesHandle,
+    BatchedCameraFrustumHandle,
+    BatchedGlbHandle,
+    BatchedMeshHandle,
     BoneState,
     CameraFrustumHandle,
+    DepthImagePointCloudHandle,
     DirectionalLightHandle,
     FrameHandle,
     GaussianSplatHandle,
@@ -41,8 +55,11 @@ from ._scene_handles import (
     SplineCatmullRomHandle,
     SplineCubicBezierHandle,
     SpotLightHandle,
+    TimelineEvent,
+    TimelineHandle,
     TransformControlsHandle,
     _ClickableSceneNodeHandle,
+    _TimelineState,
     _TransformControlsState,
     colors_to_uint8,
 )
@@ -101,6 +118,24 @@ def _encode_image_binary(
     return media_type, binary
 
 
+def _encode_depth_binary(depth: np.ndarray) -> bytes:
+    """Encode a depth image as a 3-channel PNG, which represents a fixed point
+    depth at each pixel."""
+    # Convert to fixed-point.
+    # We'll support from 0 -> (2^24 - 1) / 100_000.
+    #
+    # This translates to a range of [0, 167.77215], with a precision of 1e-5.
+    assert len(depth.shape) == 2 or (len(depth.shape) == 3 and depth.shape[2] == 1), (
+        "Depth should have shape (H,W) or (H,W,1)."
+    )
+    depth = np.clip(depth * 100_000, 0, 2**24 - 1).astype(np.uint32)
+    intdepth: np.ndarray = depth.reshape((*depth.shape[:2], 1)).view(np.uint8)
+    assert intdepth.shape == (*depth.shape[:2], 4)
+    with io.BytesIO() as data_buffer:
+        iio.imwrite(data_buffer, intdepth[:, :, :3], extension=".png")
+        return data_buffer.getvalue()
+
+
 TVector = TypeVar("TVector", bound=tuple)
 
 
@@ -112,6 +147,87 @@ def cast_vector(vector: TVector | np.ndarray, length: int) -> TVector:
     return cast(TVector, tuple(map(float, vector)))
 
 
+def _encode_thumbnail_atlas(
+    images: np.ndarray | Sequence[np.ndarray],
+    thumbnail_size: tuple[int, int],
+    format: Literal["png", "jpeg"],
+    jpeg_quality: int | None,
+) -> tuple[Literal["image/png", "image/jpeg"], bytes, tuple[int, int]]:
+    """Pack images into a single atlas image, which is encoded once. Each image is
+    resized to `thumbnail_size` via nearest-neighbor sampling.
+
+    Returns the media type, the encoded atlas, and the (columns, rows) of the atlas
+    grid. Thumbnails are placed in row-major order."""
+    num_images = len(images)
+    thumb_h, thumb_w = thumbnail_size
+    cols = max(int(np.ceil(np.sqrt(num_images))), 1)
+    rows = max(int(np.ceil(num_images / cols)), 1)
+    if max(cols * thumb_w, rows * thumb_h) > 8192:
+        warnings.warn(
+            f"Image atlas has shape {(rows * thumb_h, cols * thumb_w)}, which may"
+            " exceed the maximum texture size of some clients. Consider reducing"
+            " `thumbnail_size`.",
+            stacklevel=3,
+        )
+
+    atlas = np.zeros((rows, thumb_h, cols, thumb_w, 3), dtype=np.uint8)
+    for i, image in enumerate(images):
+        image = colors_to_uint8(np.asarray(image))[..., :3]
+        assert len(image.shape) == 3, "Images should have shape (H, W, 3)."
+        row_indices = ((np.arange(thumb_h) + 0.5) * image.shape[0] / thumb_h).astype(
+            np.int32
+        )
+        col_indices = ((np.arange(thumb_w) + 0.5) * image.shape[1] / thumb_w).astype(
+            np.int32
+        )
+        atlas[i // cols, :, i % cols, :, :] = image[
+            row_indices[:, None], col_indices[None, :]
+        ]
+
+    media_type, binary = _encode_image_binary(
+        atlas.reshape((rows * thumb_h, cols * thumb_w, 3)),
+        format,
+        jpeg_quality=jpeg_quality,
+    )
+    return media_type, binary, (cols, rows)
+
+
+def _cast_batched_scales(
+    batched_scales: float | tuple[float, ...] | np.ndarray, num_instances: int
+) -> np.ndarray:
+    """Broadcast uniform or per-instance scales to a float32 array of shape (N, 3)."""
+    batched_scales = np.asarray(batched_scales, dtype=np.float32)
+    if batched_scales.shape == (num_instances,):
+        batched_scales = batched_scales[:, None]
+    assert batched_scales.shape in {(), (3,), (num_instances, 1), (num_instances, 3)}, (
+        "Shape of batched_scales should be (), (3,), (N,), or (N, 3)."
+    )
+    return np.broadcast_to(batched_scales, (num_instances, 3)).copy()
+
+
+@dataclasses.dataclass(frozen=True)
+class MemoryReport:
+    """Memory used by messages that are kept for new clients, as returned by
+    :meth:`SceneApi.get_memory_report()`.
+
+    Sizes count the array and binary payloads of messages, including payloads
+    that were spilled to disk."""
+
+    total_bytes: int
+    """Payload bytes of all buffered messages."""
+    spilled_bytes: int
+    """Payload bytes that were spilled to disk. See `buffer_memory_limit` in
+    :class:`ViserServer`."""
+    bytes_from_scene_node: dict[str, int]
+    """Payload bytes for each scene node name."""
+    bytes_from_gui_uuid: dict[str, int]
+    """Payload bytes for each GUI element or notification, keyed by UUID."""
+    bytes_from_message_type: dict[str, int]
+    """Payload bytes for each message type."""
+    bytes_sent_from_client: dict[int, int]
+    """Total bytes sent to each connected client."""
+
+
 class SceneApi:
     """Interface for adding 3D primitives to the scene.
 
@@ -143,12 +259,14 @@ class SceneApi:
             str, TransformControlsHandle
         ] = {}
         self._handle_from_node_name: dict[str, SceneNodeHandle] = {}
+        self._animated_mesh_from_name: dict[str, MeshSkinnedHandle] = {}
 
         self._scene_pointer_cb: (
             Callable[[ScenePointerEvent], None | Coroutine] | None
         ) = None
         self._scene_pointer_done_cb: Callable[[], None | Coroutine] = lambda: None
         self._scene_pointer_event_type: _messages.ScenePointerEventType | None = None
+        self._timeline_handle: TimelineHandle | None = None
 
         # Set up world axes handle.
         self.world_axes: FrameHandle = self.add_frame(
@@ -171,6 +289,10 @@ class SceneApi:
             _messages.ScenePointerMessage,
             self._handle_scene_pointer_updates,
         )
+        self._websock_interface.register_handler(
+            _messages.TimelineTimeMessage,
+            self._handle_timeline_time_updates,
+        )
 
     def set_up_direction(
         self,
@@ -262,6 +384,104 @@ class SceneApi:
             _messages.SetSceneNodeVisibilityMessage("", visible)
         )
 
+    def set_poses(
+        self,
+        names_or_handles: Sequence[str | SceneNodeHandle],
+        wxyzs: tuple[tuple[float, float, float, float], ...] | np.ndarray,
+        positions: tuple[tuple[float, float, float], ...] | np.ndarray,
+    ) -> None:
+        """Set the poses of many scene nodes at once.
+
+        This is equivalent to assigning `.wxyz` and `.position` for each
+        node, but changes are detected in a vectorized way and sent to the
+        client as a single packed message. This is much cheaper for updating
+        many nodes per frame, for example the joints of a robot. If any pose
+        changed, poses for all N nodes are sent, so only the latest message
+        for each set of nodes needs to be kept for new clients.
+
+        Args:
+            names_or_handles: Scene node names or handles. Should have length N.
+            wxyzs: Quaternion rotations to parent frames from local frames
+                (R_pl). Should have shape (N, 4).
+            positions: Translations to parent frames from local frames
+                (t_pl). Should have shape (N, 3).
+        """
+        handles = [
+            self._handle_from_node_name[x] if isinstance(x, str) else x
+            for x in names_or_handles
+        ]
+        wxyzs = np.asarray(wxyzs)
+        positions = np.asarray(positions)
+        assert wxyzs.shape == (len(handles), 4)
+        assert positions.shape == (len(handles), 3)
+        if len(handles) == 0:
+            return
+
+        # Only send poses if something changed.
+        poses = np.concatenate([wxyzs, positions], axis=-1)
+        prev_poses = np.stack(
+            [np.concatenate([h._impl.wxyz, h._impl.position]) for h in handles]
+        )
+        changed = np.flatnonzero(~np.isclose(poses, prev_poses).all(axis=-1))
+        if len(changed) == 0:
+            return
+
+        for i in changed:
+            handles[i]._impl.wxyz[:] = wxyzs[i]
+            handles[i]._impl.position[:] = positions[i]
+
+        # All rows are sent, instead of only the changed ones. Otherwise each
+        # subset of changed nodes would get its own redundancy key, and none
+        # of the buffered messages would be culled.
+        self._websock_interface.queue_message(
+            _messages.SetPosesMessage(
+                names=tuple(h.name for h in handles),
+                poses=poses.astype(np.float32),
+            )
+        )
+
+    def add_timeline(
+        self,
+        loop: bool = True,
+        playing: bool = True,
+        rate: float = 1.0,
+        show_controls: bool = True,
+    ) -> TimelineHandle:
+        """Add a timeline to the scene, which replaces any existing timeline.
+
+        Each frame of a timeline is a set of scene nodes. Frames are added via
+        :meth:`TimelineHandle.add_frame()` and are sent to clients once.
+        Playback and scrubbing then run entirely in the client: only nodes in the
+        active frame are shown, without any round trips to the server. This is
+        useful for sequences where one node is added per frame, like a
+        recorded point cloud video.
+
+        Args:
+            loop: Whether to loop playback.
+            playing: Whether the timeline should initially be playing.
+            rate: Initial playback rate. 1.0 is real-time.
+            show_controls: Whether to show playback controls in the client.
+
+        Returns:
+            Handle for manipulating the timeline.
+        """
+        if self._timeline_handle is not None:
+            self._timeline_handle.remove()
+        handle = TimelineHandle(
+            _TimelineState(
+                api=self,
+                playing=playing,
+                time=0.0,
+                rate=rate,
+                loop=loop,
+                show_controls=show_controls,
+                wall_time=time.time(),
+            )
+        )
+        self._timeline_handle = handle
+        handle._send_config()
+        return handle
+
     def add_light_directional(
         self,
         name: str,
@@ -838,6 +1058,121 @@ class SceneApi:
         handle._jpeg_quality = jpeg_quality
         return handle
 
+    def add_batched_camera_frustums(
+        self,
+        name: str,
+        fovs: float | np.ndarray,
+        aspects: float | np.ndarray,
+        batched_wxyzs: tuple[tuple[float, float, float, float], ...] | np.ndarray,
+        batched_positions: tuple[tuple[float, float, float], ...] | np.ndarray,
+        scale: float = 0.3,
+        line_width: float = 2.0,
+        colors: RgbTupleOrArray = (20, 20, 20),
+        images: np.ndarray | Sequence[np.ndarray] | None = None,
+        thumbnail_size: tuple[int, int] = (64, 64),
+        format: Literal["png", "jpeg"] = "jpeg",
+        jpeg_quality: int | None = None,
+        wxyz: tuple[float, float, float, float] | np.ndarray = (1.0, 0.0, 0.0, 0.0),
+        position: tuple[float, float, float] | np.ndarray = (0.0, 0.0, 0.0),
+        visible: bool = True,
+    ) -> BatchedCameraFrustumHandle:
+        """Add a batch of camera frustums to the scene for visualization.
+
+        Frustums that are batched via a single call to
+        `add_batched_camera_frustums()` are instanced on the client, and all images
+        are packed into a single texture atlas that is encoded once. This will be
+        much faster than `add_camera_frustum()` called in a loop, for example when
+        visualizing large structure-from-motion reconstructions.
+
+        Like all cameras in the viser Python API, frustums follow the OpenCV [+Z forward,
+        +X right, +Y down] convention. fovs are vertical in radians; aspects are
+        width over height.
+
+        Colors and visibility can be updated per frustum by assigning to the
+        `batched_colors` and `batched_visible` properties of the returned handle,
+        for example to highlight a selected camera.
+
+        Args:
+            name: A scene tree name. Names in the format of /parent/child can be used to
+                define a kinematic tree.
+            fovs: Field of view of each camera (in radians). Should be a float or
+                have shape (N,).
+            aspects: Aspect ratio of each camera (width over height). Should be a
+                float or have shape (N,).
+            batched_wxyzs: Float array of shape (N, 4).
+            batched_positions: Float array of shape (N, 3).
+            scale: Scale factor for the size of the frustums.
+            line_width: Width of the frustum lines, in screen space.
+            colors: Color of each frustum. Should have shape (3,) or (N, 3).
+            images: Optional images to be displayed on the frustums. Should be a
+                sequence of N images with shape (H, W, 3), or an array with shape
+                (N, H, W, 3).
+            thumbnail_size: (height, width) that each image is resized to in the
+                texture atlas.
+            format: Format to transport the image atlas using ('png' or 'jpeg').
+            jpeg_quality: Quality of the jpeg image (if jpeg format is used).
+            wxyz: Quaternion rotation to parent frame from local frame (R_pl).
+                This will be applied to all frustums.
+            position: Translation to parent frame from local frame (t_pl).
+                This will be applied to all frustums.
+            visible: Whether or not this scene node is initially visible.
+
+        Returns:
+            Handle for manipulating scene node.
+        """
+        batched_wxyzs = np.asarray(batched_wxyzs)
+        batched_positions = np.asarray(batched_positions)
+        num_frustums = batched_wxyzs.shape[0]
+        assert batched_wxyzs.shape == (num_frustums, 4)
+        assert batched_positions.shape == (num_frustums, 3)
+
+        colors_cast = colors_to_uint8(np.asarray(colors))
+        assert colors_cast.shape in {
+            (num_frustums, 3),
+            (3,),
+        }, "Shape of colors should be (N, 3) or (3,)."
+        if colors_cast.shape == (3,):
+            colors_cast = np.tile(colors_cast[None, :], reps=(num_frustums, 1))
+
+        if images is not None:
+            assert len(images) == num_frustums, "Expected one image per frustum."
+            media_type, binary, atlas_grid = _encode_thumbnail_atlas(
+                images, thumbnail_size, format, jpeg_quality
+            )
+        else:
+            media_type = None
+            binary = None
+            atlas_grid = (0, 0)
+
+        message = _messages.BatchedCameraFrustumsMessage(
+            name=name,
+            props=_messages.BatchedCameraFrustumsProps(
+                batched_wxyzs=batched_wxyzs.astype(np.float32),
+                batched_positions=batched_positions.astype(np.float32),
+                batched_fovs=np.broadcast_to(
+                    np.asarray(fovs, dtype=np.float32), (num_frustums,)
+                ).copy(),
+                batched_aspects=np.broadcast_to(
+                    np.asarray(aspects, dtype=np.float32), (num_frustums,)
+                ).copy(),
+                batched_colors=colors_cast,
+                batched_visible=np.ones((num_frustums,), dtype=np.bool_),
+                scale=scale,
+                line_width=line_width,
+                atlas_media_type=media_type,
+                _atlas_data=binary,
+                atlas_grid=atlas_grid,
+            ),
+        )
+        handle = BatchedCameraFrustumHandle._make(
+            self, message, name, wxyz, position, visible
+        )
+        handle._images = images
+        handle._thumbnail_size = thumbnail_size
+        handle._format = format
+        handle._jpeg_quality = jpeg_quality
+        return handle
+
     def add_frame(
         self,
         name: str,
@@ -1047,6 +1382,7 @@ class SceneApi:
         wxyz: tuple[float, float, float, float] | np.ndarray = (1.0, 0.0, 0.0, 0.0),
         position: tuple[float, float, float] | np.ndarray = (0.0, 0.0, 0.0),
         visible: bool = True,
+        transfer_ownership: bool = False,
     ) -> PointCloudHandle:
         """Add a point cloud to the scene.
 
@@ -1059,6 +1395,9 @@ class SceneApi:
             wxyz: Quaternion rotation to parent frame from local frame (R_pl).
             position: Translation to parent frame from local frame (t_pl).
             visible: Whether or not this scene node is initially visible.
+            transfer_ownership: If True, input arrays that already have the
+                expected dtype are used without copying. They should not be
+                modified afterwards.
 
         Returns:
             Handle for manipulating scene node.
@@ -1078,7 +1417,7 @@ class SceneApi:
         message = _messages.PointCloudMessage(
             name=name,
             props=_messages.PointCloudProps(
-                points=points.astype(np.float16),
+                points=points.astype(np.float16, copy=not transfer_ownership),
                 colors=colors_cast,
                 point_size=point_size,
                 point_ball_norm={
@@ -1092,6 +1431,83 @@ class SceneApi:
         )
         return PointCloudHandle._make(self, message, name, wxyz, position, visible)
 
+    def add_depth_image_point_cloud(
+        self,
+        name: str,
+        depth: np.ndarray,
+        rgb: np.ndarray,
+        K: np.ndarray,
+        point_size: float = 0.01,
+        point_shape: Literal[
+            "square", "diamond", "circle", "rounded", "sparkle"
+        ] = "square",
+        format: Literal["png", "jpeg"] = "jpeg",
+        jpeg_quality: int | None = None,
+        wxyz: tuple[float, float, float, float] | np.ndarray = (1.0, 0.0, 0.0, 0.0),
+        position: tuple[float, float, float] | np.ndarray = (0.0, 0.0, 0.0),
+        visible: bool = True,
+    ) -> DepthImagePointCloudHandle:
+        """Add a point cloud to the scene, which is unprojected from an RGB-D
+        image on the client.
+
+        Compared to :meth:`add_point_cloud()`, this sends a compressed depth image
+        and color image instead of per-point positions and colors. Points are
+        placed in the OpenCV camera frame (+Z forward); the `wxyz` and `position`
+        arguments can be used to place the camera in the scene. Pixels with a
+        depth of zero are skipped.
+
+        Args:
+            name: Name of scene node. Determines location in kinematic tree.
+            depth: Depth image. Should have shape (H, W) or (H, W, 1). Depths are
+                transported as fixed-point values with a precision of 1e-5, in the
+                range [0, 167.77215].
+            rgb: Color image. Should have shape (H', W', 3). The depth image
+                resolution can be lower than the color image resolution.
+            K: Camera intrinsics matrix of the color image. Should have shape (3, 3).
+            point_size: Size of each point.
+            point_shape: Shape to draw each point.
+            format: Format to transport the color image using ('png' or 'jpeg').
+            jpeg_quality: Quality of the jpeg image (if jpeg format is used).
+            wxyz: Quaternion rotation to parent frame from local frame (R_pl).
+            position: Translation to parent frame from local frame (t_pl).
+            visible: Whether or not this scene node is initially visible.
+
+        Returns:
+            Handle for manipulating scene node.
+        """
+        K = np.asarray(K)
+        assert K.shape == (3, 3), "Shape of K should be (3, 3)."
+        assert len(rgb.shape) == 3 and rgb.shape[-1] in (3, 4), (
+            "Shape of rgb should be (H, W, 3)."
+        )
+        rgb_media_type, rgb_bytes = _encode_image_binary(
+            rgb, format, jpeg_quality=jpeg_quality
+        )
+        message = _messages.DepthImagePointCloudMessage(
+            name=name,
+            props=_messages.DepthImagePointCloudProps(
+                _depth_data=_encode_depth_binary(depth),
+                rgb_media_type=rgb_media_type,
+                _rgb_data=rgb_bytes,
+                K=tuple(map(tuple, K.astype(np.float64).tolist())),  # type: ignore
+                point_size=point_size,
+                point_ball_norm={
+                    "square": float("inf"),
+                    "diamond": 1.0,
+                    "circle": 2.0,
+                    "rounded": 3.0,
+                    "sparkle": 0.6,
+                }[point_shape],
+            ),
+        )
+        handle = DepthImagePointCloudHandle._make(
+            self, message, name, wxyz, position, visible
+        )
+        handle._depth = depth
+        handle._rgb = rgb
+        handle._jpeg_quality = jpeg_quality
+        return handle
+
     def add_mesh_skinned(
         self,
         name: str,
@@ -1109,6 +1525,7 @@ class SceneApi:
         wxyz: Tuple[float, float, float, float] | np.ndarray = (1.0, 0.0, 0.0, 0.0),
         position: Tuple[float, float, float] | np.ndarray = (0.0, 0.0, 0.0),
         visible: bool = True,
+        transfer_ownership: bool = False,
     ) -> MeshSkinnedHandle:
         """Add a skinned mesh to the scene, which we can deform using a set of
         bone transformations.
@@ -1135,6 +1552,9 @@ class SceneApi:
             wxyz: Quaternion rotation to parent frame from local frame (R_pl).
             position: Translation from parent frame to local frame (t_pl).
             visible: Whether or not this mesh is initially visible.
+            transfer_ownership: If True, input arrays that already have the
+                expected dtype are used without copying. They should not be
+                modified afterwards.
 
         Returns:
             Handle for manipulating scene node.
@@ -1170,8 +1590,8 @@ class SceneApi:
         message = _messages.SkinnedMeshMessage(
             name=name,
             props=_messages.SkinnedMeshProps(
-                vertices=vertices.astype(np.float32),
-                faces=faces.astype(np.uint32),
+                vertices=vertices.astype(np.float32, copy=not transfer_ownership),
+                faces=faces.astype(np.uint32, copy=not transfer_ownership),
                 color=_encode_rgb(color),
                 wireframe=wireframe,
                 opacity=opacity,
@@ -1215,6 +1635,7 @@ class SceneApi:
         wxyz: tuple[float, float, float, float] | np.ndarray = (1.0, 0.0, 0.0, 0.0),
         position: tuple[float, float, float] | np.ndarray = (0.0, 0.0, 0.0),
         visible: bool = True,
+        transfer_ownership: bool = False,
     ) -> MeshHandle:
         """Add a mesh to the scene.
 
@@ -1235,6 +1656,9 @@ class SceneApi:
             wxyz: Quaternion rotation to parent frame from local frame (R_pl).
             position: Translation from parent frame to local frame (t_pl).
             visible: Whether or not this mesh is initially visible.
+            transfer_ownership: If True, input arrays that already have the
+                expected dtype are used without copying. They should not be
+                modified afterwards.
 
         Returns:
             Handle for manipulating scene node.
@@ -1252,8 +1676,8 @@ class SceneApi:
         message = _messages.MeshMessage(
             name=name,
             props=_messages.MeshProps(
-                vertices=vertices.astype(np.float32),
-                faces=faces.astype(np.uint32),
+                vertices=vertices.astype(np.float32, copy=not transfer_ownership),
+                faces=faces.astype(np.uint32, copy=not transfer_ownership),
                 color=_encode_rgb(color),
                 wireframe=wireframe,
                 opacity=opacity,
@@ -1300,6 +1724,210 @@ class SceneApi:
                 visible=visible,
             )
 
+    def add_batched_meshes(
+        self,
+        name: str,
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        batched_wxyzs: tuple[tuple[float, float, float, float], ...] | np.ndarray,
+        batched_positions: tuple[tuple[float, float, float], ...] | np.ndarray,
+        batched_scales: float | tuple[float, ...] | np.ndarray = 1.0,
+        batched_colors: RgbTupleOrArray = (90, 200, 255),
+        wireframe: bool = False,
+        opacity: float | None = None,
+        material: Literal["standard", "toon3", "toon5"] = "standard",
+        flat_shading: bool = False,
+        side: Literal["front", "back", "double"] = "front",
+        wxyz: tuple[float, float, float, float] | np.ndarray = (1.0, 0.0, 0.0, 0.0),
+        position: tuple[float, float, float] | np.ndarray = (0.0, 0.0, 0.0),
+        visible: bool = True,
+        transfer_ownership: bool = False,
+    ) -> BatchedMeshHandle:
+        """Add a batch of meshes to the scene, which all share the same geometry.
+
+        Meshes that are batched via a single call to `add_batched_meshes()` are
+        instanced on the client; the geometry is only sent once, and this will be
+        much faster to render than `add_mesh_simple()` called in a loop.
+
+        Per-instance arrays can be updated later by assigning to the
+        `batched_wxyzs`, `batched_positions`, `batched_scales`, and
+        `batched_colors` properties of the returned handle. To change the number
+        of instances, these should be assigned together inside of
+        :meth:`ViserServer.atomic()`.
+
+        Args:
+            name: A scene tree name. Names in the format of /parent/child can be used to
+                define a kinematic tree.
+            vertices: A numpy array of vertex positions. Should have shape (V, 3).
+            faces: A numpy array of faces, where each face is represented by indices of
+                vertices. Should have shape (F, 3).
+            batched_wxyzs: Float array of shape (N, 4).
+            batched_positions: Float array of shape (N, 3).
+            batched_scales: Scale of each instance. Should be a float, or have shape
+                (3,), (N,), or (N, 3).
+            batched_colors: Color of each instance. Should have shape (3,) or (N, 3).
+            wireframe: Boolean indicating if the meshes should be rendered as
+                wireframes.
+            opacity: Opacity of the meshes. None means opaque.
+            material: Material type of the meshes ('standard', 'toon3', 'toon5').
+                This argument is ignored when wireframe=True.
+            flat_shading: Whether to do flat shading. This argument is ignored
+                when wireframe=True.
+            side: Side of the surface to render ('front', 'back', 'double').
+            wxyz: Quaternion rotation to parent frame from local frame (R_pl).
+                This will be applied to all instances.
+            position: Translation to parent frame from local frame (t_pl).
+                This will be applied to all instances.
+            visible: Whether or not these meshes are initially visible.
+            transfer_ownership: If True, input arrays that already have the
+                expected dtype are used without copying. They should not be
+                modified afterwards.
+
+        Returns:
+            Handle for manipulating scene node.
+        """
+        if wireframe and material != "standard":
+            warnings.warn(
+                f"Invalid combination of {wireframe=} and {material=}. Material argument will be ignored.",
+                stacklevel=2,
+            )
+        if wireframe and flat_shading:
+            warnings.warn(
+                f"Invalid combination of {wireframe=} and {flat_shading=}. Flat shading argument will be ignored.",
+                stacklevel=2,
+            )
+
+        batched_wxyzs = np.asarray(batched_wxyzs)
+        batched_positions = np.asarray(batched_positions)
+        num_instances = batched_wxyzs.shape[0]
+        assert batched_wxyzs.shape == (num_instances, 4)
+        assert batched_positions.shape == (num_instances, 3)
+
+        colors_cast = colors_to_uint8(np.asarray(batched_colors))
+        assert colors_cast.shape in {
+            (num_instances, 3),
+            (3,),
+        }, "Shape of batched_colors should be (N, 3) or (3,)."
+        if colors_cast.shape == (3,):
+            colors_cast = np.tile(colors_cast[None, :], reps=(num_instances, 1))
+
+        message = _messages.BatchedMeshesMessage(
+            name=name,
+            props=_messages.BatchedMeshesProps(
+                vertices=vertices.astype(np.float32, copy=not transfer_ownership),
+                faces=faces.astype(np.uint32, copy=not transfer_ownership),
+                batched_wxyzs=batched_wxyzs.astype(
+                    np.float32, copy=not transfer_ownership
+                ),
+                batched_positions=batched_positions.astype(
+                    np.float32, copy=not transfer_ownership
+                ),
+                batched_scales=_cast_batched_scales(batched_scales, num_instances),
+                batched_colors=colors_cast,
+                wireframe=wireframe,
+                opacity=opacity,
+                flat_shading=flat_shading,
+                side=side,
+                material=material,
+            ),
+        )
+        return BatchedMeshHandle._make(self, message, name, wxyz, position, visible)
+
+    def add_batched_glb(
+        self,
+        name: str,
+        glb_data: bytes,
+        batched_wxyzs: tuple[tuple[float, float, float, float], ...] | np.ndarray,
+        batched_positions: tuple[tuple[float, float, float], ...] | np.ndarray,
+        batched_scales: float | tuple[float, ...] | np.ndarray = 1.0,
+        wxyz: tuple[float, float, float, float] | np.ndarray = (1.0, 0.0, 0.0, 0.0),
+        position: tuple[float, float, float] | np.ndarray = (0.0, 0.0, 0.0),
+        visible: bool = True,
+    ) -> BatchedGlbHandle:
+        """Add a batch of GLB assets to the scene, which all share the same data.
+
+        This is the instanced equivalent of :meth:`add_glb()`: the GLB data is only
+        sent once, and each mesh in the asset is instanced on the client. Animations
+        in the GLB data are not played.
+
+        Args:
+            name: A scene tree name. Names in the format of /parent/child can be used to
+                define a kinematic tree.
+            glb_data: A binary payload.
+            batched_wxyzs: Float array of shape (N, 4).
+            batched_positions: Float array of shape (N, 3).
+            batched_scales: Scale of each instance. Should be a float, or have shape
+                (3,), (N,), or (N, 3).
+            wxyz: Quaternion rotation to parent frame from local frame (R_pl).
+                This will be applied to all instances.
+            position: Translation to parent frame from local frame (t_pl).
+                This will be applied to all instances.
+            visible: Whether or not this scene node is initially visible.
+
+        Returns:
+            Handle for manipulating scene node.
+        """
+        batched_wxyzs = np.asarray(batched_wxyzs)
+        batched_positions = np.asarray(batched_positions)
+        num_instances = batched_wxyzs.shape[0]
+        assert batched_wxyzs.shape == (num_instances, 4)
+        assert batched_positions.shape == (num_instances, 3)
+
+        message = _messages.BatchedGlbMessage(
+            name=name,
+            props=_messages.BatchedGlbProps(
+                glb_data=glb_data,
+                batched_wxyzs=batched_wxyzs.astype(np.float32),
+                batched_positions=batched_positions.astype(np.float32),
+                batched_scales=_cast_batched_scales(batched_scales, num_instances),
+            ),
+        )
+        return BatchedGlbHandle._make(self, message, name, wxyz, position, visible)
+
+    def add_batched_meshes_trimesh(
+        self,
+        name: str,
+        mesh: trimesh.Trimesh,
+        batched_wxyzs: tuple[tuple[float, float, float, float], ...] | np.ndarray,
+        batched_positions: tuple[tuple[float, float, float], ...] | np.ndarray,
+        batched_scales: float | tuple[float, ...] | np.ndarray = 1.0,
+        wxyz: tuple[float, float, float, float] | np.ndarray = (1.0, 0.0, 0.0, 0.0),
+        position: tuple[float, float, float] | np.ndarray = (0.0, 0.0, 0.0),
+        visible: bool = True,
+    ) -> BatchedGlbHandle:
+        """Add a batch of trimesh meshes to the scene. Internally calls
+        `self.add_batched_glb()`.
+
+        Args:
+            name: A scene tree name. Names in the format of /parent/child can be used to
+              define a kinematic tree.
+            mesh: A trimesh mesh object.
+            batched_wxyzs: Float array of shape (N, 4).
+            batched_positions: Float array of shape (N, 3).
+            batched_scales: Scale of each instance. Should be a float, or have shape
+                (3,), (N,), or (N, 3).
+            wxyz: Quaternion rotation to parent frame from local frame (R_pl).
+            position: Translation to parent frame from local frame (t_pl).
+            visible: Whether or not this scene node is initially visible.
+
+        Returns:
+            Handle for manipulating scene node.
+        """
+
+        with io.BytesIO() as data_buffer:
+            mesh.export(data_buffer, file_type="glb")
+            glb_data = data_buffer.getvalue()
+            return self.add_batched_glb(
+                name,
+                glb_data=glb_data,
+                batched_wxyzs=batched_wxyzs,
+                batched_positions=batched_positions,
+                batched_scales=batched_scales,
+                wxyz=wxyz,
+                position=position,
+                visible=visible,
+            )
+
     def _add_gaussian_splats(self, *args, **kwargs) -> GaussianSplatHandle:
         """Backwards compatibility shim. Use `add_gaussian_splats()` instead."""
         return self.add_gaussian_splats(*args, **kwargs)
@@ -1473,24 +2101,8 @@ class SceneApi:
                 image, format, jpeg_quality=jpeg_quality
             )
 
-        # Encode depth if provided. We use a 3-channel PNG to represent a fixed point
-        # depth at each pixel.
-        depth_bytes = None
-        if depth is not None:
-            # Convert to fixed-point.
-            # We'll support from 0 -> (2^24 - 1) / 100_000.
-            #
-            # This translates to a range of [0, 167.77215], with a precision of 1e-5.
-            assert len(depth.shape) == 2 or (
-                len(depth.shape) == 3 and depth.shape[2] == 1
-            ), "Depth should have shape (H,W) or (H,W,1)."
-            depth = np.clip(depth * 100_000, 0, 2**24 - 1).astype(np.uint32)
-            assert depth is not None  # Appease mypy.
-            intdepth: np.ndarray = depth.reshape((*depth.shape[:2], 1)).view(np.uint8)
-            assert intdepth.shape == (*depth.shape[:2], 4)
-            with io.BytesIO() as data_buffer:
-                iio.imwrite(data_buffer, intdepth[:, :, :3], extension=".png")
-                depth_bytes = data_buffer.getvalue()
+        # Encode depth if provided.
+        depth_bytes = None if depth is None else _encode_depth_binary(depth)
 
         self._websock_interface.queue_message(
             _messages.BackgroundImageMessage(
@@ -1654,6 +2266,64 @@ class SceneApi:
         # Clear the background image.
         self.set_background_image(image=None)
 
+    def get_memory_report(self) -> MemoryReport:
+        """Get the memory used by scene nodes and GUI elements, which are kept in
+        a buffer to send to new clients. Useful for finding the expensive parts
+        of a scene.
+
+        This is tracked incrementally, so it's cheap to call frequently.
+
+        Returns:
+            Memory report. For client-specific scene APIs, only includes
+            messages and bytes sent for that client.
+        """
+        from ._viser import ViserServer
+
+        buffer = self._websock_interface.get_message_buffer()
+        with buffer.buffer_lock:
+            total_bytes = buffer.memory_bytes + buffer.spilled_bytes
+            spilled_bytes = buffer.spilled_bytes
+            bytes_from_message_type = dict(buffer.nbytes_from_type)
+            bytes_from_owner = dict(buffer.nbytes_from_owner)
+
+        if isinstance(self._owner, ViserServer):
+            client_states = dict(self._owner._websock_server._client_state_from_id)
+        else:
+            client_states = {
+                self._owner.client_id: self._owner._websock_connection._state
+            }
+
+        return MemoryReport(
+            total_bytes=total_bytes,
+            spilled_bytes=spilled_bytes,
+            bytes_from_scene_node={
+                owner[1]: nbytes
+                for owner, nbytes in bytes_from_owner.items()
+                if isinstance(owner, tuple) and owner[0] == "scene"
+            },
+            bytes_from_gui_uuid={
+                owner[1]: nbytes
+                for owner, nbytes in bytes_from_owner.items()
+                if isinstance(owner, tuple) and owner[0] == "gui"
+            },
+            bytes_from_message_type=bytes_from_message_type,
+            bytes_sent_from_client={
+                client_id: state.stats.bytes_sent
+                for client_id, state in client_states.items()
+            },
+        )
+
+    def _sync_playback_clocks(self) -> None:
+        """Update the times of playing animation clips and timelines in
+        buffered messages, for clients that are connecting."""
+        for name, handle in tuple(self._animated_mesh_from_name.items()):
+            if handle._impl.removed:
+                self._animated_mesh_from_name.pop(name)
+            else:
+                handle._sync_animation_clock()
+        if self._timeline_handle is not None:
+            self._timeline_handle._sync_clock()
+
     def _get_client_handle(self, client_id: ClientId) -> ClientHandle:
         """Private helper for getting a client handle from its ID."""
         # Avoid circular imports.
@@ -1690,7 +2360,7 @@ class SceneApi:
         # Trigger callbacks.
         for cb in handle._impl_aux.update_cb:
             if asyncio.iscoroutinefunction(cb):
-                await cb(handle)
+                await self._websock_interface._callback_monitor.run(cb, handle)
             else:
                 self._thread_executor.submit(cb, handle).add_done_callback(
                     print_threadpool_errors
@@ -1717,7 +2387,29 @@ class SceneApi:
                 instance_index=message.instance_index,
             )
             if asyncio.iscoroutinefunction(cb):
-                await cb(event)
+                await self._websock_interface._callback_monitor.run(cb, event)
+            else:
+                self._thread_executor.submit(cb, event).add_done_callback(
+                    print_threadpool_errors
+                )
+
+    async def _handle_timeline_time_updates(
+        self, client_id: ClientId, message: _messages.TimelineTimeMessage
+    ) -> None:
+        """Callback for handling timeline time messages."""
+        handle = self._timeline_handle
+        if handle is None:
+            return
+        for cb in handle._impl.time_cb:
+            event = TimelineEvent(
+                client=self._get_client_handle(client_id),
+                client_id=client_id,
+                target=handle,
+                time=message.time,
+                frame_index=message.frame_index,
+            )
+            if asyncio.iscoroutinefunction(cb):
+                await self._websock_interface._callback_monitor.run(cb, event)
             else:
                 self._thread_executor.submit(cb, event).add_done_callback(
                     print_threadpool_errors
@@ -1739,7 +2431,9 @@ class SceneApi:
         if self._scene_pointer_cb is None:
             return
         if asyncio.iscoroutinefunction(self._scene_pointer_cb):
-            await self._scene_pointer_cb(event)
+            await self._websock_interface._callback_monitor.run(
+                self._scene_pointer_cb, event
+            )
         else:
             self._thread_executor.submit(
                 self._scene_pointer_cb, event
@@ -1835,7 +2529,11 @@ class SceneApi:
 
         # Run cleanup callback.
         if asyncio.iscoroutinefunction(self._scene_pointer_done_cb):
-            self._event_loop.create_task(self._scene_pointer_done_cb())
+            self._event_loop.create_task(
+                self._websock_interface._callback_monitor.run(
+                    self._scene_pointer_done_cb
+                )
+            )
         else:
             self._scene_pointer_done_cb()
 
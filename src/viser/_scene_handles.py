@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import copy
 import dataclasses
+import time
 import warnings
 from collections.abc import Coroutine
 from functools import cached_property
@@ -13,6 +14,7 @@ from typing import (
     Generic,
     Literal,
     Protocol,
+    Sequence,
     TypeVar,
     Union,
     cast,
@@ -43,6 +45,33 @@ def colors_to_uint8(colors: np.ndarray) -> onpt.NDArray[np.uint8]:
     return colors
 
 
+def _readonly_view(array: np.ndarray) -> np.ndarray:
+    """Get a read-only view of an array, without copying."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+TProps = TypeVar("TProps")
+
+
+def _share_props(props: TProps) -> TProps:
+    """Copy scene node props for a handle. Arrays are not copied: they're shared
+    with the buffered message via read-only views, and replaced instead of
+    modified when props are assigned."""
+    out = copy.copy(props)
+    for field in dataclasses.fields(out):  # type: ignore
+        value = getattr(out, field.name)
+        if isinstance(value, np.ndarray):
+            setattr(out, field.name, _readonly_view(value))
+    return out
+
+
+_VERTEX_DELTA_KEYFRAME_INTERVAL = 30
+"""Number of mesh vertex updates between lossless keyframes, when using delta
+encoding."""
+
+
 class _OverridableScenePropApi:
     """Mixin that allows reading/assigning properties defined in each scene node message."""
 
@@ -50,43 +79,56 @@ class _OverridableScenePropApi:
         if name == "_impl":
             return object.__setattr__(self, name, value)
 
-        handle = cast(SceneNodeHandle, self)
-        # Get the value of the T TypeVar.
+        # If it's a property with a setter, use the setter. These can cast
+        # values before calling `_set_prop()`.
+        prop = getattr(self.__class__, name, None)
+        if isinstance(prop, property) and prop.fset is not None:
+            prop.fset(self, value)
+            return
+
         if name in self._prop_hints:
-            # Help the user with some casting...
-            hint = self._prop_hints[name]
-            if hint == onpt.NDArray[np.float32]:
-                value = value.astype(np.float32)
-            elif hint == onpt.NDArray[np.float16]:
-                value = value.astype(np.float16)
-            elif hint == onpt.NDArray[np.uint8] and "color" in name:
-                value = colors_to_uint8(value)
-
-            current_value = getattr(handle._impl.props, name)
-
-            # Do nothing if the value hasn't changed.
-            if isinstance(current_value, np.ndarray):
-                if current_value.data == value.data:
-                    return
-            elif current_value == value:
+            self._set_prop(name, value)
+        else:
+            return object.__setattr__(self, name, value)
+
+    def _set_prop(self, name: str, value: Any) -> None:
+        handle = cast(SceneNodeHandle, self)
+        input_value = value
+        # Help the user with some casting...
+        hint = self._prop_hints[name]
+        if hint == onpt.NDArray[np.float32]:
+            value = value.astype(np.float32)
+        elif hint == onpt.NDArray[np.float16]:
+            value = value.astype(np.float16)
+        elif hint == onpt.NDArray[np.uint8] and "color" in name:
+            value = colors_to_uint8(value)
+        elif hint == onpt.NDArray[np.bool_]:
+            value = np.asarray(value, dtype=np.bool_)
+
+        current_value = getattr(handle._impl.props, name)
+
+        # Do nothing if the value hasn't changed.
+        if isinstance(current_value, np.ndarray):
+            if current_value.data == value.data:
                 return
+        elif current_value == value:
+            return
 
-            # Update the value.
-            if isinstance(value, np.ndarray):
-                assert value.dtype == current_value.dtype
-                if value.shape == current_value.shape:
-                    current_value[:] = value
-                else:
-                    setattr(handle._impl.props, name, value.copy())
-            else:
-                # Non-array properties should be immutable, so no need to copy.
-                setattr(handle._impl.props, name, value)
+        # Update the value. Arrays may be shared with messages that are
+        # still buffered, so we replace them instead of writing into them.
+        if isinstance(value, np.ndarray):
+            assert value.dtype == current_value.dtype
+            if value is input_value:
+                value = value.copy()
+            value = _readonly_view(value)
 
-            handle._impl.api._websock_interface.queue_message(
-                _messages.SceneNodeUpdateMessage(handle.name, {name: value})
-            )
-        else:
-            return object.__setattr__(self, name, value)
+        message = _messages.SceneNodeUpdateMessage(handle.name, {name: value})
+        handle._impl.api._websock_interface.queue_message(message)
+
+        # Non-array properties should be immutable, so no need to copy. We
+        # read the value back from the message because large arrays may have
+        # been spilled to disk when it was buffered.
+        setattr(handle._impl.props, name, message.updates[name])
 
     def __getattr__(self, name: str) -> Any:
         if name in self._prop_hints:
@@ -181,7 +223,7 @@ class SceneNodeHandle:
         assert isinstance(message, _messages.Message)
         api._websock_interface.queue_message(message)
 
-        out = cls(_SceneNodeHandleState(name, copy.deepcopy(message.props), api))
+        out = cls(_SceneNodeHandleState(name, _share_props(message.props), api))
         api._handle_from_node_name[name] = out
 
         out.wxyz = wxyz
@@ -281,7 +323,7 @@ class SceneNodePointerEvent(Generic[TSceneNodeHandle]):
     """Screen position of the click on the screen (OpenCV image coordinates, 0 to 1).
     (0, 0) is the upper-left corner, (1, 1) is the bottom-right corner."""
     instance_index: int | None
-    """Instance ID of the clicked object, if applicable. Currently this is `None` for all objects except for the output of :meth:`SceneApi.add_batched_axes()`."""
+    """Instance ID of the clicked object, if applicable. Currently this is `None` for all objects except for the outputs of :meth:`SceneApi.add_batched_axes()`, :meth:`SceneApi.add_batched_meshes()`, :meth:`SceneApi.add_batched_glb()`, and :meth:`SceneApi.add_batched_camera_frustums()`."""
 
 
 NoneOrCoroutine = TypeVar("NoneOrCoroutine", None, Coroutine)
@@ -412,6 +454,48 @@ class CameraFrustumHandle(
         return x * 2.0, y * 2.0, z
 
 
+class BatchedCameraFrustumHandle(
+    _ClickableSceneNodeHandle,
+    _messages.BatchedCameraFrustumsProps,
+    _OverridableScenePropApi if not TYPE_CHECKING else object,
+):
+    """Handle for batched camera frustums."""
+
+    _images: np.ndarray | Sequence[np.ndarray] | None
+    _thumbnail_size: tuple[int, int]
+    _format: Literal["png", "jpeg"]
+    _jpeg_quality: int | None
+
+    @property
+    def images(self) -> np.ndarray | Sequence[np.ndarray] | None:
+        """Current images displayed on the frustums. Synchronized automatically when assigned."""
+        return self._images
+
+    @images.setter
+    def images(self, images: np.ndarray | Sequence[np.ndarray] | None) -> None:
+        from ._scene_api import _encode_thumbnail_atlas
+
+        if images is None:
+            media_type, data, atlas_grid = None, None, (0, 0)
+        else:
+            assert len(images) == self.batched_wxyzs.shape[0], (
+                "Expected one image per frustum."
+            )
+            media_type, data, atlas_grid = _encode_thumbnail_atlas(
+                images,
+                self._thumbnail_size,
+                self._format,
+                self._jpeg_quality,
+            )
+        self._images = images
+
+        # The grid and media type should never be applied without the atlas.
+        with self._impl.api._websock_interface.atomic():
+            self.atlas_media_type = media_type
+            self.atlas_grid = atlas_grid
+            self._atlas_data = data
+
+
 class DirectionalLightHandle(
     SceneNodeHandle,
     _messages.DirectionalLightProps,
@@ -468,6 +552,47 @@ class PointCloudHandle(
     """Handle for point clouds. Does not support click events."""
 
 
+class DepthImagePointCloudHandle(
+    SceneNodeHandle,
+    _messages.DepthImagePointCloudProps,
+    _OverridableScenePropApi if not TYPE_CHECKING else object,
+):
+    """Handle for point clouds that are unprojected from depth images on the
+    client. Does not support click events."""
+
+    _depth: np.ndarray
+    _rgb: np.ndarray
+    _jpeg_quality: int | None
+
+    @property
+    def depth(self) -> np.ndarray:
+        """Current depth image. Synchronized automatically when assigned."""
+        return self._depth
+
+    @depth.setter
+    def depth(self, depth: np.ndarray) -> None:
+        from ._scene_api import _encode_depth_binary
+
+        self._depth = depth
+        self._depth_data = _encode_depth_binary(depth)
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """Current color image. Synchronized automatically when assigned."""
+        return self._rgb
+
+    @rgb.setter
+    def rgb(self, rgb: np.ndarray) -> None:
+        from ._scene_api import _encode_image_binary
+
+        self._rgb = rgb
+        media_type, data = _encode_image_binary(
+            rgb, self.rgb_media_type, jpeg_quality=self._jpeg_quality
+        )
+        self._rgb_data = data
+        del media_type
+
+
 class BatchedAxesHandle(
     _ClickableSceneNodeHandle,
     _messages.BatchedAxesProps,
@@ -476,6 +601,56 @@ class BatchedAxesHandle(
     """Handle for batched coordinate frames."""
 
 
+class BatchedMeshHandle(
+    _ClickableSceneNodeHandle,
+    _messages.BatchedMeshesProps,
+    _OverridableScenePropApi if not TYPE_CHECKING else object,
+):
+    """Handle for batched meshes, which share a geometry but have per-instance
+    transforms and colors."""
+
+    @property
+    def batched_scales(self) -> onpt.NDArray[np.float32]:
+        """Per-axis scales of each instance, with shape (N, 3). Can be assigned
+        a float, or an array with shape (3,), (N,), or (N, 3). Synchronized
+        automatically when assigned."""
+        return self._impl.props.batched_scales
+
+    @batched_scales.setter
+    def batched_scales(self, scales: float | tuple[float, ...] | np.ndarray) -> None:  # type: ignore
+        from ._scene_api import _cast_batched_scales
+
+        cast(_OverridableScenePropApi, self)._set_prop(
+            "batched_scales",
+            _cast_batched_scales(scales, self.batched_wxyzs.shape[0]),
+        )
+
+
+class BatchedGlbHandle(
+    _ClickableSceneNodeHandle,
+    _messages.BatchedGlbProps,
+    _OverridableScenePropApi if not TYPE_CHECKING else object,
+):
+    """Handle for batched GLB objects, which share GLB data but have
+    per-instance transforms."""
+
+    @property
+    def batched_scales(self) -> onpt.NDArray[np.float32]:
+        """Per-axis scales of each instance, with shape (N, 3). Can be assigned
+        a float, or an array with shape (3,), (N,), or (N, 3). Synchronized
+        automatically when assigned."""
+        return self._impl.props.batched_scales
+
+    @batched_scales.setter
+    def batched_scales(self, scales: float | tuple[float, ...] | np.ndarray) -> None:  # type: ignore
+        from ._scene_api import _cast_batched_scales
+
+        cast(_OverridableScenePropApi, self)._set_prop(
+            "batched_scales",
+            _cast_batched_scales(scales, self.batched_wxyzs.shape[0]),
+        )
+
+
 class FrameHandle(
     _ClickableSceneNodeHandle,
     _messages.FrameProps,
@@ -491,6 +666,81 @@ class MeshHandle(
 ):
     """Handle for mesh objects."""
 
+    _num_vertex_deltas: int = 0
+
+    def update_vertices(
+        self,
+        vertices: np.ndarray,
+        encoding: Literal["float32", "float16", "delta"] = "float16",
+    ) -> None:
+        """Update the vertex positions of the mesh, for example from a cloth or
+        soft-body simulation.
+
+        Unlike assigning `vertices`, faces are never resent and the mesh is not
+        recreated on the client: positions are written into the existing
+        geometry. Vertex normals are recomputed by the client; with
+        `flat_shading=True` they are derived on the GPU instead.
+
+        Args:
+            vertices: New vertex positions. Should have shape (V, 3), with the
+                same number of vertices as the mesh.
+            encoding: Encoding for the positions. 'float32' is lossless, and
+                'float16' halves the message size. 'delta' sends offsets from
+                the previous positions quantized to int16, with a lossless
+                keyframe every few updates to bound quantization error.
+        """
+        vertices = np.asarray(vertices, dtype=np.float32)
+        prev_vertices = self._impl.props.vertices
+        assert vertices.shape == prev_vertices.shape, (
+            "The number of vertices should not change. Assign to `vertices` instead."
+        )
+        if np.array_equal(vertices, prev_vertices):
+            return
+
+        websock_interface = self._impl.api._websock_interface
+        if (
+            encoding == "delta"
+            and self._num_vertex_deltas < _VERTEX_DELTA_KEYFRAME_INTERVAL - 1
+        ):
+            # Offsets are computed from the positions that clients have, which
+            # prevents quantization error from accumulating.
+            offsets = vertices - prev_vertices
+            delta_scale = float(np.max(np.abs(offsets))) / 32767.0
+            quantized = np.round(offsets / delta_scale).astype(np.int16)
+            self._num_vertex_deltas += 1
+            self._impl.props.vertices = _readonly_view(
+                prev_vertices + quantized.astype(np.float32) * np.float32(delta_scale)
+            )
+            message = _messages.MeshVerticesMessage(
+                self._impl.name,
+                encoding="delta_int16",
+                data=quantized.tobytes(),
+                delta_scale=delta_scale,
+                delta_index=self._num_vertex_deltas,
+            )
+        else:
+            if self._num_vertex_deltas > 0:
+                # Deltas are no longer needed by new clients.
+                self._num_vertex_deltas = 0
+                websock_interface.get_message_buffer().remove_from_buffer(
+                    lambda message: isinstance(message, _messages.MeshVerticesMessage)
+                    and message.name == self._impl.name
+                )
+            if encoding == "float16":
+                data = vertices.astype(np.float16)
+                self._impl.props.vertices = _readonly_view(data.astype(np.float32))
+            else:
+                data = vertices
+                self._impl.props.vertices = _readonly_view(vertices.copy())
+            message = _messages.MeshVerticesMessage(
+                self._impl.name,
+                encoding="float16" if encoding == "float16" else "float32",
+                data=data.tobytes(),
+                delta_scale=1.0,
+                delta_index=0,
+            )
+        websock_interface.queue_message(message)
+
 
 class GaussianSplatHandle(
     _ClickableSceneNodeHandle,
@@ -515,6 +765,220 @@ class MeshSkinnedHandle(
     ):
         super().__init__(impl)
         self.bones = bones
+        self._animation: _AnimationPlaybackState | None = None
+
+    def set_bone_poses(
+        self,
+        wxyzs: tuple[tuple[float, float, float, float], ...] | np.ndarray,
+        positions: tuple[tuple[float, float, float], ...] | np.ndarray,
+    ) -> None:
+        """Set the poses of all bones at once.
+
+        This is equivalent to assigning `.wxyz` and `.position` for each handle
+        in `bones`, but sends a single packed message instead of two messages
+        per bone. When called inside of `atomic()`, all bone poses are applied
+        in the same frame as other updates.
+
+        Args:
+            wxyzs: Bone orientations. Should have shape (B, 4).
+            positions: Bone positions. Should have shape (B, 3).
+        """
+        num_bones = len(self.bones)
+        wxyzs = np.asarray(wxyzs)
+        positions = np.asarray(positions)
+        assert wxyzs.shape == (num_bones, 4)
+        assert positions.shape == (num_bones, 3)
+
+        poses = np.concatenate([wxyzs, positions], axis=-1)
+        prev_poses = np.stack(
+            [np.concatenate([b._impl.wxyz, b._impl.position]) for b in self.bones]
+        )
+        if np.allclose(poses, prev_poses):
+            return
+
+        for i, bone in enumerate(self.bones):
+            bone._impl.wxyz[:] = wxyzs[i]
+            bone._impl.position[:] = positions[i]
+        self._impl.api._websock_interface.queue_message(
+            _messages.SetBonePosesMessage(self._impl.name, poses.astype(np.float32))
+        )
+
+    def set_animation(
+        self,
+        timestamps: tuple[float, ...] | np.ndarray,
+        bone_wxyzs: np.ndarray,
+        bone_positions: np.ndarray,
+        loop: bool = True,
+        play: bool = True,
+    ) -> None:
+        """Upload a bone animation clip, which is played back on the client.
+
+        The clip is sent once. Playback, seeking, and interpolation between
+        keyframes then happen in the browser, and only small control messages
+        are sent by :meth:`play()`, :meth:`pause()`, and :meth:`seek()`. While a
+        clip is set, it takes precedence over the poses in `bones`.
+
+        Args:
+            timestamps: Time of each keyframe in seconds. Should have shape (T,)
+                and be increasing.
+            bone_wxyzs: Bone orientations for each keyframe. Should have shape
+                (T, B, 4).
+            bone_positions: Bone positions for each keyframe. Should have shape
+                (T, B, 3).
+            loop: Whether to loop the clip. Otherwise, playback holds the last
+                keyframe.
+            play: Whether to start playing immediately.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float32)
+        num_frames = timestamps.shape[0]
+        assert num_frames > 0, "Animation clips should have at least one keyframe."
+        assert np.all(np.diff(timestamps) >= 0), "Timestamps should be increasing."
+        assert bone_wxyzs.shape == (num_frames, len(self.bones), 4)
+        assert bone_positions.shape == (num_frames, len(self.bones), 3)
+
+        start_time = float(timestamps[0])
+        self._animation = _AnimationPlaybackState(
+            start_time=start_time,
+            end_time=float(timestamps[-1]),
+            loop=loop,
+            playing=play,
+            time=start_time,
+            rate=1.0,
+            wall_time=time.time(),
+        )
+        poses = np.concatenate([bone_wxyzs, bone_positions], axis=-1)
+        websock_interface = self._impl.api._websock_interface
+        with websock_interface.atomic():
+            websock_interface.queue_message(
+                _messages.SkinnedMeshAnimationMessage(
+                    self._impl.name,
+                    timestamps=timestamps,
+                    poses=poses.astype(np.float32),
+                    loop=loop,
+                )
+            )
+            self._send_animation_playback()
+        self._impl.api._animated_mesh_from_name[self._impl.name] = self
+
+    def clear_animation(self) -> None:
+        """Remove the animation clip. Bones return to the poses in `bones`."""
+        if self._animation is None:
+            return
+        self._animation = None
+        self._impl.api._animated_mesh_from_name.pop(self._impl.name, None)
+        websock_interface = self._impl.api._websock_interface
+        websock_interface.get_message_buffer().remove_from_buffer(
+            # Don't send outdated playback state to new clients.
+            lambda message: isinstance(
+                message, _messages.SkinnedMeshAnimationPlaybackMessage
+            )
+            and message.name == self._impl.name
+        )
+        websock_interface.queue_message(
+            _messages.SkinnedMeshAnimationMessage(
+                self._impl.name,
+                timestamps=np.zeros((0,), dtype=np.float32),
+                poses=np.zeros((0, len(self.bones), 7), dtype=np.float32),
+                loop=False,
+            )
+        )
+
+    @property
+    def animation_time(self) -> float | None:
+        """Current time in the animation clip, in seconds. `None` if no clip is
+        set."""
+        if self._animation is None:
+            return None
+        return self._animation.current_time()
+
+    def play(self, rate: float | None = None) -> None:
+        """Play the animation clip.
+
+        Args:
+            rate: Optional playback rate. 1.0 is real-time; if `None`, the
+                current rate is kept.
+        """
+        anim = self._get_animation()
+        anim.time = anim.current_time()
+        anim.wall_time = time.time()
+        anim.playing = True
+        if rate is not None:
+            anim.rate = rate
+        self._send_animation_playback()
+
+    def pause(self) -> None:
+        """Pause the animation clip at the current time."""
+        anim = self._get_animation()
+        anim.time = anim.current_time()
+        anim.wall_time = time.time()
+        anim.playing = False
+        self._send_animation_playback()
+
+    def seek(self, time_seconds: float) -> None:
+        """Jump to a time in the animation clip, without changing whether it is
+        playing.
+
+        Args:
+            time_seconds: Clip time to jump to, in seconds.
+        """
+        anim = self._get_animation()
+        anim.time = float(np.clip(time_seconds, anim.start_time, anim.end_time))
+        anim.wall_time = time.time()
+        self._send_animation_playback()
+
+    def _sync_animation_clock(self) -> None:
+        """Update the clip time in the buffered playback message of a playing
+        clip, for clients that are connecting. The buffered message otherwise
+        holds the time from the last control call. Connected clients aren't
+        sent anything."""
+        anim = self._animation
+        if anim is None or not anim.playing:
+            return
+        self._impl.api._websock_interface.get_message_buffer().replace_buffered(
+            self._playback_message(anim.current_time())
+        )
+
+    def _get_animation(self) -> _AnimationPlaybackState:
+        assert self._animation is not None, (
+            "No animation clip is set. Call `set_animation()` first."
+        )
+        return self._animation
+
+    def _send_animation_playback(self) -> None:
+        self._impl.api._websock_interface.queue_message(
+            self._playback_message(self._get_animation().time)
+        )
+
+    def _playback_message(
+        self, time: float
+    ) -> _messages.SkinnedMeshAnimationPlaybackMessage:
+        anim = self._get_animation()
+        return _messages.SkinnedMeshAnimationPlaybackMessage(
+            self._impl.name, playing=anim.playing, time=time, rate=anim.rate
+        )
+
+
+@dataclasses.dataclass
+class _AnimationPlaybackState:
+    """Server-side mirror of a client's animation clock."""
+
+    start_time: float
+    end_time: float
+    loop: bool
+    playing: bool
+    time: float
+    """Clip time at `wall_time`."""
+    rate: float
+    wall_time: float
+
+    def current_time(self) -> float:
+        if not self.playing:
+            return self.time
+        t = self.time + (time.time() - self.wall_time) * self.rate
+        duration = self.end_time - self.start_time
+        if self.loop and duration > 0.0:
+            return self.start_time + (t - self.start_time) % duration
+        return min(max(t, self.start_time), self.end_time)
 
 
 @dataclasses.dataclass
@@ -746,3 +1210,214 @@ class Gui3dContainerHandle(
         for child in tuple(self._children.values()):
             child.remove()
         self._gui_api._container_handle_from_uuid.pop(self._container_id)
+
+
+@dataclasses.dataclass(frozen=True)
+class TimelineEvent:
+    """Event passed to timeline callbacks."""
+
+    client: ClientHandle
+    """Client whose timeline changed."""
+    client_id: int
+    """ID of client whose timeline changed."""
+    target: TimelineHandle
+    """Timeline that changed."""
+    time: float
+    """Current timeline time of the client, in seconds."""
+    frame_index: int | None
+    """Index of the active frame. `None` if no frame is active."""
+
+
+@dataclasses.dataclass
+class _TimelineState:
+    api: SceneApi
+    playing: bool
+    time: float
+    """Timeline time at `wall_time`."""
+    rate: float
+    loop: bool
+    show_controls: bool
+    wall_time: float
+    frame_timestamps: list[float] = dataclasses.field(default_factory=list)
+    time_cb: list[Callable[[TimelineEvent], None | Coroutine]] = dataclasses.field(
+        default_factory=list
+    )
+    removed: bool = False
+
+    def current_time(self) -> float:
+        """Server-side mirror of the client's timeline clock."""
+        if not self.playing:
+            return self.time
+        t = self.time + (time.time() - self.wall_time) * self.rate
+
+        # Like in the client, the last frame is shown for as long as the
+        # interval before it.
+        timestamps = self.frame_timestamps
+        if len(timestamps) == 0:
+            return t
+        start = timestamps[0]
+        end = timestamps[-1] + (
+            timestamps[-1] - timestamps[-2] if len(timestamps) >= 2 else 0.0
+        )
+        duration = end - start
+        if self.loop and duration > 0.0:
+            return start + (t - start) % duration
+        return min(max(t, start), end)
+
+    def reanchor(self) -> None:
+        """Move the anchor of the clock to the current time."""
+        self.time = self.current_time()
+        self.wall_time = time.time()
+
+
+class TimelineHandle:
+    """Handle for the scene timeline. Frames are sent to clients once, and then
+    played back and scrubbed locally in each client."""
+
+    def __init__(self, impl: _TimelineState) -> None:
+        self._impl = impl
+
+    @property
+    def num_frames(self) -> int:
+        """Number of frames that have been added to the timeline."""
+        return len(self._impl.frame_timestamps)
+
+    def add_frame(
+        self, timestamp: float, nodes: Sequence[str | SceneNodeHandle]
+    ) -> int:
+        """Add a frame to the timeline. Nodes in the frame are shown only while
+        the frame is active: from its timestamp until the timestamp of the next
+        frame.
+
+        Args:
+            timestamp: Time when the frame becomes active, in seconds. Should
+                not be smaller than the timestamp of the previous frame.
+            nodes: Scene node names or handles to show for this frame. Children
+                of these nodes are shown and hidden with them.
+
+        Returns:
+            Index of the new frame.
+        """
+        timestamps = self._impl.frame_timestamps
+        assert len(timestamps) == 0 or timestamp >= timestamps[-1], (
+            "Frames should be added in order of increasing timestamp."
+        )
+        timestamps.append(float(timestamp))
+        self._impl.api._websock_interface.queue_message(
+            _messages.TimelineFrameMessage(
+                index=len(timestamps) - 1,
+                timestamp=float(timestamp),
+                node_names=tuple(
+                    node if isinstance(node, str) else node.name for node in nodes
+                ),
+            )
+        )
+        return len(timestamps) - 1
+
+    def play(self, rate: float | None = None) -> None:
+        """Play the timeline on all clients.
+
+        Args:
+            rate: Optional playback rate. 1.0 is real-time; if `None`, the
+                current rate is kept.
+        """
+        self._impl.reanchor()
+        self._impl.playing = True
+        if rate is not None:
+            self._impl.rate = rate
+        self._send_config()
+
+    def pause(self) -> None:
+        """Pause the timeline on all clients, at the current time."""
+        self._impl.reanchor()
+        self._impl.playing = False
+        self._send_config()
+
+    def seek(self, time_seconds: float) -> None:
+        """Jump to a time in the timeline on all clients, without changing whether
+        it is playing.
+
+        Args:
+            time_seconds: Timeline time to jump to, in seconds.
+        """
+        self._impl.time = float(time_seconds)
+        self._impl.wall_time = time.time()
+        self._send_config()
+
+    def on_time_change(
+        self, func: Callable[[TimelineEvent], NoneOrCoroutine]
+    ) -> Callable[[TimelineEvent], NoneOrCoroutine]:
+        """Attach a callback for when the active frame of a client's timeline
+        changes, either from playback or from scrubbing.
+
+        Clients only send their timeline time to the server when at least one
+        callback is attached.
+
+        The callback can be either a standard function or an async function:
+        - Standard functions (def) will be executed in a threadpool.
+        - Async functions (async def) will be executed in the event loop.
+        """
+        self._impl.time_cb.append(func)
+        if len(self._impl.time_cb) == 1:
+            self._send_config()
+        return func
+
+    def remove_time_callback(self, callback: Literal["all"] | Callable = "all") -> None:
+        """Remove time callbacks from the timeline.
+
+        Args:
+            callback: Either "all" to remove all callbacks, or a specific callback function to remove.
+        """
+        if callback == "all":
+            self._impl.time_cb.clear()
+        else:
+            self._impl.time_cb = [cb for cb in self._impl.time_cb if cb != callback]
+        if len(self._impl.time_cb) == 0:
+            self._send_config()
+
+    def remove(self) -> None:
+        """Remove the timeline. All nodes in the timeline are shown again."""
+        if self._impl.removed:
+            warnings.warn("Attempted to remove already removed timeline.")
+            return
+        self._impl.removed = True
+        if self._impl.api._timeline_handle is self:
+            self._impl.api._timeline_handle = None
+
+        websock_interface = self._impl.api._websock_interface
+        websock_interface.get_message_buffer().remove_from_buffer(
+            # Don't send the removed timeline to new clients.
+            lambda message: isinstance(
+                message, (_messages.TimelineMessage, _messages.TimelineFrameMessage)
+            )
+        )
+        websock_interface.queue_message(_messages.TimelineRemoveMessage())
+
+    def _send_config(self) -> None:
+        """Send the timeline config. Playback time is sent from the
+        server-side clock, so clients that are playing stay in sync."""
+        if self._impl.removed:
+            return
+        self._impl.reanchor()
+        self._impl.api._websock_interface.queue_message(
+            self._config_message(self._impl.time)
+        )
+
+    def _sync_clock(self) -> None:
+        """Update the time in the buffered config of a playing timeline, for
+        clients that are connecting. Connected clients aren't sent anything."""
+        if self._impl.removed or not self._impl.playing:
+            return
+        self._impl.api._websock_interface.get_message_buffer().replace_buffered(
+            self._config_message(self._impl.current_time())
+        )
+
+    def _config_message(self, time: float) -> _messages.TimelineMessage:
+        return _messages.TimelineMessage(
+            playing=self._impl.playing,
+            time=time,
+            rate=self._impl.rate,
+            loop=self._impl.loop,
+            show_controls=self._impl.show_controls,
+            notify_time=len(self._impl.time_cb) > 0,
+        )
@@ -8,7 +8,7 @@ import threading
 import time
 import warnings
 from collections.abc import Coroutine
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, ContextManager, TypeVar, cast, overload
 
@@ -19,7 +19,7 @@ import rich
 from rich import box, style
 from rich.panel import Panel
 from rich.table import Table
-from typing_extensions import Literal
+from typing_extensions import Literal, ParamSpec
 
 from . import _client_autobuild, _messages, infra
 from . import transforms as tf
@@ -29,6 +29,7 @@ from ._scene_api import SceneApi, cast_vector
 from ._threadpool_exceptions import print_threadpool_errors
 from ._tunnel import ViserTunnel
 from .infra._infra import StateSerializer
+from .infra._recording import StreamingStateSerializer
 
 
 class _BackwardsCompatibilityShim:
@@ -328,6 +329,8 @@ class CameraHandle:
 
 
 NoneOrCoroutine = TypeVar("NoneOrCoroutine", None, Coroutine)
+P = ParamSpec("P")
+T = TypeVar("T")
 
 
 # Don't inherit from _BackwardsCompatibilityShim during type checking, because
@@ -567,6 +570,43 @@ class ClientHandle(_BackwardsCompatibilityShim if not TYPE_CHECKING else object)
         return out
 
 
+class _CountingThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool that counts callbacks that were submitted but haven't
+    started yet."""
+
+    def __init__(self, max_workers: int) -> None:
+        super().__init__(max_workers=max_workers)
+        self._queue_depth = 0
+        self._queue_depth_lock = threading.Lock()
+
+    def queue_depth(self) -> int:
+        return self._queue_depth
+
+    def submit(
+        self, fn: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs
+    ) -> Future[T]:
+        def run() -> T:
+            with self._queue_depth_lock:
+                self._queue_depth -= 1
+            return fn(*args, **kwargs)
+
+        with self._queue_depth_lock:
+            self._queue_depth += 1
+        try:
+            return super().submit(run)
+        except RuntimeError:
+            # Raised after shutdown.
+            with self._queue_depth_lock:
+                self._queue_depth -= 1
+            raise
+
+
+def _is_scene_message(message: infra.Message) -> bool:
+    """Filter for recorded messages. We don't record GUI messages; this feels
+    brittle."""
+    return "Gui" not in type(message).__name__
+
+
 class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
     """:class:`ViserServer` is the main class for working with viser. On
     instantiation, it (a) launches a thread with a web server and (b) provides
@@ -588,6 +628,23 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
         host: Host to bind server to.
         port: Port to bind server to.
         label: Label shown at the top of the GUI panel.
+        buffer_memory_limit: Approximate limit in bytes for scene and GUI data
+            that is kept in memory to send to new clients. Once exceeded, large
+            arrays are spilled to memory-mapped temporary files instead. None
+            means no limit.
+        buffer_spill_dir: Directory for spilled data. Defaults to the system
+            temporary directory.
+        metrics_endpoint: Serve runtime statistics at `/metrics`, in the
+            Prometheus text format. See :meth:`get_stats()`.
+        slow_callback_threshold: Warn when an async callback blocks the event
+            loop, which is shared by all clients, for longer than this many
+            seconds. None disables the warnings.
+        flight_recorder_sec: Keep scene messages from the last this many
+            seconds in memory, so they can be written to a file at any time
+            with :meth:`dump_flight_recording()`. None means no time limit.
+        flight_recorder_bytes: Approximate memory limit for messages kept by
+            the flight recorder. The flight recorder is enabled if either limit
+            is set.
     """
 
     # Hide deprecated arguments from docstring and type checkers.
@@ -597,6 +654,12 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
         port: int = 8080,
         label: str | None = None,
         verbose: bool = True,
+        buffer_memory_limit: int | None = None,
+        buffer_spill_dir: str | Path | None = None,
+        metrics_endpoint: bool = False,
+        slow_callback_threshold: float | None = 0.1,
+        flight_recorder_sec: float | None = None,
+        flight_recorder_bytes: int | None = None,
         **_deprecated_kwargs,
     ):
         # Create server.
@@ -607,8 +670,21 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
             http_server_root=Path(__file__).absolute().parent / "client" / "build",
             verbose=verbose,
             client_api_version=1,
+            buffer_memory_limit=buffer_memory_limit,
+            buffer_spill_dir=buffer_spill_dir,
+            metrics_endpoint=metrics_endpoint,
+            slow_callback_threshold=slow_callback_threshold,
         )
         self._websock_server = server
+        self._flight_recorder = (
+            server.start_flight_recorder(
+                _is_scene_message,
+                max_seconds=flight_recorder_sec,
+                max_bytes=flight_recorder_bytes,
+            )
+            if flight_recorder_sec is not None or flight_recorder_bytes is not None
+            else None
+        )
 
         _client_autobuild.ensure_client_is_built()
 
@@ -620,12 +696,21 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
             Callable[[ClientHandle], None | Coroutine]
         ] = []
 
-        self._thread_executor = ThreadPoolExecutor(max_workers=32)
+        self._thread_executor = _CountingThreadPoolExecutor(max_workers=32)
+        server.register_gauge(
+            "thread_pool_queue_depth",
+            # Callbacks that were submitted but haven't started yet.
+            self._thread_executor.queue_depth,
+        )
 
         # Run "garbage collector" on message buffer when new clients connect.
+        # Clocks of playing animations and timelines are also updated in the
+        # buffer, since playback messages hold the time from the last control
+        # call. This happens before the new client is sent buffered messages.
         @server.on_client_connect
         async def _(_: infra.WebsockClientConnection) -> None:
             self._run_garbage_collector()
+            self.scene._sync_playback_clocks()
 
         # For new clients, register and add a handler for camera messages.
         @server.on_client_connect
@@ -663,7 +748,7 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
                         self._connected_clients[conn.client_id] = client
                         for cb in self._client_connect_cb:
                             if asyncio.iscoroutinefunction(cb):
-                                await cb(client)
+                                await server._callback_monitor.run(cb, client)
                             else:
                                 self._thread_executor.submit(
                                     cb, client
@@ -671,7 +756,7 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
 
                 for camera_cb in client.camera._state.camera_cb:
                     if asyncio.iscoroutinefunction(camera_cb):
-                        await camera_cb(client.camera)
+                        await server._callback_monitor.run(camera_cb, client.camera)
                     else:
                         self._thread_executor.submit(
                             camera_cb, client.camera
@@ -689,7 +774,7 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
                 handle = self._connected_clients.pop(conn.client_id)
                 for cb in self._client_disconnect_cb:
                     if asyncio.iscoroutinefunction(cb):
-                        await cb(handle)
+                        await server._callback_monitor.run(cb, handle)
                     else:
                         self._thread_executor.submit(cb, handle).add_done_callback(
                             print_threadpool_errors
@@ -805,13 +890,22 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
                             _messages.SetOrientationMessage,
                             _messages.SetBonePositionMessage,
                             _messages.SetBoneOrientationMessage,
+                            _messages.SetBonePosesMessage,
+                            _messages.MeshVerticesMessage,
+                            _messages.SkinnedMeshAnimationMessage,
+                            _messages.SkinnedMeshAnimationPlaybackMessage,
                             _messages.SetSceneNodeClickableMessage,
                             _messages.SetSceneNodeVisibilityMessage,
+                            _messages.SceneNodeUpdateMessage,
                         ),
                     )
                     and message.name in remove_scene_names
                 ):
                     remove_message_ids.append(id)
+                if isinstance(message, _messages.SetPosesMessage) and all(
+                    name in remove_scene_names for name in message.names
+                ):
+                    remove_message_ids.append(id)
 
                 if (
                     isinstance(message, _messages.GuiUpdateMessage)
@@ -821,9 +915,46 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
 
             # Remove old messages.
             for id in remove_message_ids:
-                message = buffer.message_from_id.pop(id)
+                message = buffer._pop_message(id)
+                assert message is not None
                 buffer.id_from_redundancy_key.pop(message.redundancy_key())
 
+    def get_stats(self) -> infra.ServerStats:
+        """Get runtime statistics for the server: messages pushed, culled, and
+        sent, bytes sent to and received from each client, time spent encoding
+        and sending, event loop lag, and thread pool queue depth.
+
+        Returns:
+            Snapshot of server statistics.
+        """
+        return self._websock_server.get_stats()
+
+    def start_message_trace(
+        self, sample_rate: float = 1.0, max_events: int = 100_000
+    ) -> infra.MessageTracer:
+        """Start tracing the lifecycle of outgoing messages: when they're queued,
+        and when they're encoded and sent to each client. Traces can be saved
+        with :meth:`viser.infra.MessageTracer.save()` and viewed in
+        https://ui.perfetto.dev or `chrome://tracing`.
+
+        Args:
+            sample_rate: Fraction of messages to trace. Lower values reduce
+                overhead, which makes it practical to keep tracing enabled.
+            max_events: Maximum number of trace events to keep. Older events
+                are discarded.
+
+        Returns:
+            Tracer that records trace events until :meth:`stop_message_trace()`
+            is called.
+        """
+        tracer = infra.MessageTracer(sample_rate=sample_rate, max_events=max_events)
+        self._websock_server.set_tracer(tracer)
+        return tracer
+
+    def stop_message_trace(self) -> None:
+        """Stop tracing outgoing messages."""
+        self._websock_server.set_tracer(None)
+
     def get_host(self) -> str:
         """Returns the host address of the Viser server.
 
@@ -943,7 +1074,9 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
         # connect between the two lines.
         for client in clients:
             if asyncio.iscoroutinefunction(cb):
-                self._event_loop.create_task(cb(client))
+                self._event_loop.create_task(
+                    self._websock_server._callback_monitor.run(cb, client)
+                )
             else:
                 self._thread_executor.submit(cb, client).add_done_callback(
                     print_threadpool_errors
@@ -1058,8 +1191,82 @@ class ViserServer(_BackwardsCompatibilityShim if not TYPE_CHECKING else object):
         visualization.
         """
         serializer = self._websock_server.get_message_serializer(
-            # Don't record GUI messages. This feels brittle.
-            filter=lambda message: "Gui" not in type(message).__name__
+            filter=_is_scene_message
+        )
+        # Insert current scene state.
+        for message in self._websock_server._broadcast_buffer.message_from_id.values():
+            serializer._insert_message(message)
+        return serializer
+
+    def dump_flight_recording(
+        self,
+        path: str | Path,
+        compresslevel: int = 6,
+        keyframe_interval_sec: float | None = 10.0,
+    ) -> None:
+        """Write recent scene history to a .viser file. Requires the flight
+        recorder to be enabled via the `flight_recorder_sec` or
+        `flight_recorder_bytes` arguments of :class:`ViserServer`.
+
+        The file starts with the scene state from the beginning of the flight
+        recorder's window, followed by the messages sent since then, with
+        their original timing. It can be viewed like recordings from
+        :meth:`get_streaming_scene_serializer()`.
+
+        Args:
+            path: Path to write the recording to.
+            compresslevel: gzip compression level, from 0 to 9.
+            keyframe_interval_sec: Minimum recording time between keyframes.
+                None to disable keyframes.
+        """
+        assert self._flight_recorder is not None, (
+            "The flight recorder is not enabled. Set `flight_recorder_sec` or"
+            " `flight_recorder_bytes` when creating the server."
+        )
+        self._flight_recorder.dump(
+            Path(path),
+            compresslevel=compresslevel,
+            keyframe_interval_sec=keyframe_interval_sec,
+        )
+
+    def get_streaming_scene_serializer(
+        self,
+        path: str | Path,
+        chunk_size_bytes: int = 4 * 1024 * 1024,
+        compresslevel: int = 6,
+        keyframe_interval_sec: float | None = 10.0,
+    ) -> StreamingStateSerializer:
+        """Start recording the scene state directly to a .viser file.
+
+        Unlike :meth:`get_scene_serializer()`, messages are compressed and
+        written to disk in chunks as they are sent, so long recordings use a
+        bounded amount of memory. The file is finished by calling
+        :meth:`StreamingStateSerializer.close()`, or by using the serializer
+        as a context manager.
+
+        The file also includes periodic keyframes, which contain the full scene
+        state, and an index of them at the end of the file. These let the
+        viewer seek without replaying the recording from the start.
+
+        Args:
+            path: Path to write the recording to.
+            chunk_size_bytes: Approximate size of each chunk before
+                compression. Larger chunks compress better, but use more memory.
+            compresslevel: gzip compression level, from 0 to 9.
+            keyframe_interval_sec: Minimum recording time between keyframes.
+                Keyframes are skipped if they would be larger than the
+                messages recorded since the previous keyframe. None to disable
+                keyframes.
+
+        Returns:
+            Handle for inserting sleeps and closing the recording.
+        """
+        serializer = self._websock_server.get_streaming_message_serializer(
+            filter=_is_scene_message,
+            path=Path(path),
+            chunk_size_bytes=chunk_size_bytes,
+            compresslevel=compresslevel,
+            keyframe_interval_sec=keyframe_interval_sec,
         )
         # Insert current scene state.
         for message in self._websock_server._broadcast_buffer.message_from_id.values():
@@ -42,6 +42,7 @@ import { ndcFromPointerXy, opencvXyFromPointerXy } from "./ClickUtils";
 import { theme } from "./AppTheme";
 import { FrameSynchronizedMessageHandler } from "./MessageHandler";
 import { PlaybackFromFile } from "./FilePlayback";
+import { TimelineControls } from "./Timeline";
 import { SplatRenderContext } from "./Splatting/GaussianSplats";
 import { BrowserWarning } from "./BrowserWarning";
 import { AutoShadowDirectionalLight } from "./ThreeAssets";
@@ -118,6 +119,14 @@ function ViewerRoot() {
     }),
     canvas2dRef: React.useRef(null),
     skinnedMeshState: React.useRef({}),
+    meshVertexState: React.useRef({}),
+    timelineState: React.useRef({
+      config: null,
+      frames: [],
+      time: 0.0,
+      anchorMs: 0.0,
+      version: 0,
+    }),
   };
 
   // Set dark default if specified in URL.
@@ -132,6 +141,7 @@ function ViewerRoot() {
         {viewer.messageSource === "file_playback" ? (
           <PlaybackFromFile fileUrl={playbackPath!} />
         ) : null}
+        <TimelineControls />
         {showStats ? <Stats className="stats-panel" /> : null}
       </ViewerContents>
     </ViewerContext.Provider>
@@ -1,4 +1,4 @@
-import { decodeAsync, decode } from "@msgpack/msgpack";
+import { decodeAsync, decode, ExtensionCodec } from "@msgpack/msgpack";
 import { Message } from "./WebsocketMessages";
 import { decompress } from "fflate";
 
@@ -19,59 +19,394 @@ import {
   IconPlayerPlayFilled,
 } from "@tabler/icons-react";
 
-/** Download, decompress, and deserialize a file, which should be serialized
- * via msgpack and compressed via gzip. Also takes a hook for status updates. */
-async function deserializeGzippedMsgpackFile<T>(
+/** Chunks of a .viser recording. Recordings written incrementally by
+ * `get_streaming_scene_serializer()` contain a header, message chunks
+ * interleaved with keyframes, an index, and a fixed-size footer. */
+type RecordingChunk =
+  | { type: "header"; formatVersion: number; viserVersion: string }
+  // Messages are (time in seconds, message) tuples.
+  | {
+      type: "messages";
+      blobs: [number, Uint8Array][];
+      messages: [number, Message][];
+    }
+  // Compacted scene state. Only applied when playback starts at a keyframe.
+  | {
+      type: "keyframe";
+      time: number;
+      blobs: [number, Uint8Array][];
+      messages: [number, Message][];
+    }
+  | {
+      type: "end";
+      durationSeconds: number;
+      seekPoints?: [number, number][]; // (time in seconds, byte offset).
+    }
+  | { type: "footer"; indexOffset: number };
+
+/** Duration and seek points of a chunked recording. Playback can start from
+ * the byte offset of any seek point. */
+interface RecordingIndex {
+  durationSeconds: number;
+  seekPoints: [number, number][]; // (time in seconds, byte offset).
+}
+
+/** Recordings from `StateSerializer.serialize()`, which are a single
+ * msgpack object. */
+interface SerializedMessages {
+  durationSeconds: number;
+  blobs?: [number, Uint8Array][]; // (blob ID, payload).
+  // Exported bundles store large payloads in separate files.
+  blobFiles?: [number, string, number][]; // (blob ID, relative path, size).
+  messages: [number, Message][]; // (time in seconds, message).
+  viserVersion: string;
+}
+
+/** Reference to a deduplicated payload, which is stored as a blob. */
+class BlobRef {
+  constructor(public id: number) {}
+}
+
+/** msgpack extension type for blob references. Should match `BLOB_EXT_CODE`
+ * in Python. */
+const BLOB_EXT_CODE = 1;
+const extensionCodec = new ExtensionCodec();
+extensionCodec.register({
+  type: BLOB_EXT_CODE,
+  encode: () => null,
+  decode: (data: Uint8Array) =>
+    new BlobRef(
+      new DataView(data.buffer, data.byteOffset, data.byteLength).getUint32(
+        0,
+        true,
+      ),
+    ),
+});
+
+/** Replace blob references in a decoded value with their payloads, in
+ * place. */
+function resolveBlobs(value: any, blobs: Map<number, Uint8Array>): any {
+  if (value instanceof BlobRef) {
+    const blob = blobs.get(value.id);
+    if (blob === undefined) throw new Error(`Missing blob: ${value.id}`);
+    return blob;
+  } else if (Array.isArray(value)) {
+    for (let i = 0; i < value.length; i++)
+      value[i] = resolveBlobs(value[i], blobs);
+  } else if (
+    value !== null &&
+    typeof value === "object" &&
+    !(value instanceof Uint8Array)
+  ) {
+    for (const key in value) value[key] = resolveBlobs(value[key], blobs);
+  }
+  return value;
+}
+
+/** Get the IDs of blobs that a decoded value references. */
+function getBlobIds(value: any, out: number[] = []): number[] {
+  if (value instanceof BlobRef) {
+    out.push(value.id);
+  } else if (Array.isArray(value)) {
+    for (const item of value) getBlobIds(item, out);
+  } else if (
+    value !== null &&
+    typeof value === "object" &&
+    !(value instanceof Uint8Array)
+  ) {
+    for (const key in value) getBlobIds(value[key], out);
+  }
+  return out;
+}
+
+/** Size of the gzip member headers in chunked recordings. */
+const CHUNK_HEADER_SIZE = 20;
+
+/** Size of the footer chunk, which ends recordings with an index. */
+const FOOTER_SIZE = 67;
+
+/** Get the size of a gzip member in a recording, which is stored in an extra
+ * subfield. Chunked recordings use "VC" subfields, and recordings from
+ * `serialize()` use "VS". Returns null for other gzip members. */
+function readMemberSize(
+  header: Uint8Array,
+  subfieldId: "VC" | "VS",
+): number | null {
+  if (
+    header.length < CHUNK_HEADER_SIZE ||
+    header[0] !== 0x1f ||
+    header[1] !== 0x8b ||
+    header[2] !== 0x08 ||
+    header[3] !== 0x04 ||
+    header[12] !== subfieldId.charCodeAt(0) ||
+    header[13] !== subfieldId.charCodeAt(1)
+  )
+    return null;
+  return new DataView(
+    header.buffer,
+    header.byteOffset,
+    header.byteLength,
+  ).getUint32(16, true);
+}
+
+/** Decompress a gzip member. */
+async function gunzip(data: Uint8Array): Promise<Uint8Array> {
+  if (typeof DecompressionStream === "undefined") {
+    return new Promise((resolve, reject) =>
+      decompress(data, (error, result) =>
+        error ? reject(error) : resolve(result),
+      ),
+    );
+  }
+  const stream = new Blob([data])
+    .stream()
+    .pipeThrough(new DecompressionStream("gzip"));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+/** Fetch the index of a chunked recording via HTTP range requests. Returns null
+ * if the recording has no index, or if the server doesn't support ranges. */
+async function loadIndex(fileUrl: string): Promise<RecordingIndex | null> {
+  const controller = new AbortController();
+  const footerResponse = await fetch(fileUrl, {
+    headers: { Range: `bytes=-${FOOTER_SIZE}` },
+    signal: controller.signal,
+  });
+  if (footerResponse.status !== 206) {
+    // Don't download the full file twice.
+    controller.abort();
+    return null;
+  }
+  const footerBytes = new Uint8Array(await footerResponse.arrayBuffer());
+  if (readMemberSize(footerBytes, "VC") !== FOOTER_SIZE) return null;
+  const footer = decode(await gunzip(footerBytes)) as RecordingChunk;
+  if (footer.type !== "footer") return null;
+
+  // Content-Range is formatted as "bytes start-end/total".
+  const totalSize = parseInt(
+    footerResponse.headers.get("Content-Range")!.split("/")[1],
+  );
+  const indexResponse = await fetch(fileUrl, {
+    headers: {
+      Range: `bytes=${footer.indexOffset}-${totalSize - FOOTER_SIZE - 1}`,
+    },
+  });
+  const index = decode(
+    await gunzip(new Uint8Array(await indexResponse.arrayBuffer())),
+  ) as RecordingChunk;
+  if (index.type !== "end" || index.seekPoints === undefined) return null;
+  return {
+    durationSeconds: index.durationSeconds,
+    seekPoints: index.seekPoints,
+  };
+}
+
+/** Download, decompress, and deserialize a recording, which should be
+ * serialized via msgpack and compressed via gzip. Chunked recordings are
+ * passed to `onChunk()` progressively, as each chunk is downloaded, and can be
+ * loaded starting from the byte offset of any chunk. Messages of exported
+ * bundles are passed on progressively as their payload files arrive. Also
+ * takes a hook for status updates. */
+async function loadRecording(
   fileUrl: string,
   setStatus: (status: { downloaded: number; total: number }) => void,
-): Promise<T> {
-  const response = await fetch(fileUrl);
+  onChunk: (chunk: RecordingChunk) => void,
+  offset: number,
+  signal: AbortSignal,
+): Promise<void> {
+  const response = await fetch(fileUrl, {
+    headers: offset === 0 ? {} : { Range: `bytes=${offset}-` },
+    signal: signal,
+  });
   if (!response.ok) {
     throw new Error(`Failed to fetch the file: ${response.statusText}`);
   }
-  return new Promise<T>((resolve) => {
-    const gzipTotalLength = parseInt(response.headers.get("Content-Length")!);
+  const gzipTotalLength = parseInt(response.headers.get("Content-Length")!);
+  const reader = response.body!.getReader();
+
+  // Downloaded bytes that haven't been consumed yet.
+  const pieces: Uint8Array[] = [];
+  let buffered = 0;
+  let gzipReceived = 0;
+
+  /** Read from the network until `length` bytes are buffered. Returns false if
+   * the file ends first. */
+  async function fill(length: number): Promise<boolean> {
+    while (buffered < length) {
+      const { done, value } = await reader.read();
+      if (done) return false;
+      pieces.push(value);
+      buffered += value.length;
+      gzipReceived += value.length;
+      setStatus({ downloaded: gzipReceived, total: gzipTotalLength });
+    }
+    return true;
+  }
+
+  /** Consume `length` buffered bytes. */
+  function consume(length: number): Uint8Array {
+    const out = new Uint8Array(length);
+    let offset = 0;
+    while (offset < length) {
+      const piece = pieces[0];
+      const count = Math.min(piece.length, length - offset);
+      out.set(piece.subarray(0, count), offset);
+      offset += count;
+      if (count === piece.length) pieces.shift();
+      else pieces[0] = piece.subarray(count);
+    }
+    buffered -= length;
+    return out;
+  }
+
+  /** Get buffered bytes, without consuming them. */
+  function peek(length: number): Uint8Array {
+    const out = consume(length);
+    pieces.unshift(out);
+    buffered += out.length;
+    return out;
+  }
+
+  /** Read the next gzip member, which should store its size in an extra
+   * subfield. Returns null at the end of the file. */
+  async function readMember(
+    subfieldId: "VC" | "VS",
+  ): Promise<Uint8Array | null> {
+    if (!(await fill(CHUNK_HEADER_SIZE))) return null;
+    const header = consume(CHUNK_HEADER_SIZE);
+    const memberSize = readMemberSize(header, subfieldId);
+    if (memberSize === null || !(await fill(memberSize - CHUNK_HEADER_SIZE)))
+      throw new Error("Recording is corrupted.");
+    const member = new Uint8Array(memberSize);
+    member.set(header);
+    member.set(consume(memberSize - CHUNK_HEADER_SIZE), CHUNK_HEADER_SIZE);
+    return member;
+  }
+
+  await fill(CHUNK_HEADER_SIZE);
+  const firstHeader = peek(Math.min(buffered, CHUNK_HEADER_SIZE));
+
+  // Chunked recording: decode one gzip member at a time. Blobs are only
+  // referenced after the last keyframe, so we can discard older ones.
+  if (readMemberSize(firstHeader, "VC") !== null) {
+    let blobs = new Map<number, Uint8Array>();
+    let member: Uint8Array | null;
+    while ((member = await readMember("VC")) !== null) {
+      const chunk = decode(await gunzip(member), {
+        extensionCodec,
+      }) as RecordingChunk;
+      if (chunk.type === "keyframe") blobs = new Map(chunk.blobs);
+      if (chunk.type === "messages")
+        for (const [id, blob] of chunk.blobs) blobs.set(id, blob);
+      if (chunk.type === "keyframe" || chunk.type === "messages")
+        resolveBlobs(chunk.messages, blobs);
+      onChunk(chunk);
+    }
+    return;
+  }
+
+  // Single-object recording: stream fetch -> gzip -> msgpack.
+  let data: SerializedMessages;
+  if (readMemberSize(firstHeader, "VS") !== null) {
+    // The object is split into gzip members, which we decompress one at a
+    // time. This doesn't rely on browser support for multi-member streams.
+    const msgpackStream = new ReadableStream<Uint8Array>({
+      async pull(controller) {
+        const member = await readMember("VS");
+        if (member === null) controller.close();
+        else controller.enqueue(await gunzip(member));
+      },
+    });
+    data = (await decodeAsync(msgpackStream, {
+      extensionCodec,
+    })) as SerializedMessages;
+  } else {
+    const gzipStream = new ReadableStream<Uint8Array>({
+      async pull(controller) {
+        if (pieces.length > 0 || (await fill(1))) {
+          buffered -= pieces[0].length;
+          controller.enqueue(pieces.shift()!);
+        } else {
+          controller.close();
+        }
+      },
+    });
     if (typeof DecompressionStream === "undefined") {
       // Implementation without DecompressionStream.
       console.log("DecompressionStream is unavailable. Using fallback.");
-      setStatus({ downloaded: 0.1 * gzipTotalLength, total: gzipTotalLength });
-      response.arrayBuffer().then((buffer) => {
-        setStatus({
-          downloaded: 0.8 * gzipTotalLength,
-          total: gzipTotalLength,
-        });
-        decompress(new Uint8Array(buffer), (error, result) => {
-          setStatus({
-            downloaded: 1.0 * gzipTotalLength,
-            total: gzipTotalLength,
-          });
-          resolve(decode(result) as T);
-        });
-      });
+      data = decode(
+        await gunzip(
+          new Uint8Array(await new Response(gzipStream).arrayBuffer()),
+        ),
+        { extensionCodec },
+      ) as SerializedMessages;
     } else {
-      // Stream: fetch -> gzip -> msgpack.
-      let gzipReceived = 0;
-      const progressStream = // Count number of (compressed) bytes.
-        new TransformStream({
-          transform(chunk, controller) {
-            gzipReceived += chunk.length;
-            setStatus({ downloaded: gzipReceived, total: gzipTotalLength });
-            controller.enqueue(chunk);
-          },
-        });
-      decodeAsync(
-        response
-          .body!.pipeThrough(progressStream)
-          .pipeThrough(new DecompressionStream("gzip")),
-      ).then((val) => resolve(val as T));
+      data = (await decodeAsync(
+        gzipStream.pipeThrough(new DecompressionStream("gzip")),
+        { extensionCodec },
+      )) as SerializedMessages;
     }
+  }
+  onChunk({
+    type: "header",
+    formatVersion: 0,
+    viserVersion: data.viserVersion,
   });
+  const blobs = new Map(data.blobs ?? []);
+  if (data.blobFiles === undefined || data.blobFiles.length === 0) {
+    resolveBlobs(data.messages, blobs);
+    onChunk({ type: "messages", blobs: [], messages: data.messages });
+    onChunk({ type: "end", durationSeconds: data.durationSeconds });
+    return;
+  }
+
+  // Download payload files in parallel. Messages are passed on in order, as
+  // the files that they reference arrive.
+  const baseUrl = new URL(fileUrl, window.location.href);
+  const total =
+    gzipTotalLength +
+    data.blobFiles.reduce((sum, [, , size]) => sum + size, 0);
+  let downloaded = gzipTotalLength;
+  const blobDownloads = new Map(
+    data.blobFiles.map(([id, path]): [number, Promise<void>] => {
+      const download = fetch(new URL(path, baseUrl), { signal })
+        .then((response) => {
+          if (!response.ok)
+            throw new Error(`Failed to fetch ${path}: ${response.statusText}`);
+          return response.arrayBuffer();
+        })
+        .then((buffer) => {
+          blobs.set(id, new Uint8Array(buffer));
+          downloaded += buffer.byteLength;
+          setStatus({ downloaded: downloaded, total: total });
+        });
+      // Errors are thrown when messages that need the file are reached.
+      download.catch(() => undefined);
+      return [id, download];
+    }),
+  );
+  let batch: [number, Message][] = [];
+  for (const entry of data.messages) {
+    const missing = getBlobIds(entry).filter((id) => !blobs.has(id));
+    if (missing.length > 0) {
+      if (batch.length > 0)
+        onChunk({ type: "messages", blobs: [], messages: batch });
+      batch = [];
+      await Promise.all(missing.map((id) => blobDownloads.get(id)));
+    }
+    batch.push(resolveBlobs(entry, blobs));
+  }
+  onChunk({ type: "messages", blobs: [], messages: batch });
+  onChunk({ type: "end", durationSeconds: data.durationSeconds });
 }
 
-interface SerializedMessages {
-  durationSeconds: number;
+/** Recording state during playback. Messages are appended as chunks are
+ * loaded, starting from a seek point. */
+interface Recording {
   messages: [number, Message][]; // (time in seconds, message).
-  viserVersion: string;
+  startSeconds: number;
+  durationSeconds: number; // Time of the last loaded message.
+  complete: boolean;
 }
 
 export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
@@ -82,7 +417,8 @@ export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
   const [status, setStatus] = useState({ downloaded: 0.0, total: 0.0 });
   const [playbackSpeed, setPlaybackSpeed] = useState("1x");
   const [paused, setPaused] = useState(false);
-  const [recording, setRecording] = useState<SerializedMessages | null>(null);
+  const [recording, setRecording] = useState<Recording | null>(null);
+  const [index, setIndex] = useState<RecordingIndex | null>(null);
 
   // Instead of removing all of the existing scene nodes, we're just going to hide them.
   // This will prevent unnecessary remounting when messages are looped.
@@ -115,24 +451,92 @@ export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
 
   const theme = useMantineTheme();
 
-  useEffect(() => {
-    deserializeGzippedMsgpackFile<SerializedMessages>(fileUrl, setStatus).then(
-      (data) => {
-        console.log(
-          "File loaded! Saved with Viser version:",
-          data.viserVersion,
-        );
-        setRecording(data);
+  const playbackMutable = useRef<{
+    currentTime: number;
+    currentIndex: number;
+    // Messages that currentIndex refers to.
+    messages: [number, Message][] | null;
+    // Messages of a recording that is being loaded from a seek point.
+    loading: [number, Message][] | null;
+  }>({ currentTime: 0.0, currentIndex: 0, messages: null, loading: null });
+
+  // Load the recording, starting from a seek point. This replaces the
+  // previous recording after the first messages are loaded. Each chunk then
+  // creates a new recording object, which shares the messages array.
+  const loadController = useRef<AbortController | null>(null);
+  const startLoad = useCallback((seekPoint: [number, number] | null) => {
+    loadController.current?.abort();
+    const controller = new AbortController();
+    loadController.current = controller;
+
+    const loaded: Recording = {
+      messages: [],
+      startSeconds: seekPoint === null ? 0.0 : seekPoint[0],
+      durationSeconds: 0.0,
+      complete: false,
+    };
+    playbackMutable.current.loading = loaded.messages;
+    function pushMessages(messages: [number, Message][]) {
+      if (messages.length === 0) return;
+      for (const message of messages) loaded.messages.push(message);
+      loaded.durationSeconds = loaded.messages[loaded.messages.length - 1][0];
+    }
+    loadRecording(
+      fileUrl,
+      setStatus,
+      (chunk) => {
+        if (controller.signal.aborted) return;
+        if (chunk.type === "header") {
+          console.log(
+            "Loading file saved with Viser version:",
+            chunk.viserVersion,
+          );
+        } else if (chunk.type === "keyframe") {
+          // Keyframes are redundant, unless we're starting from one.
+          if (loaded.messages.length > 0) return;
+          pushMessages(chunk.messages);
+          loaded.durationSeconds = chunk.time;
+          setRecording({ ...loaded });
+        } else if (chunk.type === "messages") {
+          pushMessages(chunk.messages);
+          setRecording({ ...loaded });
+        } else if (chunk.type === "end") {
+          console.log("File loaded!");
+          loaded.durationSeconds = chunk.durationSeconds;
+          loaded.complete = true;
+          setRecording({ ...loaded });
+        }
       },
-    );
+      seekPoint === null ? 0 : seekPoint[1],
+      controller.signal,
+    ).catch((error) => {
+      if (!controller.signal.aborted) throw error;
+    });
   }, []);
 
-  const playbackMutable = useRef({ currentTime: 0.0, currentIndex: 0 });
+  useEffect(() => {
+    startLoad(null);
+    loadIndex(fileUrl)
+      .then(setIndex)
+      .catch(() => setIndex(null));
+    return () => loadController.current?.abort();
+  }, []);
 
   const updatePlayback = useCallback(() => {
     if (recording === null) return;
     const mutable = playbackMutable.current;
 
+    if (mutable.loading !== null) {
+      // Wait until the first messages from a seek point are loaded.
+      if (recording.messages !== mutable.loading) return;
+      mutable.loading = null;
+    }
+    if (mutable.messages !== recording.messages) {
+      // Replay a newly loaded recording from its start.
+      mutable.messages = recording.messages;
+      mutable.currentIndex = 0;
+    }
+
     // We have messages with times: [0.0, 0.01, 0.01, 0.02, 0.03]
     // We have our current time: 0.02
     // We want to get of a slice of all message _until_ the current time.
@@ -151,8 +555,17 @@ export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
     }
 
     if (mutable.currentTime >= recording.durationSeconds) {
-      mutable.currentIndex = 0;
-      mutable.currentTime = recording.messages[0][0];
+      if (recording.complete && recording.startSeconds > 0.0) {
+        // We started from a seek point. Loop by loading from the start.
+        mutable.currentTime = 0.0;
+        startLoad(null);
+      } else if (recording.complete) {
+        mutable.currentIndex = 0;
+        mutable.currentTime = recording.messages[0][0];
+      } else {
+        // Wait for more of the recording to load.
+        mutable.currentTime = recording.durationSeconds;
+      }
     }
     setCurrentTime(mutable.currentTime);
   }, [recording]);
@@ -163,12 +576,14 @@ export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
       let lastUpdate = Date.now();
       const interval = setInterval(() => {
         const now = Date.now();
-        playbackMutable.current.currentTime +=
-          ((now - lastUpdate) / 1000.0) * playbackMultiplier;
+        if (playbackMutable.current.loading === null)
+          playbackMutable.current.currentTime +=
+            ((now - lastUpdate) / 1000.0) * playbackMultiplier;
         lastUpdate = now;
 
         updatePlayback();
         if (
+          recording.complete &&
           playbackMutable.current.currentIndex === recording.messages.length &&
           recording.durationSeconds === 0.0
         ) {
@@ -186,6 +601,9 @@ export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
     setCurrentTime,
   ]);
 
+  // Apply newly loaded messages, even while paused.
+  useEffect(() => updatePlayback(), [updatePlayback]);
+
   // Pause/play with spacebar.
   useEffect(() => {
     function handleKeyDown(event: KeyboardEvent) {
@@ -201,7 +619,19 @@ export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
 
   const updateCurrentTime = useCallback(
     (value: number) => {
-      if (value < playbackMutable.current.currentTime) {
+      // Latest seek point before the new time.
+      const seekPoint =
+        index?.seekPoints.filter(([time]) => time <= value).pop() ?? null;
+      if (
+        recording !== null &&
+        seekPoint !== null &&
+        (value < recording.startSeconds ||
+          (!recording.complete && seekPoint[0] > recording.durationSeconds))
+      ) {
+        // The new time hasn't been loaded: we'll need to start loading from a
+        // seek point.
+        startLoad(seekPoint);
+      } else if (value < playbackMutable.current.currentTime) {
         // Going backwards is more expensive...
         resetScene();
         playbackMutable.current.currentIndex = 0;
@@ -211,9 +641,14 @@ export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
       setPaused(true);
       updatePlayback();
     },
-    [recording],
+    [recording, index],
   );
 
+  // Total duration, which is known before the recording is fully loaded if it
+  // has an index.
+  const durationSeconds =
+    index?.durationSeconds ?? recording?.durationSeconds ?? 0.0;
+
   if (recording === null) {
     return (
       <div
@@ -236,81 +671,99 @@ export function PlaybackFromFile({ fileUrl }: { fileUrl: string }) {
     );
   } else {
     return (
-      <Paper
-        radius="xs"
-        shadow="0.1em 0 1em 0 rgba(0,0,0,0.1)"
-        style={{
-          position: "fixed",
-          bottom: "1em",
-          left: "50%",
-          transform: "translateX(-50%)",
-          width: "25em",
-          maxWidth: "95%",
-          zIndex: 1,
-          padding: "0.5em",
-          display: recording.durationSeconds === 0.0 ? "none" : "flex",
-          alignItems: "center",
-          justifyContent: "space-between",
-          gap: "0.375em",
-        }}
-      >
-        <ActionIcon
-          size="md"
-          variant="subtle"
-          onClick={() => setPaused(!paused)}
-        >
-          {paused ? (
-            <IconPlayerPlayFilled height="1.125em" width="1.125em" />
-          ) : (
-            <IconPlayerPauseFilled height="1.125em" width="1.125em" />
-          )}
-        </ActionIcon>
-        <NumberInput
-          size="xs"
-          hideControls
-          value={currentTime.toFixed(1)}
-          step={0.01}
-          styles={{
-            wrapper: {
-              width: "3.1em",
-            },
-            input: {
-              padding: "0.2em",
-              fontFamily: theme.fontFamilyMonospace,
-              textAlign: "center",
-            },
-          }}
-          onChange={(value) =>
-            updateCurrentTime(
-              typeof value === "number" ? value : parseFloat(value),
-            )
-          }
-        />
-        <Slider
-          thumbSize={0}
+      <>
+        {recording.complete ? null : (
+          // Thin progress bar while the rest of the recording loads.
+          <Progress
+            value={(status.downloaded / status.total) * 100.0}
+            radius={0}
+            size="xs"
+            transitionDuration={0}
+            style={{
+              position: "fixed",
+              zIndex: 1,
+              top: 0,
+              left: 0,
+              right: 0,
+            }}
+          />
+        )}
+        <Paper
           radius="xs"
-          step={1e-4}
-          style={{ flexGrow: 1 }}
-          min={0}
-          max={recording.durationSeconds}
-          value={currentTime}
-          onChange={updateCurrentTime}
-          styles={{ thumb: { display: "none" } }}
-        />
-        <Tooltip zIndex={10} label={"Playback speed"} withinPortal>
-          <Select
+          shadow="0.1em 0 1em 0 rgba(0,0,0,0.1)"
+          style={{
+            position: "fixed",
+            bottom: "1em",
+            left: "50%",
+            transform: "translateX(-50%)",
+            width: "25em",
+            maxWidth: "95%",
+            zIndex: 1,
+            padding: "0.5em",
+            display: durationSeconds === 0.0 ? "none" : "flex",
+            alignItems: "center",
+            justifyContent: "space-between",
+            gap: "0.375em",
+          }}
+        >
+          <ActionIcon
+            size="md"
+            variant="subtle"
+            onClick={() => setPaused(!paused)}
+          >
+            {paused ? (
+              <IconPlayerPlayFilled height="1.125em" width="1.125em" />
+            ) : (
+              <IconPlayerPauseFilled height="1.125em" width="1.125em" />
+            )}
+          </ActionIcon>
+          <NumberInput
             size="xs"
-            value={playbackSpeed}
-            onChange={(val) => (val === null ? null : setPlaybackSpeed(val))}
-            radius="xs"
-            data={["0.5x", "1x", "2x", "4x", "8x"]}
+            hideControls
+            value={currentTime.toFixed(1)}
+            step={0.01}
             styles={{
-              wrapper: { width: "3.25em" },
+              wrapper: {
+                width: "3.1em",
+              },
+              input: {
+                padding: "0.2em",
+                fontFamily: theme.fontFamilyMonospace,
+                textAlign: "center",
+              },
             }}
-            comboboxProps={{ zIndex: 5, width: "5.25em" }}
+            onChange={(value) =>
+              updateCurrentTime(
+                typeof value === "number" ? value : parseFloat(value),
+              )
+            }
+          />
+          <Slider
+            thumbSize={0}
+            radius="xs"
+            step={1e-4}
+            style={{ flexGrow: 1 }}
+            min={0}
+            max={durationSeconds}
+            value={currentTime}
+            onChange={updateCurrentTime}
+            styles={{ thumb: { display: "none" } }}
           />
-        </Tooltip>
-      </Paper>
+          <Tooltip zIndex={10} label={"Playback speed"} withinPortal>
+            <Select
+              size="xs"
+              value={playbackSpeed}
+              onChange={(val) => (val === null ? null : setPlaybackSpeed(val))}
+              radius="xs"
+              data={["0.5x", "1x", "2x", "4x", "8x"]}
+              styles={{
+                wrapper: { width: "3.25em" },
+              }}
+              comboboxProps={{ zIndex: 5, width: "5.25em" }}
+            />
+          </Tooltip>
+        </Paper>
+      </>
     );
   }
 }
@@ -47,6 +47,7 @@ function useMessageHandler() {
     const attrs = viewer.nodeAttributesFromName.current;
     attrs[message.name] = {
       overrideVisibility: attrs[message.name]?.overrideVisibility,
+      timelineVisibility: attrs[message.name]?.timelineVisibility,
     };
 
     // If the object is new or changed, we need to wait until it's created
@@ -119,6 +120,9 @@ function useMessageHandler() {
         }
       }
 
+      // New meshes replace any previously streamed vertex positions.
+      delete viewer.meshVertexState.current[message.name];
+
       // Add scene node.
       addSceneNodeMakeParents(message);
       return;
@@ -126,6 +130,8 @@ function useMessageHandler() {
 
     switch (message.type) {
       case "SceneNodeUpdateMessage": {
+        if ("vertices" in message.updates)
+          delete viewer.meshVertexState.current[message.name];
         updateSceneNode(message.name, message.updates);
         return;
       }
@@ -229,6 +235,136 @@ function useMessageHandler() {
           message.position;
         break;
       }
+      case "SetBonePosesMessage": {
+        const poses = new Float32Array(
+          message.poses.buffer.slice(
+            message.poses.byteOffset,
+            message.poses.byteOffset + message.poses.byteLength,
+          ),
+        );
+        const state = viewer.skinnedMeshState.current;
+        state[message.name].poses.forEach((pose, i) => {
+          pose.wxyz = [
+            poses[i * 7 + 0],
+            poses[i * 7 + 1],
+            poses[i * 7 + 2],
+            poses[i * 7 + 3],
+          ];
+          pose.position = [
+            poses[i * 7 + 4],
+            poses[i * 7 + 5],
+            poses[i * 7 + 6],
+          ];
+        });
+        break;
+      }
+      case "MeshVerticesMessage": {
+        const node = viewer.useSceneTree.getState().nodeFromName[message.name];
+        if (node === undefined || node.message.type !== "MeshMessage") break;
+        const data = message.data.buffer.slice(
+          message.data.byteOffset,
+          message.data.byteOffset + message.data.byteLength,
+        );
+        const state = viewer.meshVertexState.current;
+        let positions: Float32Array;
+        if (message.encoding === "float32") {
+          positions = new Float32Array(data);
+        } else if (message.encoding === "float16") {
+          const half = new Uint16Array(data);
+          positions = new Float32Array(half.length);
+          for (let i = 0; i < half.length; i++)
+            positions[i] = THREE.DataUtils.fromHalfFloat(half[i]);
+        } else {
+          // Deltas are applied to the most recent positions.
+          const vertices = node.message.props.vertices;
+          positions =
+            state[message.name]?.positions ??
+            new Float32Array(
+              vertices.buffer.slice(
+                vertices.byteOffset,
+                vertices.byteOffset + vertices.byteLength,
+              ),
+            );
+          const offsets = new Int16Array(data);
+          for (let i = 0; i < offsets.length; i++)
+            positions[i] += offsets[i] * message.delta_scale;
+        }
+        state[message.name] = {
+          positions: positions,
+          version: (state[message.name]?.version ?? 0) + 1,
+        };
+        break;
+      }
+      case "SkinnedMeshAnimationMessage": {
+        const state = viewer.skinnedMeshState.current[message.name];
+        if (state === undefined) break;
+        if (message.timestamps.byteLength === 0) {
+          delete state.animation;
+          break;
+        }
+        state.animation = {
+          timestamps: new Float32Array(
+            message.timestamps.buffer.slice(
+              message.timestamps.byteOffset,
+              message.timestamps.byteOffset + message.timestamps.byteLength,
+            ),
+          ),
+          poses: new Float32Array(
+            message.poses.buffer.slice(
+              message.poses.byteOffset,
+              message.poses.byteOffset + message.poses.byteLength,
+            ),
+          ),
+          loop: message.loop,
+          playing: false,
+          time: 0.0,
+          rate: 1.0,
+          anchorMs: performance.now(),
+        };
+        break;
+      }
+      case "SkinnedMeshAnimationPlaybackMessage": {
+        const animation =
+          viewer.skinnedMeshState.current[message.name]?.animation;
+        if (animation === undefined) break;
+        animation.playing = message.playing;
+        animation.time = message.time;
+        animation.rate = message.rate;
+        animation.anchorMs = performance.now();
+        break;
+      }
+      case "TimelineMessage": {
+        const timeline = viewer.timelineState.current;
+        timeline.config = message;
+        timeline.time = message.time;
+        timeline.anchorMs = performance.now();
+        timeline.version++;
+        break;
+      }
+      case "TimelineFrameMessage": {
+        const timeline = viewer.timelineState.current;
+        timeline.frames[message.index] = {
+          timestamp: message.timestamp,
+          nodeNames: message.node_names,
+        };
+        timeline.version++;
+        break;
+      }
+      case "TimelineRemoveMessage": {
+        // Show all nodes that were hidden by the timeline.
+        const timeline = viewer.timelineState.current;
+        const attrs = viewer.nodeAttributesFromName.current;
+        timeline.frames.forEach((frame) =>
+          frame.nodeNames.forEach((name) => {
+            if (attrs[name] !== undefined)
+              delete attrs[name]!.timelineVisibility;
+          }),
+        );
+        timeline.config = null;
+        timeline.frames = [];
+        timeline.version++;
+        break;
+      }
       case "SetCameraLookAtMessage": {
         const cameraControls = viewer.cameraControlRef.current!;
 
@@ -331,6 +467,32 @@ function useMessageHandler() {
           attr[message.name]!.poseUpdateState = "needsUpdate";
         break;
       }
+      case "SetPosesMessage": {
+        const attr = viewer.nodeAttributesFromName.current;
+        const poses = new Float32Array(
+          message.poses.buffer.slice(
+            message.poses.byteOffset,
+            message.poses.byteOffset + message.poses.byteLength,
+          ),
+        );
+        message.names.forEach((name, i) => {
+          if (attr[name] === undefined) attr[name] = {};
+          attr[name]!.wxyz = [
+            poses[i * 7 + 0],
+            poses[i * 7 + 1],
+            poses[i * 7 + 2],
+            poses[i * 7 + 3],
+          ];
+          attr[name]!.position = [
+            poses[i * 7 + 4],
+            poses[i * 7 + 5],
+            poses[i * 7 + 6],
+          ];
+          if (attr[name]!.poseUpdateState != "waitForMakeObject")
+            attr[name]!.poseUpdateState = "needsUpdate";
+        });
+        break;
+      }
       case "SetSceneNodeVisibilityMessage": {
         const attr = viewer.nodeAttributesFromName.current;
         if (attr[message.name] === undefined) attr[message.name] = {};
@@ -402,6 +564,7 @@ function useMessageHandler() {
 
         if (viewer.skinnedMeshState.current[message.name] !== undefined)
           delete viewer.skinnedMeshState.current[message.name];
+        delete viewer.meshVertexState.current[message.name];
         return;
       }
       // Set the clickability of a particular scene node.
@@ -22,8 +22,12 @@ import { rayToViserCoords } from "./WorldTransformUtils";
 import { HoverableContext } from "./HoverContext";
 import {
   AutoShadowDirectionalLight,
+  BatchedCameraFrustums,
+  BatchedGlbAsset,
+  BatchedMeshes,
   CameraFrustum,
   CoordinateFrame,
+  DepthImagePointCloud,
   GlbAsset,
   InstancedAxes,
   PointCloud,
@@ -192,6 +196,19 @@ function useObjectFactory(message: SceneNodeMessage | undefined): {
           Math.floor(instanceId! / 3),
       };
     }
+    case "BatchedMeshesMessage": {
+      return {
+        makeObject: (ref) => <BatchedMeshes ref={ref} {...message} />,
+        // Each instance ID corresponds directly to a batch index.
+        computeClickInstanceIndexFromInstanceId: (instanceId) => instanceId!,
+      };
+    }
+    case "BatchedGlbMessage": {
+      return {
+        makeObject: (ref) => <BatchedGlbAsset ref={ref} {...message} />,
+        computeClickInstanceIndexFromInstanceId: (instanceId) => instanceId!,
+      };
+    }
 
     case "GridMessage": {
       const gridQuaternion = new THREE.Quaternion().setFromEuler(
@@ -276,6 +293,11 @@ function useObjectFactory(message: SceneNodeMessage | undefined): {
         makeObject: (ref) => <PointCloud ref={ref} {...message} />,
       };
     }
+    case "DepthImagePointCloudMessage": {
+      return {
+        makeObject: (ref) => <DepthImagePointCloud ref={ref} {...message} />,
+      };
+    }
 
     // Add mesh
     case "SkinnedMeshMessage":
@@ -299,6 +321,14 @@ function useObjectFactory(message: SceneNodeMessage | undefined): {
         ),
       };
     }
+    case "BatchedCameraFrustumsMessage": {
+      return {
+        makeObject: (ref) => <BatchedCameraFrustums ref={ref} {...message} />,
+        // Each instance ID corresponds directly to a batch index.
+        computeClickInstanceIndexFromInstanceId: (instanceId) =>
+          instanceId === undefined ? null : instanceId,
+      };
+    }
     case "TransformControlsMessage": {
       const name = message.name;
       const sendDragMessage = makeThrottledMessageSender(viewer, 50);
@@ -680,9 +710,11 @@ export function SceneNodeThreeObject(props: {
     // unmountWhenInvisible=true.
     const attrs = viewer.nodeAttributesFromName.current[props.name];
     const visibility =
-      (attrs?.overrideVisibility === undefined
+      ((attrs?.overrideVisibility === undefined
         ? attrs?.visibility
-        : attrs.overrideVisibility) ?? true;
+        : attrs.overrideVisibility) ??
+        true) &&
+      (attrs?.timelineVisibility ?? true);
     if (visibility === false) return false;
     if (props.parent === null) return true;
 
@@ -731,9 +763,11 @@ export function SceneNodeThreeObject(props: {
       if (attrs === undefined) return;
 
       const visibility =
-        (attrs?.overrideVisibility === undefined
+        ((attrs?.overrideVisibility === undefined
           ? attrs?.visibility
-          : attrs.overrideVisibility) ?? true;
+          : attrs.overrideVisibility) ??
+          true) &&
+        (attrs?.timelineVisibility ?? true);
       obj.visible = visibility;
 
       if (attrs.poseUpdateState == "needsUpdate") {
@@ -26,13 +26,18 @@ import {
 } from "three";
 import { DRACOLoader } from "three/examples/jsm/loaders/DRACOLoader";
 import {
+  BatchedCameraFrustumsMessage,
+  BatchedGlbMessage,
+  BatchedMeshesMessage,
+  DepthImagePointCloudMessage,
   ImageMessage,
   MeshMessage,
   PointCloudMessage,
   SkinnedMeshMessage,
 } from "./WebsocketMessages";
-import { ViewerContext } from "./ViewerContext";
+import { SkinnedMeshAnimationState, ViewerContext } from "./ViewerContext";
 import { shadowArgs } from "./ShadowArgs";
+import { Line as TypedArrayLine } from "./Line";
 
 type AllPossibleThreeJSMaterials =
   | MeshBasicMaterial
@@ -164,6 +169,179 @@ export const PointCloud = React.forwardRef<THREE.Points, PointCloudMessage>(
   },
 );
 
+const DepthImagePointCloudMaterial = /* @__PURE__ */ shaderMaterial(
+  {
+    scale: 1.0,
+    point_ball_norm: 0.0,
+    depthMap: null,
+    rgbMap: null,
+    depthSize: new THREE.Vector2(1, 1),
+    rgbSize: new THREE.Vector2(1, 1),
+    Kinv: new THREE.Matrix3(),
+  },
+  `
+  precision highp float;
+
+  varying vec3 vColor;
+  uniform float scale;
+  uniform sampler2D depthMap;
+  uniform sampler2D rgbMap;
+  uniform vec2 depthSize;
+  uniform vec2 rgbSize;
+  uniform mat3 Kinv;
+
+  float readDepth(vec2 coord) {
+    vec4 rgbPacked = texture(depthMap, coord);
+
+    // Same fixed-point encoding as the background image depth.
+    return rgbPacked.r * 0.00255 + rgbPacked.g * 0.6528 + rgbPacked.b * 167.1168;
+  }
+
+  void main() {
+      // The position attribute stores pixel centers of the depth image.
+      vec2 uv = position.xy / depthSize;
+      float depth = readDepth(uv);
+      if (depth <= 0.0) {
+          // Move invalid points outside of the clip volume.
+          gl_Position = vec4(2.0, 2.0, 2.0, 1.0);
+          gl_PointSize = 0.0;
+          return;
+      }
+      vColor = texture(rgbMap, uv).rgb;
+      vec3 local_pos = Kinv * vec3(uv * rgbSize, 1.0) * depth;
+      vec4 world_pos = modelViewMatrix * vec4(local_pos, 1.0);
+      gl_Position = projectionMatrix * world_pos;
+      gl_PointSize = (scale / -world_pos.z);
+  }
+   `,
+  `varying vec3 vColor;
+  uniform float point_ball_norm;
+
+  void main() {
+      if (point_ball_norm < 1000.0) {
+          float r = pow(
+              pow(abs(gl_PointCoord.x - 0.5), point_ball_norm)
+              + pow(abs(gl_PointCoord.y - 0.5), point_ball_norm),
+              1.0 / point_ball_norm);
+          if (r > 0.5) discard;
+      }
+      gl_FragColor = vec4(vColor, 1.0);
+  }
+   `,
+);
+
+/** Load a texture from binary image data. Nearest-neighbor sampling is used
+ * to avoid interpolating between packed values. */
+function useBinaryTexture(
+  data: Uint8Array | null,
+  mediaType: string | null,
+): THREE.Texture | undefined {
+  const [texture, setTexture] = React.useState<THREE.Texture>();
+  React.useEffect(() => {
+    if (data === null || mediaType === null) {
+      setTexture(undefined);
+      return;
+    }
+    const url = URL.createObjectURL(new Blob([data], { type: mediaType }));
+    let loadedTexture: THREE.Texture | undefined = undefined;
+    new THREE.TextureLoader().load(url, (texture) => {
+      URL.revokeObjectURL(url);
+      texture.flipY = false;
+      texture.generateMipmaps = false;
+      texture.minFilter = THREE.NearestFilter;
+      texture.magFilter = THREE.NearestFilter;
+      loadedTexture = texture;
+      setTexture(texture);
+    });
+    return () => {
+      loadedTexture?.dispose();
+    };
+  }, [data, mediaType]);
+  return texture;
+}
+
+/** Point cloud that is unprojected from a depth image in the vertex shader. */
+export const DepthImagePointCloud = React.forwardRef<
+  THREE.Points,
+  DepthImagePointCloudMessage
+>(function DepthImagePointCloud(message, ref) {
+  const getThreeState = useThree((state) => state.get);
+  const props = message.props;
+
+  const depthTexture = useBinaryTexture(props._depth_data, "image/png");
+  const rgbTexture = useBinaryTexture(props._rgb_data, props.rgb_media_type);
+
+  // One point per depth pixel. Positions are pixel centers, which are used to
+  // look up depths and colors in the vertex shader. We wait for both textures
+  // to load before creating any points.
+  const loaded = depthTexture !== undefined && rgbTexture !== undefined;
+  const depthWidth: number = loaded ? depthTexture.image.width : 0;
+  const depthHeight: number = loaded ? depthTexture.image.height : 0;
+  const geometry = React.useMemo(() => {
+    const geometry = new THREE.BufferGeometry();
+    const pixels = new Float32Array(depthWidth * depthHeight * 3);
+    for (let v = 0; v < depthHeight; v++) {
+      for (let u = 0; u < depthWidth; u++) {
+        const i = (v * depthWidth + u) * 3;
+        pixels[i] = u + 0.5;
+        pixels[i + 1] = v + 0.5;
+      }
+    }
+    geometry.setAttribute("position", new THREE.BufferAttribute(pixels, 3));
+    return geometry;
+  }, [depthWidth, depthHeight]);
+
+  React.useEffect(() => {
+    return () => {
+      geometry.dispose();
+    };
+  }, [geometry]);
+
+  const [material] = React.useState(() => new DepthImagePointCloudMaterial());
+  React.useEffect(() => {
+    return () => {
+      material.dispose();
+    };
+  }, [material]);
+
+  material.uniforms.point_ball_norm.value = props.point_ball_norm;
+  material.uniforms.depthMap.value = depthTexture ?? null;
+  material.uniforms.rgbMap.value = rgbTexture ?? null;
+  material.uniforms.depthSize.value.set(depthWidth, depthHeight);
+  if (loaded) {
+    material.uniforms.rgbSize.value.set(
+      rgbTexture.image.width,
+      rgbTexture.image.height,
+    );
+  }
+  const K = props.K;
+  material.uniforms.Kinv.value.set(...K[0], ...K[1], ...K[2]).invert();
+
+  const rendererSize = new THREE.Vector2();
+  useFrame(() => {
+    // Same point scaling as <PointCloud />.
+    material.uniforms.scale.value =
+      (props.point_size /
+        Math.tan(
+          (((getThreeState().camera as THREE.PerspectiveCamera).fov / 180.0) *
+            Math.PI) /
+            2.0,
+        )) *
+      getThreeState().gl.getSize(rendererSize).height *
+      getThreeState().gl.getPixelRatio();
+  });
+
+  return (
+    <points
+      ref={ref}
+      geometry={geometry}
+      material={material}
+      // Bounds of the unprojected points are only known on the GPU.
+      frustumCulled={false}
+    />
+  );
+});
+
 /** Component for rendering the contents of GLB files. */
 export const GlbAsset = React.forwardRef<
   THREE.Group,
@@ -439,13 +617,15 @@ export const InstancedAxes = React.forwardRef<
   );
 });
 
-/** Convert raw RGB color buffers to linear color buffers. **/
-export const ViserMesh = React.forwardRef<
-  THREE.Mesh | THREE.SkinnedMesh,
-  MeshMessage | SkinnedMeshMessage
->(function ViserMesh(message, ref) {
-  const viewer = React.useContext(ViewerContext)!;
-
+/** Create a material from the properties shared by mesh messages. */
+function createMeshMaterial(props: {
+  color: [number, number, number] | null;
+  wireframe: boolean;
+  opacity: number | null;
+  flat_shading: boolean;
+  side: "front" | "back" | "double";
+  material: "standard" | "toon3" | "toon5";
+}): THREE.Material {
   const generateGradientMap = (shades: 3 | 5) => {
     const texture = new THREE.DataTexture(
       Uint8Array.from(shades == 3 ? [0, 128, 255] : [0, 64, 128, 192, 255]),
@@ -462,40 +642,46 @@ export const ViserMesh = React.forwardRef<
     throw new Error(`Should never get here! ${x}`);
   };
 
+  const standardArgs = {
+    color: props.color === null ? undefined : rgbToInt(props.color),
+    wireframe: props.wireframe,
+    transparent: props.opacity !== null,
+    opacity: props.opacity ?? 1.0,
+    // Flat shading only makes sense for non-wireframe materials.
+    flatShading: props.flat_shading && !props.wireframe,
+    side: {
+      front: THREE.FrontSide,
+      back: THREE.BackSide,
+      double: THREE.DoubleSide,
+    }[props.side],
+  };
+  return props.material == "standard" || props.wireframe
+    ? new THREE.MeshStandardMaterial(standardArgs)
+    : props.material == "toon3"
+      ? new THREE.MeshToonMaterial({
+          gradientMap: generateGradientMap(3),
+          ...standardArgs,
+        })
+      : props.material == "toon5"
+        ? new THREE.MeshToonMaterial({
+            gradientMap: generateGradientMap(5),
+            ...standardArgs,
+          })
+        : assertUnreachable(props.material);
+}
+
+/** Convert raw RGB color buffers to linear color buffers. **/
+export const ViserMesh = React.forwardRef<
+  THREE.Mesh | THREE.SkinnedMesh,
+  MeshMessage | SkinnedMeshMessage
+>(function ViserMesh(message, ref) {
+  const viewer = React.useContext(ViewerContext)!;
+
   const [material, setMaterial] = React.useState<THREE.Material>();
   const bonesRef = React.useRef<THREE.Bone[]>();
 
   React.useEffect(() => {
-    const standardArgs = {
-      color:
-        message.props.color === null
-          ? undefined
-          : rgbToInt(message.props.color),
-      wireframe: message.props.wireframe,
-      transparent: message.props.opacity !== null,
-      opacity: message.props.opacity ?? 1.0,
-      // Flat shading only makes sense for non-wireframe materials.
-      flatShading: message.props.flat_shading && !message.props.wireframe,
-      side: {
-        front: THREE.FrontSide,
-        back: THREE.BackSide,
-        double: THREE.DoubleSide,
-      }[message.props.side],
-    };
-    const material =
-      message.props.material == "standard" || message.props.wireframe
-        ? new THREE.MeshStandardMaterial(standardArgs)
-        : message.props.material == "toon3"
-          ? new THREE.MeshToonMaterial({
-              gradientMap: generateGradientMap(3),
-              ...standardArgs,
-            })
-          : message.props.material == "toon5"
-            ? new THREE.MeshToonMaterial({
-                gradientMap: generateGradientMap(5),
-                ...standardArgs,
-              })
-            : assertUnreachable(message.props.material);
+    const material = createMeshMaterial(message.props);
     setMaterial(material);
 
     return () => {
@@ -514,7 +700,9 @@ export const ViserMesh = React.forwardRef<
     () => new THREE.BufferGeometry(),
   );
   const [skeleton, setSkeleton] = React.useState<THREE.Skeleton>();
+  const appliedVertexVersion = React.useRef(0);
   React.useEffect(() => {
+    appliedVertexVersion.current = 0;
     geometry.setAttribute(
       "position",
       new THREE.BufferAttribute(
@@ -654,6 +842,30 @@ export const ViserMesh = React.forwardRef<
     };
   }, [geometry]);
 
+  // Apply streamed vertex positions for deforming meshes.
+  useFrame(() => {
+    const vertexState = viewer.meshVertexState.current[message.name];
+    if (
+      vertexState === undefined ||
+      vertexState.version === appliedVertexVersion.current
+    )
+      return;
+    const position = geometry.getAttribute("position");
+    if (
+      position === undefined ||
+      position.array.length !== vertexState.positions.length
+    )
+      return;
+    (position.array as Float32Array).set(vertexState.positions);
+    position.needsUpdate = true;
+    // Flat-shaded and wireframe materials don't read vertex normals; flat
+    // shading derives normals from screen-space derivatives on the GPU.
+    if (!message.props.flat_shading && !message.props.wireframe)
+      geometry.computeVertexNormals();
+    geometry.computeBoundingSphere();
+    appliedVertexVersion.current = vertexState.version;
+  });
+
   // Update bone transforms for skinned meshes.
   useFrame(() => {
     if (message.type !== "SkinnedMeshMessage") return;
@@ -670,12 +882,16 @@ export const ViserMesh = React.forwardRef<
         });
         state.initialized = true;
       }
-      bones.forEach((bone, i) => {
-        const wxyz = state.poses[i].wxyz;
-        const position = state.poses[i].position;
-        bone.quaternion.set(wxyz[1], wxyz[2], wxyz[3], wxyz[0]);
-        bone.position.set(position[0], position[1], position[2]);
-      });
+      if (state.animation !== undefined) {
+        setBonesFromAnimation(bones, state.animation);
+      } else {
+        bones.forEach((bone, i) => {
+          const wxyz = state.poses[i].wxyz;
+          const position = state.poses[i].position;
+          bone.quaternion.set(wxyz[1], wxyz[2], wxyz[3], wxyz[0]);
+          bone.position.set(position[0], position[1], position[2]);
+        });
+      }
     }
   });
 
@@ -716,6 +932,320 @@ export const ViserMesh = React.forwardRef<
   }
 });
 
+/** Sample an animation clip at the current time, and write interpolated poses
+ * to a set of bones. Orientations are slerped; positions are lerped. */
+function setBonesFromAnimation(
+  bones: THREE.Bone[],
+  animation: SkinnedMeshAnimationState,
+) {
+  const timestamps = animation.timestamps;
+  const numFrames = timestamps.length;
+  const numBones = animation.poses.length / numFrames / 7;
+  const startTime = timestamps[0];
+  const duration = timestamps[numFrames - 1] - startTime;
+
+  // Compute clip time.
+  let t = animation.time;
+  if (animation.playing)
+    t += ((performance.now() - animation.anchorMs) / 1000.0) * animation.rate;
+  if (animation.loop && duration > 0.0) {
+    t = startTime + ((((t - startTime) % duration) + duration) % duration);
+  } else {
+    t = Math.min(Math.max(t, startTime), startTime + duration);
+  }
+
+  // Binary search for the last keyframe at or before t.
+  let lo = 0;
+  let hi = numFrames - 1;
+  while (lo < hi) {
+    const mid = (lo + hi + 1) >> 1;
+    if (timestamps[mid] <= t) lo = mid;
+    else hi = mid - 1;
+  }
+  const next = Math.min(lo + 1, numFrames - 1);
+  const span = timestamps[next] - timestamps[lo];
+  const alpha = span > 0.0 ? (t - timestamps[lo]) / span : 0.0;
+
+  const poses = animation.poses;
+  const tmpQuat = new THREE.Quaternion();
+  const tmpQuatNext = new THREE.Quaternion();
+  for (let i = 0; i < Math.min(bones.length, numBones); i++) {
+    const a = (lo * numBones + i) * 7;
+    const b = (next * numBones + i) * 7;
+    tmpQuat.set(poses[a + 1], poses[a + 2], poses[a + 3], poses[a + 0]);
+    tmpQuatNext.set(poses[b + 1], poses[b + 2], poses[b + 3], poses[b + 0]);
+    bones[i].quaternion.slerpQuaternions(tmpQuat, tmpQuatNext, alpha);
+    bones[i].position.set(
+      poses[a + 4] + (poses[b + 4] - poses[a + 4]) * alpha,
+      poses[a + 5] + (poses[b + 5] - poses[a + 5]) * alpha,
+      poses[a + 6] + (poses[b + 6] - poses[a + 6]) * alpha,
+    );
+  }
+}
+
+/** Reinterpret binary data as a Float32Array. */
+function float32ArrayFromBinary(data: Uint8Array): Float32Array {
+  return new Float32Array(
+    data.buffer.slice(data.byteOffset, data.byteOffset + data.byteLength),
+  );
+}
+
+/** Write per-instance transforms to an instanced mesh. If provided, a local
+ * transform is applied before each instance transform. */
+function setInstanceMatrices(
+  mesh: THREE.InstancedMesh,
+  wxyzs: Float32Array,
+  positions: Float32Array,
+  scales: Float32Array,
+  T_instance_local?: THREE.Matrix4,
+) {
+  // Pre-allocate to avoid garbage collector from running during loop.
+  const T_parent_instance = new THREE.Matrix4();
+  const tmpQuat = new THREE.Quaternion();
+  const tmpPosition = new THREE.Vector3();
+  const tmpScale = new THREE.Vector3();
+
+  // Arrays may briefly disagree in length when the number of instances
+  // changes, so we only draw instances that are fully specified.
+  const count = Math.min(
+    wxyzs.length / 4,
+    positions.length / 3,
+    scales.length / 3,
+    mesh.instanceMatrix.count,
+  );
+  for (let i = 0; i < count; i++) {
+    T_parent_instance.compose(
+      tmpPosition.set(
+        positions[i * 3 + 0],
+        positions[i * 3 + 1],
+        positions[i * 3 + 2],
+      ),
+      tmpQuat.set(
+        wxyzs[i * 4 + 1],
+        wxyzs[i * 4 + 2],
+        wxyzs[i * 4 + 3],
+        wxyzs[i * 4 + 0],
+      ),
+      tmpScale.set(scales[i * 3 + 0], scales[i * 3 + 1], scales[i * 3 + 2]),
+    );
+    if (T_instance_local !== undefined)
+      T_parent_instance.multiply(T_instance_local);
+    mesh.setMatrixAt(i, T_parent_instance);
+  }
+  mesh.count = count;
+  mesh.instanceMatrix.needsUpdate = true;
+
+  // Bounds are recomputed lazily for frustum culling and raycasting.
+  mesh.boundingSphere = null;
+  mesh.boundingBox = null;
+}
+
+/** Instanced meshes, which share one geometry but have per-instance
+ * transforms and colors. */
+export const BatchedMeshes = React.forwardRef<
+  THREE.Group,
+  BatchedMeshesMessage
+>(function BatchedMeshes(message, ref) {
+  const props = message.props;
+  const meshRef = React.useRef<THREE.InstancedMesh>(null);
+
+  const material = React.useMemo(
+    () => createMeshMaterial({ ...props, color: null }),
+    [
+      props.material,
+      props.wireframe,
+      props.opacity,
+      props.flat_shading,
+      props.side,
+    ],
+  );
+  React.useEffect(() => {
+    return () => {
+      material.dispose();
+    };
+  }, [material]);
+
+  const geometry = React.useMemo(() => {
+    const geometry = new THREE.BufferGeometry();
+    geometry.setAttribute(
+      "position",
+      new THREE.BufferAttribute(float32ArrayFromBinary(props.vertices), 3),
+    );
+    geometry.setIndex(
+      new THREE.BufferAttribute(
+        new Uint32Array(
+          props.faces.buffer.slice(
+            props.faces.byteOffset,
+            props.faces.byteOffset + props.faces.byteLength,
+          ),
+        ),
+        1,
+      ),
+    );
+    geometry.computeVertexNormals();
+    geometry.computeBoundingSphere();
+    return geometry;
+  }, [props.vertices, props.faces]);
+  React.useEffect(() => {
+    return () => {
+      geometry.dispose();
+    };
+  }, [geometry]);
+
+  // Instance buffers are allocated for the current number of instances.
+  const numInstances = props.batched_wxyzs.byteLength / (4 * 4);
+
+  // Update instance matrices and colors.
+  React.useEffect(() => {
+    const mesh = meshRef.current!;
+    setInstanceMatrices(
+      mesh,
+      float32ArrayFromBinary(props.batched_wxyzs),
+      float32ArrayFromBinary(props.batched_positions),
+      float32ArrayFromBinary(props.batched_scales),
+    );
+    const colors = props.batched_colors;
+    const tmpColor = new THREE.Color();
+    for (let i = 0; i < Math.min(mesh.count, colors.length / 3); i++) {
+      tmpColor.setRGB(
+        colors[i * 3 + 0] / 255.0,
+        colors[i * 3 + 1] / 255.0,
+        colors[i * 3 + 2] / 255.0,
+        THREE.SRGBColorSpace,
+      );
+      mesh.setColorAt(i, tmpColor);
+    }
+    if (mesh.instanceColor !== null) mesh.instanceColor.needsUpdate = true;
+  }, [
+    props.batched_wxyzs,
+    props.batched_positions,
+    props.batched_scales,
+    props.batched_colors,
+    geometry,
+    material,
+    numInstances,
+  ]);
+
+  return (
+    <group ref={ref}>
+      <instancedMesh
+        ref={meshRef}
+        args={[geometry, material, numInstances]}
+        castShadow
+        receiveShadow
+      >
+        <OutlinesIfHovered />
+      </instancedMesh>
+    </group>
+  );
+});
+
+type InstancedGlbMesh = {
+  mesh: THREE.InstancedMesh;
+  T_root_mesh: THREE.Matrix4;
+};
+
+/** Instanced GLB assets. Each mesh in the GLB is instanced once for each
+ * transform. */
+export const BatchedGlbAsset = React.forwardRef<
+  THREE.Group,
+  BatchedGlbMessage
+>(function BatchedGlbAsset(message, ref) {
+  const props = message.props;
+  const [gltf, setGltf] = React.useState<GLTF>();
+
+  React.useEffect(() => {
+    const loader = new GLTFLoader();
+
+    // We use a CDN for Draco. We could move this locally if we want to use Viser offline.
+    const dracoLoader = new DRACOLoader();
+    dracoLoader.setDecoderPath("https://www.gstatic.com/draco/v1/decoders/");
+    loader.setDRACOLoader(dracoLoader);
+
+    let loadedGltf: GLTF | undefined = undefined;
+    loader.parse(
+      props.glb_data.buffer.slice(
+        props.glb_data.byteOffset,
+        props.glb_data.byteOffset + props.glb_data.byteLength,
+      ),
+      "",
+      (gltf) => {
+        gltf.scene.updateMatrixWorld(true);
+        loadedGltf = gltf;
+        setGltf(gltf);
+      },
+      (error) => {
+        console.log("Error loading GLB!");
+        console.log(error);
+      },
+    );
+    return () => {
+      loadedGltf?.scene.traverse((obj) => {
+        if (obj instanceof THREE.Mesh) {
+          obj.geometry.dispose();
+          const materials = Array.isArray(obj.material)
+            ? obj.material
+            : [obj.material];
+          materials.forEach((material: THREE.Material) => material.dispose());
+        }
+      });
+    };
+  }, [props.glb_data]);
+
+  // Create one instanced mesh for each mesh in the GLB.
+  const numInstances = props.batched_wxyzs.byteLength / (4 * 4);
+  const instancedMeshes = React.useMemo(() => {
+    if (gltf === undefined) return [];
+    const out: InstancedGlbMesh[] = [];
+    gltf.scene.traverse((obj) => {
+      if (obj instanceof THREE.Mesh) {
+        obj.geometry.computeVertexNormals();
+        obj.geometry.computeBoundingSphere();
+        const mesh = new THREE.InstancedMesh(
+          obj.geometry,
+          obj.material,
+          numInstances,
+        );
+        mesh.castShadow = true;
+        mesh.receiveShadow = true;
+        out.push({ mesh: mesh, T_root_mesh: obj.matrixWorld.clone() });
+      }
+    });
+    return out;
+  }, [gltf, numInstances]);
+  React.useEffect(() => {
+    return () => {
+      // Geometries and materials are owned by the GLTF asset.
+      instancedMeshes.forEach(({ mesh }) => mesh.dispose());
+    };
+  }, [instancedMeshes]);
+
+  // Update instance matrices.
+  React.useEffect(() => {
+    const wxyzs = float32ArrayFromBinary(props.batched_wxyzs);
+    const positions = float32ArrayFromBinary(props.batched_positions);
+    const scales = float32ArrayFromBinary(props.batched_scales);
+    instancedMeshes.forEach(({ mesh, T_root_mesh }) =>
+      setInstanceMatrices(mesh, wxyzs, positions, scales, T_root_mesh),
+    );
+  }, [
+    props.batched_wxyzs,
+    props.batched_positions,
+    props.batched_scales,
+    instancedMeshes,
+  ]);
+
+  return (
+    <group ref={ref}>
+      {instancedMeshes.map(({ mesh }) => (
+        <primitive key={mesh.uuid} object={mesh}>
+          <OutlinesIfHovered />
+        </primitive>
+      ))}
+    </group>
+  );
+});
+
 export const ViserImage = React.forwardRef<THREE.Group, ImageMessage>(
   function ViserImage(message, ref) {
     const [imageTexture, setImageTexture] = React.useState<THREE.Texture>();
@@ -856,6 +1386,278 @@ export const CameraFrustum = React.forwardRef<
   );
 });
 
+const FrustumAtlasMaterial = /* @__PURE__ */ shaderMaterial(
+  {
+    atlas: null,
+    atlasGrid: new THREE.Vector2(1, 1),
+  },
+  `
+  uniform vec2 atlasGrid;
+  varying vec2 vUv;
+
+  void main() {
+      // Thumbnails are packed into the atlas in row-major order, with one
+      // thumbnail per instance.
+      float index = float(gl_InstanceID);
+      vec2 cell = vec2(mod(index, atlasGrid.x), floor(index / atlasGrid.x));
+      vUv = (cell + vec2(uv.x, 1.0 - uv.y)) / atlasGrid;
+      gl_Position = projectionMatrix * modelViewMatrix * instanceMatrix * vec4(position, 1.0);
+  }
+   `,
+  `
+  uniform sampler2D atlas;
+  varying vec2 vUv;
+
+  void main() {
+      gl_FragColor = vec4(texture2D(atlas, vUv).rgb, 1.0);
+  }
+   `,
+);
+
+/** Batched camera frustums. Lines for all frustums are drawn in a single call,
+ * and images are drawn as instanced planes that sample from one texture atlas. */
+export const BatchedCameraFrustums = React.forwardRef<
+  THREE.Group,
+  BatchedCameraFrustumsMessage
+>(function BatchedCameraFrustums(message, ref) {
+  const props = message.props;
+  const meshRef = React.useRef<THREE.InstancedMesh>(null);
+  const atlasTexture = useBinaryTexture(
+    props._atlas_data,
+    props.atlas_media_type,
+  );
+
+  const hoveredRef = React.useContext(HoverableContext);
+  const [isHovered, setIsHovered] = React.useState(false);
+  useFrame(() => {
+    if (hoveredRef !== null && hoveredRef.current !== isHovered) {
+      setIsHovered(hoveredRef.current);
+    }
+  });
+
+  const numFrustums = props.batched_wxyzs.byteLength / (4 * 4);
+  const hasImages = props._atlas_data !== null;
+
+  // Image plane transforms, relative to each frustum. Hidden frustums are
+  // given a zero scale, which keeps instance IDs equal to batch indices.
+  const planeTransforms = React.useMemo(() => {
+    const fovs = float32ArrayFromBinary(props.batched_fovs);
+    const aspects = float32ArrayFromBinary(props.batched_aspects);
+    const transforms: THREE.Matrix4[] = [];
+    const flip = new THREE.Matrix4().makeRotationX(Math.PI);
+    for (let i = 0; i < Math.min(fovs.length, aspects.length); i++) {
+      let y = Math.tan(fovs[i] / 2.0);
+      let z = 1.0;
+      const volumeScale = Math.cbrt((y * aspects[i] * y * z) / 3.0);
+      y *= props.scale / volumeScale;
+      z *= props.scale / volumeScale;
+      const planeScale = props.batched_visible[i] ? 1.0 : 0.0;
+      transforms.push(
+        new THREE.Matrix4()
+          // 0.999999 is to avoid z-fighting with the frustum lines.
+          .makeTranslation(0.0, 0.0, z * 0.999999)
+          .multiply(flip)
+          .multiply(
+            new THREE.Matrix4().makeScale(
+              aspects[i] * y * 2 * planeScale,
+              y * 2 * planeScale,
+              planeScale,
+            ),
+          ),
+      );
+    }
+    return transforms;
+  }, [
+    props.batched_fovs,
+    props.batched_aspects,
+    props.batched_visible,
+    props.scale,
+  ]);
+
+  // Line segments for all visible frustums, in the batch frame.
+  const [linePoints, lineColors] = React.useMemo(() => {
+    const wxyzs = float32ArrayFromBinary(props.batched_wxyzs);
+    const positions = float32ArrayFromBinary(props.batched_positions);
+    const fovs = float32ArrayFromBinary(props.batched_fovs);
+    const aspects = float32ArrayFromBinary(props.batched_aspects);
+    const count = Math.min(
+      wxyzs.length / 4,
+      positions.length / 3,
+      fovs.length,
+      aspects.length,
+      props.batched_colors.length / 3,
+      props.batched_visible.length,
+    );
+    const frustumPoints = [
+      // Rectangle.
+      [-1, -1, 1],
+      [1, -1, 1],
+      [1, -1, 1],
+      [1, 1, 1],
+      [1, 1, 1],
+      [-1, 1, 1],
+      [-1, 1, 1],
+      [-1, -1, 1],
+      // Lines to origin.
+      [-1, -1, 1],
+      [0, 0, 0],
+      [0, 0, 0],
+      [1, -1, 1],
+      // Lines to origin.
+      [-1, 1, 1],
+      [0, 0, 0],
+      [0, 0, 0],
+      [1, 1, 1],
+      // Up direction indicator.
+      // Don't overlap with the image if the image is present.
+      [0.0, -1.2, 1.0],
+      hasImages ? [0.0, -1.0, 1.0] : [0.0, -0.9, 1.0],
+    ];
+
+    let numVisible = 0;
+    for (let i = 0; i < count; i++) if (props.batched_visible[i]) numVisible++;
+    const points = new Float32Array(numVisible * frustumPoints.length * 3);
+    const colors = new Uint8Array(numVisible * frustumPoints.length * 3);
+
+    // Pre-allocate to avoid garbage collector from running during loop.
+    const T_batch_frustum = new THREE.Matrix4();
+    const tmpQuat = new THREE.Quaternion();
+    const tmpPosition = new THREE.Vector3();
+    const tmpScale = new THREE.Vector3();
+    const tmpPoint = new THREE.Vector3();
+    let offset = 0;
+    for (let i = 0; i < count; i++) {
+      if (!props.batched_visible[i]) continue;
+      let y = Math.tan(fovs[i] / 2.0);
+      let x = y * aspects[i];
+      let z = 1.0;
+      const volumeScale = Math.cbrt((x * y * z) / 3.0);
+      x *= props.scale / volumeScale;
+      y *= props.scale / volumeScale;
+      z *= props.scale / volumeScale;
+      T_batch_frustum.compose(
+        tmpPosition.set(
+          positions[i * 3 + 0],
+          positions[i * 3 + 1],
+          positions[i * 3 + 2],
+        ),
+        tmpQuat.set(
+          wxyzs[i * 4 + 1],
+          wxyzs[i * 4 + 2],
+          wxyzs[i * 4 + 3],
+          wxyzs[i * 4 + 0],
+        ),
+        tmpScale.set(x, y, z),
+      );
+      for (const xyz of frustumPoints) {
+        tmpPoint.set(xyz[0], xyz[1], xyz[2]).applyMatrix4(T_batch_frustum);
+        points[offset + 0] = tmpPoint.x;
+        points[offset + 1] = tmpPoint.y;
+        points[offset + 2] = tmpPoint.z;
+        colors[offset + 0] = props.batched_colors[i * 3 + 0];
+        colors[offset + 1] = props.batched_colors[i * 3 + 1];
+        colors[offset + 2] = props.batched_colors[i * 3 + 2];
+        offset += 3;
+      }
+    }
+    return [points, colors];
+  }, [
+    props.batched_wxyzs,
+    props.batched_positions,
+    props.batched_fovs,
+    props.batched_aspects,
+    props.batched_colors,
+    props.batched_visible,
+    props.scale,
+    hasImages,
+  ]);
+
+  const geometry = React.useMemo(() => new THREE.PlaneGeometry(1.0, 1.0), []);
+  const material = React.useMemo(() => new FrustumAtlasMaterial(), []);
+  React.useEffect(() => {
+    return () => {
+      geometry.dispose();
+      material.dispose();
+    };
+  }, [geometry, material]);
+
+  // Image planes are always drawn into the instanced mesh, which is also used
+  // for raycasting. If there are no images, the material is hidden.
+  React.useEffect(() => {
+    material.uniforms.atlas.value = atlasTexture ?? null;
+    material.uniforms.atlasGrid.value.set(
+      Math.max(props.atlas_grid[0], 1),
+      Math.max(props.atlas_grid[1], 1),
+    );
+    material.visible = atlasTexture !== undefined && hasImages;
+  }, [material, atlasTexture, props.atlas_grid, hasImages]);
+
+  React.useEffect(() => {
+    const mesh = meshRef.current!;
+    const wxyzs = float32ArrayFromBinary(props.batched_wxyzs);
+    const positions = float32ArrayFromBinary(props.batched_positions);
+    const T_parent_frustum = new THREE.Matrix4();
+    const tmpQuat = new THREE.Quaternion();
+    const tmpPosition = new THREE.Vector3();
+    const unitScale = new THREE.Vector3(1.0, 1.0, 1.0);
+    const count = Math.min(
+      wxyzs.length / 4,
+      positions.length / 3,
+      planeTransforms.length,
+      mesh.instanceMatrix.count,
+    );
+    for (let i = 0; i < count; i++) {
+      T_parent_frustum.compose(
+        tmpPosition.set(
+          positions[i * 3 + 0],
+          positions[i * 3 + 1],
+          positions[i * 3 + 2],
+        ),
+        tmpQuat.set(
+          wxyzs[i * 4 + 1],
+          wxyzs[i * 4 + 2],
+          wxyzs[i * 4 + 3],
+          wxyzs[i * 4 + 0],
+        ),
+        unitScale,
+      );
+      mesh.setMatrixAt(i, T_parent_frustum.multiply(planeTransforms[i]));
+    }
+    mesh.count = count;
+    mesh.instanceMatrix.needsUpdate = true;
+    mesh.boundingSphere = null;
+    mesh.boundingBox = null;
+  }, [
+    props.batched_wxyzs,
+    props.batched_positions,
+    planeTransforms,
+    numFrustums,
+  ]);
+
+  return (
+    <group ref={ref}>
+      {linePoints.length > 0 && (
+        <TypedArrayLine
+          points={linePoints}
+          vertexColors={isHovered ? undefined : lineColors}
+          color={0xfbff00}
+          lineWidth={isHovered ? 1.5 * props.line_width : props.line_width}
+          segments
+          // Clicks are detected using the image planes, which map directly
+          // to batch indices.
+          raycast={() => null}
+        />
+      )}
+      <instancedMesh
+        ref={meshRef}
+        args={[geometry, material, numFrustums]}
+        frustumCulled={false}
+        castShadow
+      />
+    </group>
+  );
+});
+
 /** Outlines object, which should be placed as a child of all meshes that might
  * be clickable. */
 export function OutlinesIfHovered(
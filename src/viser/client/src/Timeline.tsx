@@ -0,0 +1,181 @@
+import { ActionIcon, Paper, Slider, Text, useMantineTheme } from "@mantine/core";
+import {
+  IconPlayerPauseFilled,
+  IconPlayerPlayFilled,
+} from "@tabler/icons-react";
+import React from "react";
+import { TimelineState, ViewerContext } from "./ViewerContext";
+import { TimelineMessage } from "./WebsocketMessages";
+import { makeThrottledMessageSender } from "./WebsocketFunctions";
+
+/** Returns the [start, end] time range of a timeline. The last frame is shown
+ * for as long as the interval before it. */
+function timelineRange(timeline: TimelineState): [number, number] {
+  const frames = timeline.frames;
+  if (frames.length === 0) return [0.0, 0.0];
+  const last = frames[frames.length - 1].timestamp;
+  const lastInterval =
+    frames.length >= 2 ? last - frames[frames.length - 2].timestamp : 0.0;
+  return [frames[0].timestamp, last + lastInterval];
+}
+
+/** Compute the current time of a timeline, accounting for playback. */
+function timelineTime(timeline: TimelineState): number {
+  const config = timeline.config!;
+  const [start, end] = timelineRange(timeline);
+  const duration = end - start;
+  let t = timeline.time;
+  if (config.playing)
+    t += ((performance.now() - timeline.anchorMs) / 1000.0) * config.rate;
+  if (config.loop && duration > 0.0) {
+    return start + ((((t - start) % duration) + duration) % duration);
+  }
+  return Math.min(Math.max(t, start), end);
+}
+
+/** Index of the last frame at or before a time, or null if there is none. */
+function frameIndexAt(timeline: TimelineState, t: number): number | null {
+  const frames = timeline.frames;
+  if (frames.length === 0 || frames[0].timestamp > t) return null;
+  let lo = 0;
+  let hi = frames.length - 1;
+  while (lo < hi) {
+    const mid = (lo + hi + 1) >> 1;
+    if (frames[mid].timestamp <= t) lo = mid;
+    else hi = mid - 1;
+  }
+  return lo;
+}
+
+/** Plays back the scene timeline, by hiding nodes in inactive frames. Also
+ * shows playback controls if requested by the server. */
+export function TimelineControls() {
+  const viewer = React.useContext(ViewerContext)!;
+  const theme = useMantineTheme();
+  const [config, setConfig] = React.useState<TimelineMessage | null>(null);
+  const [range, setRange] = React.useState<[number, number]>([0.0, 0.0]);
+  const [currentTime, setCurrentTime] = React.useState(0.0);
+  const sendTimeThrottled = React.useMemo(
+    () => makeThrottledMessageSender(viewer, 50),
+    [viewer],
+  );
+
+  React.useEffect(() => {
+    let animationFrame = 0;
+    let lastVersion = -1;
+    let activeIndex: number | null = null;
+
+    function setFrameVisibility(index: number | null, visible: boolean) {
+      if (index === null) return;
+      const attrs = viewer.nodeAttributesFromName.current;
+      viewer.timelineState.current.frames[index]?.nodeNames.forEach((name) => {
+        if (attrs[name] === undefined) attrs[name] = {};
+        attrs[name]!.timelineVisibility = visible;
+      });
+    }
+
+    function update() {
+      animationFrame = requestAnimationFrame(update);
+      const timeline = viewer.timelineState.current;
+      const versionChanged = timeline.version !== lastVersion;
+      if (versionChanged) {
+        lastVersion = timeline.version;
+        setConfig(timeline.config);
+        setRange(timelineRange(timeline));
+      }
+      if (timeline.config === null) {
+        activeIndex = null;
+        return;
+      }
+
+      const t = timelineTime(timeline);
+      const index = frameIndexAt(timeline, t);
+      if (versionChanged) {
+        // Frames may have been added, so we update all of them.
+        timeline.frames.forEach((_, i) => setFrameVisibility(i, false));
+        setFrameVisibility(index, true);
+      } else if (index !== activeIndex) {
+        setFrameVisibility(activeIndex, false);
+        setFrameVisibility(index, true);
+      }
+      if (index !== activeIndex && timeline.config.notify_time) {
+        sendTimeThrottled({
+          type: "TimelineTimeMessage",
+          time: t,
+          frame_index: index,
+        });
+      }
+      activeIndex = index;
+      setCurrentTime(t);
+    }
+    update();
+    return () => cancelAnimationFrame(animationFrame);
+  }, [viewer, sendTimeThrottled]);
+
+  // Local playback changes. These are not sent to the server.
+  const setPlayback = React.useCallback(
+    (playing: boolean, time?: number) => {
+      const timeline = viewer.timelineState.current;
+      if (timeline.config === null) return;
+      timeline.time = time ?? timelineTime(timeline);
+      timeline.anchorMs = performance.now();
+      timeline.config = { ...timeline.config, playing: playing };
+      timeline.version++;
+    },
+    [viewer],
+  );
+
+  if (config === null || !config.show_controls || range[1] <= range[0])
+    return null;
+  return (
+    <Paper
+      radius="xs"
+      shadow="0.1em 0 1em 0 rgba(0,0,0,0.1)"
+      style={{
+        position: "fixed",
+        // Don't overlap with the file playback controls.
+        bottom: viewer.messageSource === "file_playback" ? "4.5em" : "1em",
+        left: "50%",
+        transform: "translateX(-50%)",
+        width: "25em",
+        maxWidth: "95%",
+        zIndex: 1,
+        padding: "0.5em",
+        display: "flex",
+        alignItems: "center",
+        justifyContent: "space-between",
+        gap: "0.375em",
+      }}
+    >
+      <ActionIcon
+        size="md"
+        variant="subtle"
+        onClick={() => setPlayback(!config.playing)}
+      >
+        {config.playing ? (
+          <IconPlayerPauseFilled height="1.125em" width="1.125em" />
+        ) : (
+          <IconPlayerPlayFilled height="1.125em" width="1.125em" />
+        )}
+      </ActionIcon>
+      <Text
+        size="xs"
+        style={{ fontFamily: theme.fontFamilyMonospace, width: "3.1em" }}
+        ta="center"
+      >
+        {currentTime.toFixed(1)}
+      </Text>
+      <Slider
+        thumbSize={0}
+        radius="xs"
+        step={1e-4}
+        style={{ flexGrow: 1 }}
+        min={range[0]}
+        max={range[1]}
+        value={currentTime}
+        onChange={(value) => setPlayback(false, value)}
+        styles={{ thumb: { display: "none" } }}
+      />
+    </Paper>
+  );
+}
@@ -10,7 +10,31 @@ import { UseSceneTree } from "./SceneTree";
 import "./index.css";
 
 import { UseGui } from "./ControlPanel/GuiState";
-import { GetRenderRequestMessage, Message } from "./WebsocketMessages";
+import {
+  GetRenderRequestMessage,
+  Message,
+  TimelineMessage,
+} from "./WebsocketMessages";
+
+/** Scene timeline, which is played back and scrubbed locally. */
+export type TimelineState = {
+  config: TimelineMessage | null;
+  frames: { timestamp: number; nodeNames: string[] }[];
+  time: number; // Timeline time in seconds at `anchorMs`.
+  anchorMs: number; // performance.now() at last time update.
+  version: number; // Incremented when the config or frames change.
+};
+
+/** Bone animation clip for a skinned mesh, which is played back locally. */
+export type SkinnedMeshAnimationState = {
+  timestamps: Float32Array;
+  poses: Float32Array; // Packed (T, B, 7) wxyz + position.
+  loop: boolean;
+  playing: boolean;
+  time: number; // Clip time in seconds at `anchorMs`.
+  rate: number;
+  anchorMs: number; // performance.now() at last playback update.
+};
 
 export type ViewerContextContents = {
   messageSource: "websocket" | "file_playback";
@@ -39,6 +63,7 @@ export type ViewerContextContents = {
           position?: [number, number, number];
           visibility?: boolean; // Visibility state from the server.
           overrideVisibility?: boolean; // Override from the GUI.
+          timelineVisibility?: boolean; // Hidden by an inactive timeline frame.
         };
   }>;
   nodeRefFromName: React.MutableRefObject<{
@@ -67,8 +92,16 @@ export type ViewerContextContents = {
         wxyz: [number, number, number, number];
         position: [number, number, number];
       }[];
+      // Animation clip, which takes precedence over `poses` when set.
+      animation?: SkinnedMeshAnimationState;
     };
   }>;
+  // Vertex positions for deforming meshes, which are applied to existing
+  // geometry instead of recreating it.
+  meshVertexState: React.MutableRefObject<{
+    [name: string]: { positions: Float32Array; version: number };
+  }>;
+  timelineState: React.MutableRefObject<TimelineState>;
 };
 export const ViewerContext = React.createContext<null | ViewerContextContents>(
   null,
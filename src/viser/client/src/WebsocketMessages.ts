@@ -19,6 +19,31 @@ export interface CameraFrustumMessage {
     _image_data: Uint8Array | null;
   };
 }
+/** Batched camera frustums message. Frustums are instanced on the client, and
+ * images are read from a single texture atlas.
+ *
+ * OpenCV convention, +Z forward. Positions and orientations should follow a
+ * `T_parent_local` convention.
+ *
+ * (automatically generated)
+ */
+export interface BatchedCameraFrustumsMessage {
+  type: "BatchedCameraFrustumsMessage";
+  name: string;
+  props: {
+    batched_wxyzs: Uint8Array;
+    batched_positions: Uint8Array;
+    batched_fovs: Uint8Array;
+    batched_aspects: Uint8Array;
+    batched_colors: Uint8Array;
+    batched_visible: Uint8Array;
+    scale: number;
+    line_width: number;
+    atlas_media_type: "image/jpeg" | "image/png" | null;
+    _atlas_data: Uint8Array | null;
+    atlas_grid: [number, number];
+  };
+}
 /** GlTF message.
  *
  * (automatically generated)
@@ -119,6 +144,30 @@ export interface PointCloudMessage {
     point_ball_norm: number;
   };
 }
+/** Point cloud message, which is unprojected from a depth image on the client.
+ *
+ * Depth is sent as a 3-channel PNG containing 24-bit fixed-point values, with the
+ * same encoding as background image depths. Points are placed in the OpenCV camera
+ * frame, with +Z forward. Pixels with zero depth are skipped.
+ *
+ * (automatically generated)
+ */
+export interface DepthImagePointCloudMessage {
+  type: "DepthImagePointCloudMessage";
+  name: string;
+  props: {
+    _depth_data: Uint8Array;
+    rgb_media_type: "image/jpeg" | "image/png";
+    _rgb_data: Uint8Array;
+    K: [
+      [number, number, number],
+      [number, number, number],
+      [number, number, number],
+    ];
+    point_size: number;
+    point_ball_norm: number;
+  };
+}
 /** Directional light message.
  *
  * (automatically generated)
@@ -242,6 +291,49 @@ export interface SkinnedMeshMessage {
     skin_weights: Uint8Array;
   };
 }
+/** Batched meshes message. A single geometry is instanced once for each
+ * transform, scale, and color.
+ *
+ * Positions and orientations should follow a `T_parent_local` convention, which
+ * corresponds to the R matrix and t vector in `p_parent = [R | t] p_local`.
+ *
+ * (automatically generated)
+ */
+export interface BatchedMeshesMessage {
+  type: "BatchedMeshesMessage";
+  name: string;
+  props: {
+    vertices: Uint8Array;
+    faces: Uint8Array;
+    batched_wxyzs: Uint8Array;
+    batched_positions: Uint8Array;
+    batched_scales: Uint8Array;
+    batched_colors: Uint8Array;
+    wireframe: boolean;
+    opacity: number | null;
+    flat_shading: boolean;
+    side: "front" | "back" | "double";
+    material: "standard" | "toon3" | "toon5";
+  };
+}
+/** Batched GlTF message. The GLB asset is instanced once for each transform
+ * and scale.
+ *
+ * Positions and orientations should follow a `T_parent_local` convention, which
+ * corresponds to the R matrix and t vector in `p_parent = [R | t] p_local`.
+ *
+ * (automatically generated)
+ */
+export interface BatchedGlbMessage {
+  type: "BatchedGlbMessage";
+  name: string;
+  props: {
+    glb_data: Uint8Array;
+    batched_wxyzs: Uint8Array;
+    batched_positions: Uint8Array;
+    batched_scales: Uint8Array;
+  };
+}
 /** Message for transform gizmos.
  *
  * (automatically generated)
@@ -861,6 +953,19 @@ export interface EnableLightsMessage {
   enabled: boolean;
   cast_shadow: boolean;
 }
+/** Server -> client message to update the vertex positions of a mesh, without
+ * resending its faces or recreating it. Used for deforming meshes.
+ *
+ * (automatically generated)
+ */
+export interface MeshVerticesMessage {
+  type: "MeshVerticesMessage";
+  name: string;
+  encoding: "float32" | "float16" | "delta_int16";
+  data: Uint8Array;
+  delta_scale: number;
+  delta_index: number;
+}
 /** Server -> client message to set a skinned mesh bone's orientation.
  *
  * As with all other messages, transforms take the `T_parent_local` convention.
@@ -885,6 +990,44 @@ export interface SetBonePositionMessage {
   bone_index: number;
   position: [number, number, number];
 }
+/** Server -> client message to set the poses of all bones in a skinned mesh.
+ *
+ * As with all other messages, transforms take the `T_parent_local` convention.
+ *
+ * (automatically generated)
+ */
+export interface SetBonePosesMessage {
+  type: "SetBonePosesMessage";
+  name: string;
+  poses: Uint8Array;
+}
+/** Server -> client message to upload a bone animation clip for a skinned
+ * mesh. The clip is interpolated and played back on the client; an empty clip
+ * clears the animation.
+ *
+ * As with all other messages, transforms take the `T_parent_local` convention.
+ *
+ * (automatically generated)
+ */
+export interface SkinnedMeshAnimationMessage {
+  type: "SkinnedMeshAnimationMessage";
+  name: string;
+  timestamps: Uint8Array;
+  poses: Uint8Array;
+  loop: boolean;
+}
+/** Server -> client message to control playback of a skinned mesh animation
+ * clip.
+ *
+ * (automatically generated)
+ */
+export interface SkinnedMeshAnimationPlaybackMessage {
+  type: "SkinnedMeshAnimationPlaybackMessage";
+  name: string;
+  playing: boolean;
+  time: number;
+  rate: number;
+}
 /** Server -> client message to set the camera's position.
  *
  * (automatically generated)
@@ -955,6 +1098,17 @@ export interface SetPositionMessage {
   name: string;
   position: [number, number, number];
 }
+/** Server -> client message to set the poses of many scene nodes at once.
+ *
+ * As with all other messages, transforms take the `T_parent_local` convention.
+ *
+ * (automatically generated)
+ */
+export interface SetPosesMessage {
+  type: "SetPosesMessage";
+  names: string[];
+  poses: Uint8Array;
+}
 /** Client -> server message when a transform control is updated.
  *
  * As with all other messages, transforms take the `T_parent_local` convention.
@@ -1007,6 +1161,47 @@ export interface SceneNodeClickMessage {
   ray_direction: [number, number, number];
   screen_pos: [number, number];
 }
+/** Server -> client message to configure the scene timeline. Playback and
+ * scrubbing of the timeline happen on the client.
+ *
+ * (automatically generated)
+ */
+export interface TimelineMessage {
+  type: "TimelineMessage";
+  playing: boolean;
+  time: number;
+  rate: number;
+  loop: boolean;
+  show_controls: boolean;
+  notify_time: boolean;
+}
+/** Server -> client message to add a frame to the scene timeline. Nodes in a
+ * frame are only shown while that frame is active.
+ *
+ * (automatically generated)
+ */
+export interface TimelineFrameMessage {
+  type: "TimelineFrameMessage";
+  index: number;
+  timestamp: number;
+  node_names: string[];
+}
+/** Server -> client message to remove the scene timeline.
+ *
+ * (automatically generated)
+ */
+export interface TimelineRemoveMessage {
+  type: "TimelineRemoveMessage";
+}
+/** Client -> server message with the current time of the scene timeline.
+ *
+ * (automatically generated)
+ */
+export interface TimelineTimeMessage {
+  type: "TimelineTimeMessage";
+  time: number;
+  frame_index: number | null;
+}
 /** Reset GUI.
  *
  * (automatically generated)
@@ -1201,6 +1396,7 @@ export interface SetGuiPanelLabelMessage {
 
 export type Message =
   | CameraFrustumMessage
+  | BatchedCameraFrustumsMessage
   | GlbMessage
   | FrameMessage
   | BatchedAxesMessage
@@ -1208,6 +1404,7 @@ export type Message =
   | LabelMessage
   | Gui3DMessage
   | PointCloudMessage
+  | DepthImagePointCloudMessage
   | DirectionalLightMessage
   | AmbientLightMessage
   | HemisphereLightMessage
@@ -1216,6 +1413,8 @@ export type Message =
   | SpotLightMessage
   | MeshMessage
   | SkinnedMeshMessage
+  | BatchedMeshesMessage
+  | BatchedGlbMessage
   | TransformControlsMessage
   | ImageMessage
   | LineSegmentsMessage
@@ -1252,8 +1451,12 @@ export type Message =
   | ScenePointerEnableMessage
   | EnvironmentMapMessage
   | EnableLightsMessage
+  | MeshVerticesMessage
   | SetBoneOrientationMessage
   | SetBonePositionMessage
+  | SetBonePosesMessage
+  | SkinnedMeshAnimationMessage
+  | SkinnedMeshAnimationPlaybackMessage
   | SetCameraPositionMessage
   | SetCameraUpDirectionMessage
   | SetCameraLookAtMessage
@@ -1262,11 +1465,16 @@ export type Message =
   | SetCameraFovMessage
   | SetOrientationMessage
   | SetPositionMessage
+  | SetPosesMessage
   | TransformControlsUpdateMessage
   | BackgroundImageMessage
   | SetSceneNodeVisibilityMessage
   | SetSceneNodeClickableMessage
   | SceneNodeClickMessage
+  | TimelineMessage
+  | TimelineFrameMessage
+  | TimelineRemoveMessage
+  | TimelineTimeMessage
   | ResetGuiMessage
   | GuiModalMessage
   | GuiCloseModalMessage
@@ -1285,6 +1493,7 @@ export type Message =
   | SetGuiPanelLabelMessage;
 export type SceneNodeMessage =
   | CameraFrustumMessage
+  | BatchedCameraFrustumsMessage
   | GlbMessage
   | FrameMessage
   | BatchedAxesMessage
@@ -1292,6 +1501,7 @@ export type SceneNodeMessage =
   | LabelMessage
   | Gui3DMessage
   | PointCloudMessage
+  | DepthImagePointCloudMessage
   | DirectionalLightMessage
   | AmbientLightMessage
   | HemisphereLightMessage
@@ -1300,6 +1510,8 @@ export type SceneNodeMessage =
   | SpotLightMessage
   | MeshMessage
   | SkinnedMeshMessage
+  | BatchedMeshesMessage
+  | BatchedGlbMessage
   | TransformControlsMessage
   | ImageMessage
   | LineSegmentsMessage
@@ -1329,6 +1541,7 @@ export type GuiComponentMessage =
   | GuiButtonGroupMessage;
 const typeSetSceneNodeMessage = new Set([
   "CameraFrustumMessage",
+  "BatchedCameraFrustumsMessage",
   "GlbMessage",
   "FrameMessage",
   "BatchedAxesMessage",
@@ -1336,6 +1549,7 @@ const typeSetSceneNodeMessage = new Set([
   "LabelMessage",
   "Gui3DMessage",
   "PointCloudMessage",
+  "DepthImagePointCloudMessage",
   "DirectionalLightMessage",
   "AmbientLightMessage",
   "HemisphereLightMessage",
@@ -1344,6 +1558,8 @@ const typeSetSceneNodeMessage = new Set([
   "SpotLightMessage",
   "MeshMessage",
   "SkinnedMeshMessage",
+  "BatchedMeshesMessage",
+  "BatchedGlbMessage",
   "TransformControlsMessage",
   "ImageMessage",
   "LineSegmentsMessage",
@@ -106,13 +106,21 @@ class ViserUrdf:
     def update_cfg(self, configuration: np.ndarray) -> None:
         """Update the joint angles of the visualized URDF."""
         self._urdf.update_cfg(configuration)
-        for joint, frame_handle in zip(
-            self._urdf.joint_map.values(), self._joint_frames
-        ):
+        if len(self._joint_frames) == 0:
+            return
+
+        Ts_parent_child = []
+        for joint in self._urdf.joint_map.values():
             assert isinstance(joint, yourdfpy.Joint)
-            T_parent_child = self._urdf.get_transform(joint.child, joint.parent)
-            frame_handle.wxyz = tf.SO3.from_matrix(T_parent_child[:3, :3]).wxyz
-            frame_handle.position = T_parent_child[:3, 3] * self._scale
+            Ts_parent_child.append(self._urdf.get_transform(joint.child, joint.parent))
+        Ts = np.stack(Ts_parent_child)
+
+        # Send all joint transforms in a single message.
+        self._target.scene.set_poses(
+            self._joint_frames,
+            wxyzs=tf.SO3.from_matrix(Ts[:, :3, :3]).wxyz,
+            positions=Ts[:, :3, 3] * self._scale,
+        )
 
     def get_actuated_joint_limits(
         self,
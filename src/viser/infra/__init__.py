@@ -4,19 +4,34 @@ We implement abstractions for:
 - Launching a WebSocket+HTTP server on a shared port.
 - Registering callbacks for connection events and incoming messages.
 - Asynchronous message sending, both broadcasted and to individual clients.
+- Connecting to servers without a browser, for load and end-to-end tests.
 - Defining dataclass-based message types.
 - Translating Python message types to TypeScript interfaces.
+- Detecting callbacks that block the event loop.
+- Collecting runtime metrics, which can be exported in the Prometheus format.
+- Tracing message lifecycles, which can be exported as Chrome trace events.
+- Recording sent messages, either in memory, streamed to chunked files, or kept
+  in a bounded ring buffer.
 
 These are what `viser` runs on under-the-hood, and generally won't be useful unless
 you're building a web-based application from scratch.
 """
 
+from ._callback_monitor import CallbackMonitor as CallbackMonitor
+from ._client import WebsockClient as WebsockClient
 from ._infra import ClientId as ClientId
 from ._infra import StateSerializer as StateSerializer
 from ._infra import WebsockClientConnection as WebsockClientConnection
 from ._infra import WebsockMessageHandler as WebsockMessageHandler
 from ._infra import WebsockServer as WebsockServer
 from ._messages import Message as Message
+from ._metrics import ServerStats as ServerStats
+from ._metrics import Summary as Summary
+from ._metrics import TransportStats as TransportStats
+from ._metrics import format_prometheus as format_prometheus
+from ._recording import FlightRecorder as FlightRecorder
+from ._recording import StreamingStateSerializer as StreamingStateSerializer
+from ._tracing import MessageTracer as MessageTracer
 from ._typescript_interface_gen import (
     TypeScriptAnnotationOverride as TypeScriptAnnotationOverride,
 )
@@ -2,11 +2,146 @@ from __future__ import annotations
 
 import asyncio
 import dataclasses
+import functools
+import tempfile
 import threading
 from asyncio.events import AbstractEventLoop
-from typing import AsyncGenerator, Callable, Dict, List, Sequence
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from ._messages import Message
+import numpy as np
+from typing_extensions import Literal, get_args, get_origin
+
+from ._messages import Message, get_type_hints_cached
+from ._tracing import MessageTracer, now_us
+
+
+def _may_hold_payload(annotation: Any) -> bool:
+    """Check whether a field with some type annotation may hold an array or
+    bytes payload, either directly or in a nested dataclass or dictionary.
+    Tuples and lists aren't searched for payloads."""
+    if annotation in (str, int, float, bool, type(None)):
+        return False
+    origin = get_origin(annotation)
+    if origin in (tuple, list, Literal):
+        return False
+    if origin is Union:
+        return any(_may_hold_payload(arg) for arg in get_args(annotation))
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _payload_fields(cls: type) -> Optional[Tuple[str, ...]]:
+    """Get the names of dataclass fields that may hold payloads. Returns None
+    if this can't be determined from type annotations."""
+    try:
+        hints = get_type_hints_cached(cls)
+        fields = dataclasses.fields(cls)
+    except (NameError, TypeError):
+        return None
+    return tuple(
+        field.name for field in fields if _may_hold_payload(hints.get(field.name, Any))
+    )
+
+
+def _iter_payloads(obj: Any) -> Iterator[Tuple[Callable[[Any], None], Any]]:
+    """Iterate over array and bytes payloads in a message, including those in
+    nested dataclasses and dictionaries. Yields setters for replacing each
+    payload, along with the payload itself."""
+    if isinstance(obj, dict):
+        items = tuple(obj.items())
+        set_item = obj.__setitem__
+    elif isinstance(obj, Message) or (
+        dataclasses.is_dataclass(obj) and not isinstance(obj, type)
+    ):
+        keys = _payload_fields(type(obj))
+        items = (
+            tuple(vars(obj).items())
+            if keys is None
+            else tuple((key, getattr(obj, key)) for key in keys)
+        )
+        set_item = functools.partial(setattr, obj)
+    else:
+        return
+
+    for key, value in items:
+        if isinstance(value, (np.ndarray, bytes, memoryview)):
+            yield functools.partial(set_item, key), value
+        else:
+            yield from _iter_payloads(value)
+
+
+def _is_spilled(payload: Any) -> bool:
+    if isinstance(payload, memoryview):
+        payload = payload.obj
+    return isinstance(payload, np.memmap)
+
+
+def _payload_nbytes(message: Message) -> Tuple[int, int]:
+    """Get the number of payload bytes in a message that are kept in memory and
+    on disk, respectively."""
+    if _payload_fields(type(message)) == ():
+        return 0, 0
+
+    in_memory = 0
+    on_disk = 0
+    for _, payload in _iter_payloads(message):
+        nbytes = payload.nbytes if not isinstance(payload, bytes) else len(payload)
+        if _is_spilled(payload):
+            on_disk += nbytes
+        else:
+            in_memory += nbytes
+    return in_memory, on_disk
+
+
+def _add_count(counts: Dict[Any, int], key: Any, delta: int) -> None:
+    """Add to a count, and remove it once it reaches zero."""
+    count = counts.get(key, 0) + delta
+    if count == 0:
+        counts.pop(key, None)
+    else:
+        counts[key] = count
+
+
+def _spill_payloads(
+    message: Message, threshold: int, spill_dir: Optional[Path]
+) -> None:
+    """Move large payloads of a message to memory-mapped temporary files.
+
+    Arrays are replaced with read-only `np.memmap` objects, and bytes with
+    read-only memoryviews. Both are serialized without reading the whole
+    payload into memory."""
+    for set_payload, payload in _iter_payloads(message):
+        if _is_spilled(payload):
+            continue
+        array = (
+            np.ascontiguousarray(payload)
+            if isinstance(payload, np.ndarray)
+            else np.frombuffer(payload, dtype=np.uint8)
+        )
+        if array.nbytes < max(threshold, 1):
+            continue
+
+        # The temporary file is deleted once it's closed. Memory maps keep
+        # their own file descriptor, so data stays available until the
+        # payload is garbage collected.
+        with tempfile.TemporaryFile(dir=spill_dir) as f:
+            f.write(array.data)
+            f.flush()
+            spilled = np.memmap(f, dtype=array.dtype, mode="r", shape=array.shape)
+        set_payload(spilled if isinstance(payload, np.ndarray) else spilled.data)
 
 
 @dataclasses.dataclass
@@ -32,6 +167,60 @@ class AsyncMessageBuffer:
     done: bool = False
     atomic_counter: int = 0
 
+    memory_limit: Optional[int] = None
+    """Approximate limit for payload bytes that buffered messages keep in memory.
+    Once exceeded, large payloads of new persistent messages are spilled to
+    memory-mapped temporary files. `None` means no limit."""
+    spill_threshold: int = 1024 * 1024
+    """Minimum size in bytes for an array or bytes payload to be spilled."""
+    spill_dir: Optional[Union[str, Path]] = None
+    """Directory for spilled payloads. Defaults to the system temporary directory."""
+
+    memory_bytes: int = 0
+    """Payload bytes of buffered messages that are kept in memory."""
+    spilled_bytes: int = 0
+    """Payload bytes of buffered messages that were spilled to disk."""
+    nbytes_from_id: Dict[int, Tuple[int, int]] = dataclasses.field(default_factory=dict)
+    """Payload bytes kept in memory and on disk for each buffered message. Messages
+    without payloads are left out."""
+    nbytes_from_type: Dict[str, int] = dataclasses.field(default_factory=dict)
+    """Payload bytes of buffered messages, grouped by message type."""
+    nbytes_from_owner: Dict[Hashable, int] = dataclasses.field(default_factory=dict)
+    """Payload bytes of buffered messages, grouped by `Message.memory_owners()`."""
+
+    messages_pushed: int = 0
+    messages_culled: int = 0
+    """Number of messages that were removed from the buffer without being sent,
+    for example because they were made redundant by a newer message."""
+
+    tracer: Optional[MessageTracer] = None
+    """Tracer for recording message lifecycles. `None` disables tracing."""
+
+    def _account(self, message: Message, nbytes: Tuple[int, int], sign: int) -> None:
+        """Update memory accounting for a message that was added (sign=1) or
+        removed (sign=-1). Should be called with the buffer lock held."""
+        in_memory, on_disk = nbytes
+        total = in_memory + on_disk
+        if total == 0:
+            return
+
+        self.memory_bytes += sign * in_memory
+        self.spilled_bytes += sign * on_disk
+        _add_count(self.nbytes_from_type, type(message).__name__, sign * total)
+        owners = message.memory_owners()
+        for i, owner in enumerate(owners):
+            share = total // len(owners) + (total % len(owners) if i == 0 else 0)
+            _add_count(self.nbytes_from_owner, owner, sign * share)
+
+    def _pop_message(self, message_id: int, culled: bool = True) -> Optional[Message]:
+        """Remove a message from the buffer. Should be called with the buffer
+        lock held."""
+        message = self.message_from_id.pop(message_id, None)
+        if message is not None:
+            self._account(message, self.nbytes_from_id.pop(message_id, (0, 0)), sign=-1)
+            self.messages_culled += culled
+        return message
+
     def remove_from_buffer(self, match_fn: Callable[[Message], bool]) -> None:
         """Remove messages that match some condition."""
 
@@ -41,20 +230,64 @@ class AsyncMessageBuffer:
                 lambda kv_pair: match_fn(self.message_from_id[kv_pair[0]]),
                 tuple(self.message_from_id.items()),
             ):
-                self.message_from_id.pop(id)
+                self._pop_message(id)
                 self.id_from_redundancy_key.pop(message.redundancy_key())
 
-    def push(self, message: Message) -> None:
-        """Push a new message to our buffer, and remove old redundant ones."""
+    def replace_buffered(self, message: Message) -> None:
+        """Replace the buffered message with the same redundancy key, keeping
+        its position in the buffer. Clients that already received the old
+        message won't be sent the new one, but clients that connect later
+        will. Does nothing if there is no such message."""
+        with self.buffer_lock:
+            message_id = self.id_from_redundancy_key.get(message.redundancy_key())
+            if message_id is None or message_id not in self.message_from_id:
+                return
+            nbytes = _payload_nbytes(message)
+            self._account(
+                self.message_from_id[message_id],
+                self.nbytes_from_id.pop(message_id, (0, 0)),
+                sign=-1,
+            )
+            self._account(message, nbytes, sign=1)
+            self.message_from_id[message_id] = message
+            if nbytes != (0, 0):
+                self.nbytes_from_id[message_id] = nbytes
+
+    def push(self, message: Message) -> Tuple[int, int]:
+        """Push a new message to our buffer, and remove old redundant ones.
+        Returns the message's payload bytes kept in memory and on disk."""
 
         assert isinstance(message, Message)
 
+        tracer = self.tracer
+        start_us = now_us() if tracer is not None else 0.0
+
+        nbytes = _payload_nbytes(message)
+        if (
+            self.memory_limit is not None
+            and self.persistent_messages
+            and self.memory_bytes + nbytes[0] > self.memory_limit
+        ):
+            # This happens before the message is shared with scene node
+            # handles, which then also read payloads from disk.
+            _spill_payloads(
+                message,
+                self.spill_threshold,
+                None if self.spill_dir is None else Path(self.spill_dir),
+            )
+            nbytes = _payload_nbytes(message)
+
         # Add message to buffer.
         redundancy_key = message.redundancy_key()
         with self.buffer_lock:
+            locked_us = now_us() if tracer is not None else 0.0
             new_message_id = self.message_counter
             self.message_from_id[new_message_id] = message
+            if nbytes != (0, 0):
+                self.nbytes_from_id[new_message_id] = nbytes
+            self._account(message, nbytes, sign=1)
             self.message_counter += 1
+            self.messages_pushed += 1
 
             # If an existing message with the same key already exists in our buffer, we
             # don't need the old one anymore. :-)
@@ -63,7 +296,7 @@ class AsyncMessageBuffer:
                 and redundancy_key in self.id_from_redundancy_key
             ):
                 old_message_id = self.id_from_redundancy_key.pop(redundancy_key)
-                self.message_from_id.pop(old_message_id)
+                self._pop_message(old_message_id)
             self.id_from_redundancy_key[redundancy_key] = new_message_id
 
             # Pulse message event to notify consumers that a new message is
@@ -82,6 +315,10 @@ class AsyncMessageBuffer:
                 # atomic_end() is called.
                 self.event_loop.call_soon_threadsafe(self.message_event.set)
 
+        if tracer is not None:
+            tracer.record_push(message, start_us, locked_us, now_us())
+        return nbytes
+
     def atomic_start(self) -> None:
         """Start an atomic block. No new messages/windows should be sent."""
         self.atomic_counter += 1
@@ -129,7 +366,7 @@ class AsyncMessageBuffer:
                 else:
                     # If we're not persisting messages, remove them from the buffer.
                     with self.buffer_lock:
-                        message = self.message_from_id.pop(last_sent_id, None)
+                        message = self._pop_message(last_sent_id, culled=False)
                         if message is not None:
                             redundancy_key = message.redundancy_key()
                             self.id_from_redundancy_key.pop(redundancy_key, None)
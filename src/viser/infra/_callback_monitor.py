@@ -0,0 +1,123 @@
+"""Detection of callbacks that block the event loop."""
+
+from __future__ import annotations
+
+import contextvars
+import dataclasses
+import functools
+import time
+import warnings
+from typing import Any, Awaitable, Callable, Generator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_nested_seconds: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "_nested_seconds", default=None
+)
+"""Time spent in monitored callbacks that are nested in the current one. This is
+subtracted from the current callback's time, so blocking is attributed to the
+innermost callback."""
+
+
+def _qualified_name(cb: Callable) -> str:
+    while isinstance(cb, functools.partial):
+        cb = cb.func
+    qualname = getattr(cb, "__qualname__", None)
+    if qualname is None:
+        return repr(cb)
+    module = getattr(cb, "__module__", None)
+    return qualname if module is None else f"{module}.{qualname}"
+
+
+@dataclasses.dataclass
+class CallbackMonitor:
+    """Times callbacks that run on the event loop, and warns when one blocks the
+    loop for longer than a threshold.
+
+    Coroutines are timed between each suspension, so time spent in `await`
+    doesn't count as blocking."""
+
+    threshold_sec: Optional[float] = 0.1
+    """Blocking duration to warn after. `None` disables monitoring."""
+    slow_callbacks: int = 0
+    """Number of times a callback blocked for longer than the threshold."""
+
+    def call(self, cb: Callable[..., T], *args: Any) -> T:
+        """Call a synchronous callback."""
+        if self.threshold_sec is None:
+            return cb(*args)
+        with _Timer(self, cb):
+            return cb(*args)
+
+    async def run(self, cb: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """Call a coroutine function and await its result."""
+        return await self.timed(cb, cb(*args))
+
+    async def timed(self, cb: Callable, awaitable: Awaitable[T]) -> T:
+        """Await the result of a callback that was already called."""
+        if self.threshold_sec is None:
+            return await awaitable
+        return await _TimedAwaitable(self, cb, awaitable)
+
+    def _report(self, cb: Callable, seconds: float) -> None:
+        if self.threshold_sec is None or seconds <= self.threshold_sec:
+            return
+        self.slow_callbacks += 1
+        warnings.warn(
+            f"[viser] {_qualified_name(cb)} blocked the event loop for"
+            f" {seconds:.3f} seconds, which delays messages for all clients."
+            " Consider using a synchronous callback, which runs in a thread"
+            " pool, or moving slow work out of the event loop."
+        )
+
+
+class _Timer:
+    """Context for timing one synchronous step of a callback."""
+
+    def __init__(self, monitor: CallbackMonitor, cb: Callable) -> None:
+        self._monitor = monitor
+        self._cb = cb
+
+    def __enter__(self) -> None:
+        self._nested = [0.0]
+        self._token = _nested_seconds.set(self._nested)
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self._start
+        _nested_seconds.reset(self._token)
+        parent = _nested_seconds.get()
+        if parent is not None:
+            parent[0] += elapsed
+        self._monitor._report(self._cb, elapsed - self._nested[0])
+
+
+class _TimedAwaitable:
+    """Awaitable that drives a coroutine while timing each step."""
+
+    def __init__(
+        self, monitor: CallbackMonitor, cb: Callable, awaitable: Awaitable
+    ) -> None:
+        self._monitor = monitor
+        self._cb = cb
+        self._awaitable = awaitable
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        inner = self._awaitable.__await__()
+        value: Any = None
+        error: Optional[BaseException] = None
+        while True:
+            try:
+                with _Timer(self._monitor, self._cb):
+                    if error is None:
+                        yielded = inner.send(value)
+                    else:
+                        yielded = inner.throw(error)
+            except StopIteration as e:
+                return e.value
+            try:
+                value = yield yielded
+                error = None
+            except BaseException as e:
+                value = None
+                error = e
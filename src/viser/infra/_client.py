@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, Callable, TypeVar
+
+import msgspec
+import websockets.asyncio.client
+import websockets.exceptions
+from typing_extensions import Literal, Self, assert_never
+
+from ._messages import Message
+
+TMessage = TypeVar("TMessage", bound=Message)
+
+
+class WebsockClient:
+    """Headless client for a :class:`WebsockServer`, which speaks the same
+    protocol as the browser client. Useful for load tests and end-to-end
+    tests.
+
+    Clients run on an asyncio event loop, and many can be connected from the
+    same process:
+
+    .. code-block:: python
+
+        async with WebsockClient("ws://localhost:8080") as client:
+            await client.send(message)
+            await client.wait_until(lambda: len(client.message_from_key) > 0)
+
+    Incoming messages are mirrored in :attr:`message_from_key`, which keeps the
+    latest message for each redundancy key. This matches the state that the
+    server keeps for new clients.
+
+    Args:
+        url: Websocket URL of the server.
+        message_class: Base class for message types.
+        client_api_version: Should match the server's `client_api_version`. 0
+            receives individual messages. 1 receives windowed messages.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        message_class: type[Message] = Message,
+        client_api_version: Literal[0, 1] = 1,
+    ) -> None:
+        self._url = url
+        self._message_class = message_class
+        self._client_api_version: Literal[0, 1] = client_api_version
+        self._websocket: websockets.asyncio.client.ClientConnection | None = None
+        self._receive_task: asyncio.Task | None = None
+        self._incoming_handlers: dict[
+            type[Message], list[Callable[[Message], None | Coroutine]]
+        ] = {}
+        self._window_event: asyncio.Event | None = None
+
+        self.message_from_key: dict[str, Message] = {}
+        """Latest incoming message for each redundancy key."""
+        self.windows_received = 0
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+
+    async def __aenter__(self) -> Self:
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        """Connect to the server, and start receiving messages."""
+        assert self._websocket is None, "Already connected."
+        self._websocket = await websockets.asyncio.client.connect(
+            self._url,
+            # Compression can be too slow for our use cases.
+            compression=None,
+            max_size=None,
+        )
+        self._window_event = asyncio.Event()
+        self._receive_task = asyncio.create_task(self._receive_loop())
+
+    async def close(self) -> None:
+        """Disconnect from the server."""
+        if self._websocket is None:
+            return
+        await self._websocket.close()
+        assert self._receive_task is not None
+        await self._receive_task
+        self._websocket = None
+        self._receive_task = None
+
+    async def send(self, message: Message) -> None:
+        """Send a message to the server."""
+        assert self._websocket is not None, "Not connected."
+        serialized = msgspec.msgpack.encode(message.as_serializable_dict())
+        await self._websocket.send(serialized)
+        self.messages_sent += 1
+        self.bytes_sent += len(serialized)
+
+    def register_handler(
+        self,
+        message_cls: type[TMessage],
+        callback: Callable[[TMessage], None | Coroutine],
+    ) -> None:
+        """Register a handler for a particular incoming message type."""
+        if message_cls not in self._incoming_handlers:
+            self._incoming_handlers[message_cls] = []
+        self._incoming_handlers[message_cls].append(callback)  # type: ignore
+
+    async def wait_until(
+        self, condition: Callable[[], bool], timeout: float | None = None
+    ) -> None:
+        """Wait until a condition on mirrored state is satisfied. The condition
+        is checked after each incoming window of messages.
+
+        Args:
+            condition: Condition to wait for.
+            timeout: Timeout in seconds. None waits forever.
+        """
+
+        window_event = self._window_event
+        assert window_event is not None, "Not connected."
+
+        async def wait() -> None:
+            while not condition():
+                window_event.clear()
+                await window_event.wait()
+
+        await asyncio.wait_for(wait(), timeout)
+
+    def _mirror(self, message: Message) -> None:
+        """Update mirrored state with an incoming message. Newer messages
+        replace older ones with the same redundancy key."""
+        key = message.redundancy_key()
+        self.message_from_key.pop(key, None)
+        self.message_from_key[key] = message
+
+    async def _handle_incoming_message(self, message: Message) -> None:
+        self._mirror(message)
+        for cb in self._incoming_handlers.get(type(message), []):
+            if asyncio.iscoroutinefunction(cb):
+                await cb(message)
+            else:
+                cb(message)
+
+    async def _receive_loop(self) -> None:
+        """Infinite loop waiting for and then handling incoming messages."""
+        assert self._websocket is not None
+        assert self._window_event is not None
+        try:
+            async for raw in self._websocket:
+                assert isinstance(raw, bytes)
+                if self._client_api_version == 1:
+                    messages = self._message_class.deserialize_window(raw)
+                elif self._client_api_version == 0:
+                    messages = [self._message_class.deserialize(raw)]
+                else:
+                    assert_never(self._client_api_version)
+                self.windows_received += 1
+                self.messages_received += len(messages)
+                self.bytes_received += len(raw)
+                for message in messages:
+                    await self._handle_incoming_message(message)
+                self._window_event.set()
+        except websockets.exceptions.ConnectionClosedError:
+            pass
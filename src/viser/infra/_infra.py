@@ -3,17 +3,21 @@ from __future__ import annotations
 import abc
 import asyncio
 import contextlib
+import copy
 import dataclasses
 import gzip
+import hashlib
 import http
 import logging
 import mimetypes
 import queue
+import shutil
 import threading
+import time
 from asyncio.events import AbstractEventLoop
 from collections.abc import Coroutine
 from pathlib import Path
-from typing import Any, Callable, Generator, NewType, TypeVar
+from typing import Any, Callable, Generator, NewType, Sequence, TypeVar
 
 import msgspec
 import rich
@@ -26,7 +30,16 @@ from websockets.asyncio.server import ServerConnection
 from websockets.http11 import Request, Response
 
 from ._async_message_buffer import AsyncMessageBuffer
+from ._callback_monitor import CallbackMonitor
 from ._messages import Message
+from ._metrics import ServerStats, TransportStats, format_prometheus
+from ._recording import (
+    FlightRecorder,
+    StreamingStateSerializer,
+    _BlobTable,
+    compress_parallel,
+)
+from ._tracing import MessageTracer
 
 
 @dataclasses.dataclass
@@ -35,6 +48,7 @@ class _ClientHandleState:
     # message_buffer: asyncio.Queue
     message_buffer: AsyncMessageBuffer
     event_loop: AbstractEventLoop
+    stats: TransportStats = dataclasses.field(default_factory=TransportStats)
 
 
 ClientId = NewType("ClientId", int)
@@ -53,6 +67,10 @@ class StateSerializer:
         self._time: float = 0.0
         self._messages: list[tuple[float, dict[str, Any]]] = []
 
+        # Payloads are copied when they're recorded, and identical payloads
+        # are stored once.
+        self._blobs = _BlobTable()
+
     def _insert_message(self, message: Message) -> None:
         """Insert a message into the recorded file."""
 
@@ -60,7 +78,12 @@ class StateSerializer:
         # GUI messages.
         if not self._filter(message):
             return
-        self._messages.append((self._time, message.as_serializable_dict()))
+        self._messages.append(
+            (
+                self._time,
+                self._blobs.replace_payloads(message.as_serializable_dict(), {}),
+            )
+        )
 
     def insert_sleep(self, duration: float) -> None:
         """Insert a sleep into the recorded file. This can be useful for
@@ -70,14 +93,110 @@ class StateSerializer:
         )
         self._time += duration
 
-    def serialize(self) -> bytes:
+    def serialize(
+        self,
+        compresslevel: int = 9,
+        chunk_size_bytes: int = 16 * 1024 * 1024,
+        num_workers: int | None = None,
+    ) -> bytes:
         """Serialize saved messages. Should only be called once. Our convention
         is to write this binary format to a file with a ``.viser`` extension,
         for example via ``pathlib.Path("file.viser").write_bytes(...)``.
 
+        The output is compressed as a multi-member gzip stream. Members are
+        compressed in parallel, so larger recordings are faster to serialize
+        when they contain several chunks.
+
+        Args:
+            compresslevel: gzip compression level, from 0 to 9.
+            chunk_size_bytes: Number of bytes to compress in each gzip member,
+                before compression.
+            num_workers: Number of threads for compression. None for a default
+                based on the number of CPUs.
+
         Returns:
             The recording as bytes.
         """
+        return compress_parallel(
+            self._pack(self._blobs.new_blobs, blob_files=None),
+            compresslevel,
+            chunk_size_bytes,
+            num_workers,
+        )
+
+    def export_bundle(
+        self,
+        output_dir: str | Path,
+        scene_name: str = "scene",
+        include_client: bool = True,
+        min_file_bytes: int = 64 * 1024,
+        compresslevel: int = 9,
+    ) -> Path:
+        """Write saved messages to a directory for static hosting. Should only
+        be called once, and not together with :meth:`serialize()`.
+
+        The directory contains a small ``.viser`` manifest with the messages,
+        and large array and bytes payloads as separate files in ``blobs/``.
+        Payload files are named by a hash of their contents. They can be
+        cached indefinitely, and are shared by scenes that are exported to
+        the same directory. The viewer starts playback before all payload
+        files are downloaded.
+
+        Args:
+            output_dir: Directory to write to. Created if it doesn't exist.
+            scene_name: Name of the manifest file, without its extension.
+            include_client: Copy a build of the viewer into the directory, so
+                that it can be hosted as-is. The scene is then shown by
+                opening ``index.html?playbackPath=<scene_name>.viser``.
+            min_file_bytes: Payloads smaller than this are kept in the
+                manifest instead of separate files.
+            compresslevel: gzip compression level of the manifest, from 0 to 9.
+
+        Returns:
+            Path to the manifest.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        inline_blobs: list[tuple[int, bytes]] = []
+        blob_files: list[tuple[int, str, int]] = []
+        for blob_id, blob in self._blobs.new_blobs:
+            if len(blob) < min_file_bytes:
+                inline_blobs.append((blob_id, blob))
+                continue
+            name = f"blobs/{hashlib.blake2b(blob, digest_size=16).hexdigest()}.bin"
+            blob_files.append((blob_id, name, len(blob)))
+            blob_path = output_dir / name
+            if not blob_path.exists():
+                # Write atomically, since existing files are never rewritten.
+                blob_path.parent.mkdir(exist_ok=True)
+                tmp_path = blob_path.with_suffix(".tmp")
+                tmp_path.write_bytes(blob)
+                tmp_path.replace(blob_path)
+
+        manifest_path = output_dir / f"{scene_name}.viser"
+        manifest_path.write_bytes(
+            compress_parallel(
+                self._pack(inline_blobs, blob_files),
+                compresslevel,
+                chunk_size_bytes=16 * 1024 * 1024,
+                num_workers=None,
+            )
+        )
+
+        if include_client:
+            from .._client_autobuild import build_dir, ensure_client_is_built
+
+            ensure_client_is_built()
+            shutil.copytree(build_dir, output_dir, dirs_exist_ok=True)
+        return manifest_path
+
+    def _pack(
+        self,
+        blobs: list[tuple[int, bytes]],
+        blob_files: list[tuple[int, str, int]] | None,
+    ) -> bytes:
+        """Encode saved messages, and stop recording."""
         assert self._handler._record_handle is not None, (
             "serialize() was already called!"
         )
@@ -86,13 +205,16 @@ class StateSerializer:
         packed_bytes = msgspec.msgpack.encode(
             {
                 "durationSeconds": self._time,
+                "blobs": blobs,
+                # (blob ID, path relative to the manifest, size in bytes).
+                **({"blobFiles": blob_files} if blob_files is not None else {}),
                 "messages": self._messages,
                 "viserVersion": viser.__version__,
             }
         )
         assert isinstance(packed_bytes, bytes)
         self._handler._record_handle = None
-        return gzip.compress(packed_bytes, compresslevel=9)
+        return packed_bytes
 
 
 class WebsockMessageHandler:
@@ -106,7 +228,11 @@ class WebsockMessageHandler:
         self._locked_thread_id = -1
 
         # Set to None if not recording.
-        self._record_handle: StateSerializer | None = None
+        self._record_handle: StateSerializer | StreamingStateSerializer | None = None
+        self._flight_recorder: FlightRecorder | None = None
+
+        # Timing for callbacks that run on the event loop.
+        self._callback_monitor = CallbackMonitor()
 
     def get_message_serializer(
         self, filter: Callable[[Message], bool]
@@ -117,6 +243,35 @@ class WebsockMessageHandler:
         self._record_handle = StateSerializer(self, filter)
         return self._record_handle
 
+    def get_streaming_message_serializer(
+        self,
+        filter: Callable[[Message], bool],
+        path: Path,
+        chunk_size_bytes: int = 4 * 1024 * 1024,
+        compresslevel: int = 6,
+        keyframe_interval_sec: float | None = 10.0,
+    ) -> StreamingStateSerializer:
+        """Start recording messages that are sent directly to a chunked file.
+        Unlike :meth:`get_message_serializer`, memory usage is bounded."""
+        assert self._record_handle is None, "Already recording."
+        out = StreamingStateSerializer(
+            self, filter, path, chunk_size_bytes, compresslevel, keyframe_interval_sec
+        )
+        self._record_handle = out
+        return out
+
+    def start_flight_recorder(
+        self,
+        filter: Callable[[Message], bool],
+        max_seconds: float | None,
+        max_bytes: int | None,
+    ) -> FlightRecorder:
+        """Start keeping recently sent messages in a bounded ring buffer. This
+        is independent of :meth:`get_message_serializer`."""
+        assert self._flight_recorder is None, "Flight recorder already started."
+        self._flight_recorder = FlightRecorder(filter, max_seconds, max_bytes)
+        return self._flight_recorder
+
     def register_handler(
         self,
         message_cls: type[TMessage],
@@ -148,9 +303,9 @@ class WebsockMessageHandler:
         if type(message) in self._incoming_handlers:
             for cb in self._incoming_handlers[type(message)]:
                 if asyncio.iscoroutinefunction(cb):
-                    await cb(client_id, message)
+                    await self._callback_monitor.run(cb, client_id, message)
                 else:
-                    cb(client_id, message)
+                    self._callback_monitor.call(cb, client_id, message)
 
     @abc.abstractmethod
     def get_message_buffer(self) -> AsyncMessageBuffer: ...
@@ -160,7 +315,9 @@ class WebsockMessageHandler:
         if self._record_handle is not None:
             self._record_handle._insert_message(message)
 
-        self.get_message_buffer().push(message)
+        nbytes = self.get_message_buffer().push(message)
+        if self._flight_recorder is not None:
+            self._flight_recorder._insert_message(message, sum(nbytes))
 
     @contextlib.contextmanager
     def atomic(self) -> Generator[None, None, None]:
@@ -218,6 +375,17 @@ class WebsockServer(WebsockMessageHandler):
         verbose: Toggle for print messages.
         client_api_version: Flag for backwards compatibility. 0 sends individual
             messages. 1 sends windowed messages.
+        buffer_memory_limit: Approximate limit in bytes for message payloads
+            that are kept in memory for new clients. Once exceeded, large
+            payloads are spilled to memory-mapped temporary files. None means
+            no limit.
+        buffer_spill_dir: Directory for spilled payloads. Defaults to the
+            system temporary directory.
+        metrics_endpoint: Serve statistics from `get_stats()` at `/metrics`, in
+            the Prometheus text format. Requires `http_server_root` to be set.
+        slow_callback_threshold: Warn when a message handler or an async
+            callback blocks the event loop for longer than this many seconds.
+            None disables the warnings.
     """
 
     def __init__(
@@ -228,8 +396,13 @@ class WebsockServer(WebsockMessageHandler):
         http_server_root: Path | None = None,
         verbose: bool = True,
         client_api_version: Literal[0, 1] = 0,
+        buffer_memory_limit: int | None = None,
+        buffer_spill_dir: str | Path | None = None,
+        metrics_endpoint: bool = False,
+        slow_callback_threshold: float | None = 0.1,
     ):
         super().__init__()
+        self._callback_monitor.threshold_sec = slow_callback_threshold
 
         # Track connected clients.
         self._client_connect_cb: list[
@@ -245,12 +418,23 @@ class WebsockServer(WebsockMessageHandler):
         self._http_server_root = http_server_root
         self._verbose = verbose
         self._client_api_version: Literal[0, 1] = client_api_version
+        self._buffer_memory_limit = buffer_memory_limit
+        self._buffer_spill_dir = buffer_spill_dir
+        self._metrics_endpoint = metrics_endpoint
         self._background_event_loop: asyncio.AbstractEventLoop | None = None
 
         self._stop_event: asyncio.Event | None = None
 
         self._client_state_from_id: dict[int, _ClientHandleState] = {}
 
+        # Runtime statistics.
+        self._start_time = time.time()
+        self._total_stats = TransportStats()
+        self._gauges: dict[str, Callable[[], float]] = {}
+        self._event_loop_lag = 0.0
+        self._max_event_loop_lag = 0.0
+        self._tracer: MessageTracer | None = None
+
     def start(self) -> None:
         """Start the server."""
 
@@ -291,6 +475,56 @@ class WebsockServer(WebsockMessageHandler):
         """Pushes a message onto the broadcast queue. Message will be sent to all clients."""
         return self._broadcast_buffer
 
+    def register_gauge(self, name: str, fn: Callable[[], float]) -> None:
+        """Register a custom gauge, which is read for `get_stats()` and the
+        metrics endpoint."""
+        self._gauges[name] = fn
+
+    def get_stats(self) -> ServerStats:
+        """Get a snapshot of runtime statistics for the server and each connected
+        client."""
+        buffer = self._broadcast_buffer
+        with buffer.buffer_lock:
+            messages_pushed = buffer.messages_pushed
+            messages_culled = buffer.messages_culled
+            buffered_messages = len(buffer.message_from_id)
+            buffered_bytes = buffer.memory_bytes + buffer.spilled_bytes
+        client_state_from_id = dict(self._client_state_from_id)
+        return ServerStats(
+            uptime_seconds=time.time() - self._start_time,
+            connected_clients=len(client_state_from_id),
+            messages_pushed=messages_pushed,
+            messages_culled=messages_culled,
+            buffered_messages=buffered_messages,
+            buffered_bytes=buffered_bytes,
+            event_loop_lag_seconds=self._event_loop_lag,
+            max_event_loop_lag_seconds=self._max_event_loop_lag,
+            slow_callbacks=self._callback_monitor.slow_callbacks,
+            gauges={name: float(fn()) for name, fn in self._gauges.items()},
+            total=copy.deepcopy(self._total_stats),
+            clients={
+                client_id: copy.deepcopy(state.stats)
+                for client_id, state in client_state_from_id.items()
+            },
+        )
+
+    def set_tracer(self, tracer: MessageTracer | None) -> None:
+        """Set a tracer for recording the lifecycle of messages sent to all
+        clients. `None` disables tracing."""
+        self._tracer = tracer
+        self._broadcast_buffer.tracer = tracer
+        for state in tuple(self._client_state_from_id.values()):
+            state.message_buffer.tracer = tracer
+
+    async def _monitor_event_loop_lag(self, interval_sec: float = 0.1) -> None:
+        """Measure how late scheduled callbacks run in the event loop."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval_sec)
+            lag = max(time.perf_counter() - start - interval_sec, 0.0)
+            self._event_loop_lag = lag
+            self._max_event_loop_lag = max(self._max_event_loop_lag, lag)
+
     def flush(self) -> None:
         """Flush the outgoing message buffer for broadcasted messages. Any buffered
         messages will immediately be sent. (by default they are windowed)"""
@@ -313,7 +547,11 @@ class WebsockServer(WebsockMessageHandler):
         self._stop_event = asyncio.Event()
         self._background_event_loop = event_loop
         self._broadcast_buffer = AsyncMessageBuffer(
-            event_loop, persistent_messages=True
+            event_loop,
+            persistent_messages=True,
+            memory_limit=self._buffer_memory_limit,
+            spill_dir=self._buffer_spill_dir,
+            tracer=self._tracer,
         )
 
         count_lock = asyncio.Lock()
@@ -333,10 +571,13 @@ class WebsockServer(WebsockMessageHandler):
                 total_connections += 1
 
             client_state = _ClientHandleState(
-                AsyncMessageBuffer(event_loop, persistent_messages=False),
+                AsyncMessageBuffer(
+                    event_loop, persistent_messages=False, tracer=self._tracer
+                ),
                 event_loop,
             )
             client_connection = WebsockClientConnection(client_id, client_state)
+            client_connection._callback_monitor = self._callback_monitor
             self._client_state_from_id[client_id] = client_state
 
             def handle_incoming(message: Message) -> None:
@@ -350,9 +591,9 @@ class WebsockServer(WebsockMessageHandler):
             # New connection callbacks.
             for cb in self._client_connect_cb:
                 if asyncio.iscoroutinefunction(cb):
-                    await cb(client_connection)
+                    await self._callback_monitor.run(cb, client_connection)
                 else:
-                    cb(client_connection)
+                    self._callback_monitor.call(cb, client_connection)
 
             if self._verbose:
                 rich.print(
@@ -369,16 +610,23 @@ class WebsockServer(WebsockMessageHandler):
                     _message_producer(
                         connection,
                         client_state.message_buffer,
+                        (client_state.stats, self._total_stats),
                         client_id,
                         self._client_api_version,
                     ),
                     _message_producer(
                         connection,
                         self._broadcast_buffer,
+                        (client_state.stats, self._total_stats),
                         client_id,
                         self._client_api_version,
                     ),
-                    _message_consumer(connection, handle_incoming, message_class),
+                    _message_consumer(
+                        connection,
+                        handle_incoming,
+                        message_class,
+                        (client_state.stats, self._total_stats),
+                    ),
                 )
             except (
                 websockets.exceptions.ConnectionClosedOK,
@@ -395,9 +643,9 @@ class WebsockServer(WebsockMessageHandler):
                 # Disconnection callbacks.
                 for cb in self._client_disconnect_cb:
                     if asyncio.iscoroutinefunction(cb):
-                        await cb(client_connection)
+                        await self._callback_monitor.run(cb, client_connection)
                     else:
-                        cb(client_connection)
+                        self._callback_monitor.call(cb, client_connection)
 
                 # Cleanup.
                 self._client_state_from_id.pop(client_id)
@@ -436,6 +684,16 @@ class WebsockServer(WebsockMessageHandler):
             if request.headers.get("Upgrade") == "websocket":
                 return None
 
+            if self._metrics_endpoint and request.path.partition("?")[0] == "/metrics":
+                return Response(
+                    http.HTTPStatus.OK,
+                    "OK",
+                    websockets.datastructures.Headers(
+                        **{"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+                    ),
+                    format_prometheus(self.get_stats()).encode("utf-8"),
+                )
+
             # Strip out search params, get relative path.
             path = request.path
             path = path.partition("?")[0]
@@ -519,7 +777,11 @@ class WebsockServer(WebsockMessageHandler):
                         self._port = port_attempt
                         ready_sem.release()
                         assert self._stop_event is not None
+                        lag_monitor = event_loop.create_task(
+                            self._monitor_event_loop_lag()
+                        )
                         await self._stop_event.wait()
+                        lag_monitor.cancel()
                         return
                 except OSError:  # Port not available.
                     port_attempt += 1
@@ -532,24 +794,49 @@ class WebsockServer(WebsockMessageHandler):
 async def _message_producer(
     websocket: ServerConnection,
     buffer: AsyncMessageBuffer,
+    stats: tuple[TransportStats, ...],
     client_id: int,
     client_api_version: Literal[0, 1],
 ) -> None:
     """Infinite loop to broadcast windows of messages from a buffer."""
+
+    async def send(
+        serialized: bytes, messages: Sequence[Message], encode_start: float
+    ) -> None:
+        send_start = time.perf_counter()
+        for s in stats:
+            s.record_encoded(len(serialized), send_start - encode_start)
+        await websocket.send(serialized)
+        send_end = time.perf_counter()
+        for s in stats:
+            s.record_sent(len(messages), len(serialized), send_end - send_start)
+
+        tracer = buffer.tracer
+        if tracer is not None:
+            tracer.record_window(
+                client_id,
+                messages,
+                window_us=encode_start * 1e6,
+                encoded_us=send_start * 1e6,
+                sent_us=send_end * 1e6,
+            )
+
     window_generator = buffer.window_generator(client_id)
     while not buffer.done:
         outgoing = await window_generator.__anext__()
         if client_api_version == 1:
+            encode_start = time.perf_counter()
             serialized = msgspec.msgpack.encode(
                 tuple(message.as_serializable_dict() for message in outgoing)
             )
             assert isinstance(serialized, bytes)
-            await websocket.send(serialized)
+            await send(serialized, outgoing, encode_start)
         elif client_api_version == 0:
             for msg in outgoing:
+                encode_start = time.perf_counter()
                 serialized = msgspec.msgpack.encode(msg.as_serializable_dict())
                 assert isinstance(serialized, bytes)
-                await websocket.send(serialized)
+                await send(serialized, (msg,), encode_start)
         else:
             assert_never(client_api_version)
 
@@ -558,11 +845,14 @@ async def _message_consumer(
     websocket: ServerConnection,
     handle_message: Callable[[Message], None],
     message_class: type[Message],
+    stats: tuple[TransportStats, ...],
 ) -> None:
     """Infinite loop waiting for and then handling incoming messages."""
     while True:
         raw = await websocket.recv()
         assert isinstance(raw, bytes)
+        for s in stats:
+            s.record_received(len(raw))
         message = message_class.deserialize(raw)
         handle_message(message)
 
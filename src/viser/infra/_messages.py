@@ -7,7 +7,18 @@ import abc
 import dataclasses
 import functools
 import warnings
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, TypeVar, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
 
 import msgspec
 import numpy as np
@@ -58,7 +69,11 @@ def _prepare_for_serialization(value: Any, annotation: object) -> Any:
         return int(value)
 
     if dataclasses.is_dataclass(annotation):
-        return _prepare_for_serialization(vars(value), dict)
+        # Nested dataclasses are dicts in decoded messages, for example when
+        # replaying recordings.
+        return _prepare_for_serialization(
+            value if isinstance(value, dict) else vars(value), dict
+        )
 
     # Recursively handle tuples.
     if isinstance(value, tuple):
@@ -137,7 +152,19 @@ class Message(abc.ABC):
     @classmethod
     def deserialize(cls, message: bytes) -> Message:
         """Convert bytes into a Python Message object."""
-        mapping = msgspec.msgpack.decode(message)
+        return cls._from_decoded(msgspec.msgpack.decode(message))
+
+    @classmethod
+    def deserialize_window(cls, window: bytes) -> List[Message]:
+        """Convert a window of messages, which is sent by servers with
+        `client_api_version=1`, into Python Message objects."""
+        return [
+            cls._from_decoded(mapping) for mapping in msgspec.msgpack.decode(window)
+        ]
+
+    @classmethod
+    def _from_decoded(cls, mapping: Dict[str, Any]) -> Message:
+        """Convert a decoded msgpack mapping into a Python Message object."""
 
         # msgpack deserializes to lists by default, but all of our annotations use
         # tuples.
@@ -152,7 +179,22 @@ class Message(abc.ABC):
         mapping = lists_to_tuple(mapping)
         message_type = cls._subclass_from_type_string()[cast(str, mapping.pop("type"))]
         message_kwargs = message_type._from_serializable_dict(mapping)
-        return message_type(**message_kwargs)
+
+        # Not a dataclass field, but serialized when set.
+        excluded_self_client = message_kwargs.pop("excluded_self_client", None)
+
+        if hasattr(message_type, "__post_init__"):
+            # Validation in `__post_init__()` is written for messages created in
+            # Python. After decoding, arrays are raw bytes and nested dataclasses
+            # are dicts, so we skip it.
+            message = message_type.__new__(message_type)
+            for k, v in message_kwargs.items():
+                object.__setattr__(message, k, v)
+        else:
+            message = message_type(**message_kwargs)
+        if excluded_self_client is not None:
+            message.excluded_self_client = excluded_self_client
+        return message
 
     @classmethod
     @functools.lru_cache(maxsize=100)
@@ -182,3 +224,9 @@ class Message(abc.ABC):
         For example: if we send 1000 "set value" messages for the same GUI element, we
         should only keep the latest message.
         """
+
+    def memory_owners(self) -> Tuple[Hashable, ...]:
+        """Returns keys for the objects that this message belongs to, which are
+        used to account for the memory used by buffered messages. Payload bytes
+        are split evenly between owners."""
+        return ()
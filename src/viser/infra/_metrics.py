@@ -0,0 +1,208 @@
+"""Runtime metrics for websocket servers. These are collected cheaply as messages
+are pushed and sent, and can be read via `WebsockServer.get_stats()` or exported
+in the Prometheus text format."""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+import time
+from typing import Dict, List, Sequence, Tuple
+
+RECEIVE_RATE_TIME_CONSTANT_SEC = 10.0
+"""Time constant for smoothing incoming message rates."""
+
+
+@dataclasses.dataclass
+class Summary:
+    """Count, sum, and maximum of observed values."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+
+@dataclasses.dataclass
+class TransportStats:
+    """Traffic statistics for a single client, or totaled over all clients."""
+
+    windows_sent: int = 0
+    """Number of message windows sent. Each window is one websocket frame."""
+    messages_sent: int = 0
+    bytes_encoded: int = 0
+    bytes_sent: int = 0
+    window_size: Summary = dataclasses.field(default_factory=Summary)
+    """Number of messages in each window."""
+    encode_seconds: Summary = dataclasses.field(default_factory=Summary)
+    """Time spent serializing each window."""
+    send_seconds: Summary = dataclasses.field(default_factory=Summary)
+    """Time spent in `websocket.send()` for each window."""
+    messages_received: int = 0
+    bytes_received: int = 0
+    receive_rate: float = 0.0
+    """Exponentially smoothed rate of incoming messages, in messages per second."""
+    receive_time: float = dataclasses.field(default=0.0, repr=False)
+    """Time of the last `receive_rate` update."""
+
+    def record_encoded(self, num_bytes: int, seconds: float) -> None:
+        """Record a serialized window of messages."""
+        self.bytes_encoded += num_bytes
+        self.encode_seconds.observe(seconds)
+
+    def record_sent(self, num_messages: int, num_bytes: int, seconds: float) -> None:
+        """Record a sent window of messages."""
+        self.windows_sent += 1
+        self.messages_sent += num_messages
+        self.bytes_sent += num_bytes
+        self.window_size.observe(num_messages)
+        self.send_seconds.observe(seconds)
+
+    def record_received(self, num_bytes: int) -> None:
+        """Record an incoming message."""
+        self.messages_received += 1
+        self.bytes_received += num_bytes
+        self.receive_rate = (
+            self.current_receive_rate() + 1.0 / RECEIVE_RATE_TIME_CONSTANT_SEC
+        )
+        self.receive_time = time.time()
+
+    def current_receive_rate(self) -> float:
+        """Get the receive rate, decayed to the current time."""
+        elapsed = time.time() - self.receive_time
+        return self.receive_rate * math.exp(-elapsed / RECEIVE_RATE_TIME_CONSTANT_SEC)
+
+
+@dataclasses.dataclass(frozen=True)
+class ServerStats:
+    """Snapshot of runtime statistics for a websocket server."""
+
+    uptime_seconds: float
+    connected_clients: int
+    messages_pushed: int
+    """Messages pushed to the broadcast buffer."""
+    messages_culled: int
+    """Buffered messages that were dropped because they were made redundant by
+    newer messages, or were removed explicitly."""
+    buffered_messages: int
+    """Messages currently kept in the broadcast buffer for new clients."""
+    buffered_bytes: int
+    """Payload bytes of messages in the broadcast buffer."""
+    event_loop_lag_seconds: float
+    """Most recently measured delay for scheduled callbacks in the server's
+    event loop. Large values mean that the event loop is being blocked."""
+    max_event_loop_lag_seconds: float
+    slow_callbacks: int
+    """Number of times a message handler or async callback blocked the event
+    loop for longer than the server's slow callback threshold."""
+    gauges: Dict[str, float]
+    """Values of gauges registered via `WebsockServer.register_gauge()`."""
+    total: TransportStats
+    """Traffic statistics, totaled over all clients since the server started."""
+    clients: Dict[int, TransportStats]
+    """Traffic statistics for each connected client."""
+
+
+_SERVER_METRICS = (
+    ("uptime_seconds", "gauge", "Time since the server started."),
+    ("connected_clients", "gauge", "Number of connected clients."),
+    ("messages_pushed", "counter", "Messages pushed to the broadcast buffer."),
+    ("messages_culled", "counter", "Buffered messages that were dropped."),
+    ("buffered_messages", "gauge", "Messages kept for new clients."),
+    ("buffered_bytes", "gauge", "Payload bytes kept for new clients."),
+    ("event_loop_lag_seconds", "gauge", "Delay of event loop callbacks."),
+    ("max_event_loop_lag_seconds", "gauge", "Maximum delay of event loop callbacks."),
+    ("slow_callbacks", "counter", "Callbacks that blocked the event loop."),
+)
+_TRAFFIC_COUNTERS = (
+    ("windows_sent", "Message windows sent."),
+    ("messages_sent", "Messages sent."),
+    ("bytes_encoded", "Bytes serialized for sending."),
+    ("bytes_sent", "Bytes sent."),
+    ("messages_received", "Messages received."),
+    ("bytes_received", "Bytes received."),
+)
+_TRAFFIC_SUMMARIES = (
+    ("window_size", "Messages per window.", "Maximum messages per window."),
+    (
+        "encode_seconds",
+        "Time spent serializing windows.",
+        "Maximum time spent serializing a window.",
+    ),
+    (
+        "send_seconds",
+        "Time spent sending windows.",
+        "Maximum time spent sending a window.",
+    ),
+)
+
+
+def format_prometheus(stats: ServerStats, namespace: str = "viser") -> str:
+    """Format server statistics in the Prometheus text exposition format."""
+    lines: List[str] = []
+
+    def add(
+        name: str, kind: str, help: str, samples: Sequence[Tuple[str, float]]
+    ) -> None:
+        lines.append(f"# HELP {namespace}_{name} {help}")
+        lines.append(f"# TYPE {namespace}_{name} {kind}")
+        for name_and_labels, value in samples:
+            lines.append(f"{namespace}_{name_and_labels} {float(value)!r}")
+
+    for field, kind, help in _SERVER_METRICS:
+        name = field + "_total" if kind == "counter" else field
+        add(name, kind, help, [(name, getattr(stats, field))])
+    for name, value in stats.gauges.items():
+        add(name, "gauge", f"Registered gauge: {name}.", [(name, value)])
+
+    # Traffic statistics are exported both totaled over all clients, which are
+    # monotonic, and for each connected client.
+    traffic: List[Tuple[str, str, TransportStats]] = [("", "", stats.total)]
+    traffic.extend(
+        ("client_", f'{{client="{client_id}"}}', client_stats)
+        for client_id, client_stats in stats.clients.items()
+    )
+    for prefix in ("", "client_"):
+        entries = [(labels, s) for p, labels, s in traffic if p == prefix]
+        if len(entries) == 0:
+            continue
+        for field, help in _TRAFFIC_COUNTERS:
+            name = f"{prefix}{field}_total"
+            add(
+                name,
+                "counter",
+                help,
+                [(name + labels, getattr(s, field)) for labels, s in entries],
+            )
+        name = f"{prefix}receive_rate"
+        add(
+            name,
+            "gauge",
+            "Smoothed rate of incoming messages, per second.",
+            [(name + labels, s.current_receive_rate()) for labels, s in entries],
+        )
+        for field, help, max_help in _TRAFFIC_SUMMARIES:
+            name = prefix + field
+            summaries = [(labels, getattr(s, field)) for labels, s in entries]
+            add(
+                name,
+                "summary",
+                help,
+                [(f"{name}_count{labels}", x.count) for labels, x in summaries]
+                + [(f"{name}_sum{labels}", x.total) for labels, x in summaries],
+            )
+            add(
+                name + "_max",
+                "gauge",
+                max_help,
+                [(f"{name}_max{labels}", x.max) for labels, x in summaries],
+            )
+    return "\n".join(lines) + "\n"
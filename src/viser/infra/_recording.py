@@ -0,0 +1,595 @@
+"""Chunked ``.viser`` recording format, which can be written incrementally and
+read progressively.
+
+A chunked recording is a multi-member gzip stream. Each member decompresses to
+one msgpack-encoded chunk, and stores its own compressed size in a gzip extra
+field. Readers can therefore split the file into chunks without decompressing
+anything, and standard gzip tools can still decompress the whole file. Chunks
+are maps with a ``type`` key:
+
+- ``{"type": "header", "formatVersion": int, "viserVersion": str}``: always first.
+- ``{"type": "messages", "blobs": [[id, bytes], ...], "messages": [[time, message], ...]}``.
+- ``{"type": "keyframe", "time": float, "blobs": [...], "messages": [...]}``:
+  compacted scene state at ``time``. Messages are ignored during sequential
+  playback.
+- ``{"type": "end", "durationSeconds": float, "seekPoints": [[time, offset], ...]}``:
+  after the last messages. Reading chunks from a seek point's byte offset, and
+  applying the keyframe if one is at the offset, reproduces the scene from the
+  seek point's time onwards.
+- ``{"type": "footer", "indexOffset": int}``: always last, and exactly
+  :data:`FOOTER_SIZE` bytes. Contains the byte offset of the ``end`` chunk, so
+  players can find seek points with two range requests.
+
+Recordings from :meth:`StateSerializer.serialize()` are instead a single
+msgpack object. These are split into pieces, which are compressed in parallel
+as gzip members with sizes in ``VS`` extra subfields. Manifests written by
+:meth:`StateSerializer.export_bundle()` use the same format, but can also list
+blobs that are stored in separate files, as ``blobFiles``.
+
+Large array and bytes payloads in messages are deduplicated. Each is replaced
+by a msgpack extension value of type :data:`BLOB_EXT_CODE`, which references a
+blob stored in the same chunk or an earlier one. Keyframes contain all blobs
+that their messages reference, and blobs are written again if they are needed
+after a keyframe that doesn't contain them. Readers can therefore discard all
+blobs that aren't in a keyframe when they reach it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterator
+
+import msgspec
+
+from ._messages import Message
+
+if TYPE_CHECKING:
+    from ._infra import WebsockMessageHandler
+
+FORMAT_VERSION = 1
+
+_SUBFIELD_ID = b"VC"
+_SPLIT_SUBFIELD_ID = b"VS"
+_HEADER_SIZE = 20
+"""Size of gzip member headers: 10 fixed bytes, 2 bytes for the extra field
+length, and an 8 byte subfield containing the member size."""
+
+
+def compress_chunk(
+    data: bytes | memoryview, compresslevel: int, subfield_id: bytes = _SUBFIELD_ID
+) -> bytes:
+    """Compress bytes into a gzip member, which stores its compressed size in
+    an extra subfield.
+
+    Args:
+        data: Bytes to compress.
+        compresslevel: zlib compression level, from 0 to 9.
+        subfield_id: Two byte ID of the extra subfield.
+
+    Returns:
+        The gzip member.
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return _gzip_member(
+        data, compressor.compress(data) + compressor.flush(), subfield_id
+    )
+
+
+def compress_parallel(
+    data: bytes, compresslevel: int, chunk_size_bytes: int, num_workers: int | None
+) -> bytes:
+    """Compress bytes into a multi-member gzip stream. Members are compressed
+    in parallel on a thread pool, since zlib releases the GIL.
+
+    Args:
+        data: Bytes to compress.
+        compresslevel: zlib compression level, from 0 to 9.
+        chunk_size_bytes: Number of uncompressed bytes in each gzip member.
+        num_workers: Number of compression threads. None for the default of
+            :class:`concurrent.futures.ThreadPoolExecutor`.
+
+    Returns:
+        The gzip stream, which can be decompressed by standard gzip tools.
+    """
+    view = memoryview(data)
+    pieces = [
+        view[i : i + chunk_size_bytes]
+        for i in range(0, max(len(view), 1), chunk_size_bytes)
+    ]
+    if len(pieces) == 1:
+        return compress_chunk(data, compresslevel, _SPLIT_SUBFIELD_ID)
+    with ThreadPoolExecutor(
+        max_workers=num_workers, thread_name_prefix="viser-compress"
+    ) as executor:
+        return b"".join(
+            executor.map(
+                lambda piece: compress_chunk(piece, compresslevel, _SPLIT_SUBFIELD_ID),
+                pieces,
+            )
+        )
+
+
+def _footer(index_offset: int) -> bytes:
+    # Fixed-size msgpack map and uncompressed deflate block, so footers are
+    # always FOOTER_SIZE bytes.
+    data = b"\x82\xa4type\xa6footer\xabindexOffset\xcf" + struct.pack(
+        ">Q", index_offset
+    )
+    stored_block = b"\x01" + struct.pack("<HH", len(data), len(data) ^ 0xFFFF)
+    return _gzip_member(data, stored_block + data)
+
+
+def _gzip_member(
+    data: bytes | memoryview, deflated: bytes, subfield_id: bytes = _SUBFIELD_ID
+) -> bytes:
+    member_size = _HEADER_SIZE + len(deflated) + 8
+    header = (
+        # Magic, deflate, FEXTRA flag, no mtime, no extra flags, unknown OS.
+        b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff"
+        + struct.pack("<H", 8)
+        + subfield_id
+        + struct.pack("<HI", 4, member_size)
+    )
+    trailer = struct.pack("<II", zlib.crc32(data), memoryview(data).nbytes & 0xFFFFFFFF)
+    return header + deflated + trailer
+
+
+def read_member_size(header: bytes, subfield_id: bytes = _SUBFIELD_ID) -> int | None:
+    """Get the size of a gzip member from its first bytes. Returns None if the
+    member was not written by :func:`compress_chunk` with this subfield ID."""
+    if (
+        len(header) < _HEADER_SIZE
+        or header[:4] != b"\x1f\x8b\x08\x04"
+        or header[12:14] != subfield_id
+    ):
+        return None
+    return struct.unpack_from("<I", header, 16)[0]
+
+
+FOOTER_SIZE = len(_footer(0))
+
+BLOB_EXT_CODE = 1
+"""msgpack extension type for references to deduplicated payloads. The data of
+each reference is a little-endian uint32 blob ID."""
+
+_MIN_BLOB_BYTES = 256
+"""Payloads smaller than this are stored inline, instead of as blobs."""
+
+
+class _BlobTable:
+    """Snapshots the array and bytes payloads of serializable message dicts,
+    and replaces large payloads with references to content-addressed blobs."""
+
+    def __init__(self) -> None:
+        self._id_from_digest: dict[bytes, int] = {}
+        self.written_ids: set[int] = set()
+        """IDs of blobs that readers will have seen."""
+        self.new_blobs: list[tuple[int, bytes]] = []
+        """Blobs that need to be written with the next messages."""
+
+    def replace_payloads(
+        self, value: Any, referenced: dict[int, bytes | memoryview]
+    ) -> Any:
+        """Replace payloads in a serializable dict. Referenced blobs are added
+        to `referenced`, and new blobs to `new_blobs`. Blobs that were already
+        written are added without copying them."""
+        if isinstance(value, dict):
+            return {k: self.replace_payloads(v, referenced) for k, v in value.items()}
+        if isinstance(value, (tuple, list)):
+            return [self.replace_payloads(v, referenced) for v in value]
+        if not isinstance(value, (bytes, memoryview)):
+            return value
+
+        # Copy payloads, since arrays can be mutated after they're recorded.
+        if memoryview(value).nbytes < _MIN_BLOB_BYTES:
+            return bytes(value)
+        digest = hashlib.blake2b(value, digest_size=16).digest()
+        blob_id = self._id_from_digest.setdefault(digest, len(self._id_from_digest))
+        if blob_id not in self.written_ids:
+            self.written_ids.add(blob_id)
+            self.new_blobs.append((blob_id, bytes(value)))
+            referenced[blob_id] = self.new_blobs[-1][1]
+        elif blob_id not in referenced:
+            referenced[blob_id] = value
+        return msgspec.msgpack.Ext(BLOB_EXT_CODE, struct.pack("<I", blob_id))
+
+
+def resolve_blobs(value: Any, blobs: dict[int, bytes]) -> Any:
+    """Replace blob references in a decoded message with the blobs that they
+    reference.
+
+    Args:
+        value: Decoded message, or any value within it.
+        blobs: Blobs from the current and previous chunks, by ID.
+
+    Returns:
+        The value, with blob references replaced.
+    """
+    if isinstance(value, dict):
+        return {k: resolve_blobs(v, blobs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_blobs(v, blobs) for v in value]
+    if isinstance(value, msgspec.msgpack.Ext) and value.code == BLOB_EXT_CODE:
+        return blobs[struct.unpack("<I", value.data)[0]]
+    return value
+
+
+def iter_chunks(file: IO[bytes]) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Iterate over the chunks in a chunked recording, decoding one at a time.
+
+    Args:
+        file: Binary file object, positioned at the start of a chunk.
+
+    Returns:
+        Iterator over `(byte offset, chunk)` tuples.
+    """
+    while True:
+        offset = file.tell()
+        header = file.read(_HEADER_SIZE)
+        if len(header) == 0:
+            return
+        member_size = read_member_size(header)
+        assert member_size is not None, f"Invalid chunk at byte {offset}."
+        member = header + file.read(member_size - _HEADER_SIZE)
+        assert len(member) == member_size, f"Truncated chunk at byte {offset}."
+        yield offset, msgspec.msgpack.decode(gzip.decompress(member))
+
+
+def read_index(file: IO[bytes]) -> dict[str, Any] | None:
+    """Read the ``end`` chunk of a chunked recording, which contains its
+    duration and seek points.
+
+    Args:
+        file: Seekable binary file object.
+
+    Returns:
+        The ``end`` chunk, or None if the recording is unfinished or has no
+        index.
+    """
+    size = file.seek(0, 2)
+    if size < FOOTER_SIZE:
+        return None
+    file.seek(size - FOOTER_SIZE)
+    footer = file.read(FOOTER_SIZE)
+    if read_member_size(footer) != FOOTER_SIZE:
+        return None
+    footer_chunk = msgspec.msgpack.decode(gzip.decompress(footer))
+    if footer_chunk.get("type") != "footer":
+        return None
+    file.seek(footer_chunk["indexOffset"])
+    _, end = next(iter_chunks(file))
+    return end
+
+
+class StreamingStateSerializer:
+    """Handle for serializing messages directly to a chunked ``.viser`` file.
+
+    Unlike :class:`StateSerializer`, memory usage is bounded by the chunk size
+    and the size of the current scene state. Messages are encoded as they're
+    recorded, and chunks are compressed in parallel on background threads
+    once they fill up.
+    """
+
+    def __init__(
+        self,
+        handler: WebsockMessageHandler | None,
+        filter: Callable[[Message], bool],
+        path: Path,
+        chunk_size_bytes: int,
+        compresslevel: int,
+        keyframe_interval_sec: float | None,
+    ) -> None:
+        import viser
+
+        self._handler = handler
+        self._filter = filter
+        self._time: float = 0.0
+        self._closed = False
+        self._chunk_size_bytes = chunk_size_bytes
+        self._compresslevel = compresslevel
+        self._keyframe_interval_sec = keyframe_interval_sec
+
+        self._lock = threading.Lock()
+        self._chunk: list[msgspec.Raw] = []
+        self._chunk_bytes = 0
+        self._blobs = _BlobTable()
+
+        # Compacted scene state for keyframes. Like the message buffers of
+        # websocket servers, we keep only the latest message for each
+        # redundancy key. We also keep the blobs that these messages
+        # reference, with reference counts.
+        self._state: dict[str, tuple[msgspec.Raw, tuple[int, ...]]] = {}
+        self._state_blobs: dict[int, bytes] = {}
+        self._state_blob_refs: dict[int, int] = {}
+        self._state_bytes = 0
+        self._keyframe_time = 0.0
+        self._bytes_since_keyframe = 0
+
+        # Chunks are compressed in parallel, but written in order. We bound
+        # the number of pending chunks to bound memory usage.
+        self._file = Path(path).open("wb")
+        self._num_workers = min(4, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._num_workers, thread_name_prefix="viser-recording"
+        )
+        self._pending: deque[tuple[Future[bytes], float | None]] = deque()
+        header = compress_chunk(
+            msgspec.msgpack.encode(
+                {
+                    "type": "header",
+                    "formatVersion": FORMAT_VERSION,
+                    "viserVersion": viser.__version__,
+                }
+            ),
+            compresslevel,
+        )
+        self._file.write(header)
+        self._offset = len(header)
+
+        # Playback from the first messages chunk reproduces the full recording.
+        self._seek_points: list[tuple[float, int]] = [(0.0, self._offset)]
+
+    def _insert_message(self, message: Message) -> None:
+        """Insert a message into the recorded file."""
+        if not self._filter(message):
+            return
+
+        serializable = message.as_serializable_dict()
+        redundancy_key = message.redundancy_key()
+        with self._lock:
+            num_blobs = len(self._blobs.new_blobs)
+            referenced: dict[int, bytes | memoryview] = {}
+            encoded = msgspec.msgpack.encode(
+                (self._time, self._blobs.replace_payloads(serializable, referenced))
+            )
+            nbytes = len(encoded) + sum(
+                len(blob) for _, blob in self._blobs.new_blobs[num_blobs:]
+            )
+            self._chunk.append(msgspec.Raw(encoded))
+            self._chunk_bytes += nbytes
+            self._bytes_since_keyframe += nbytes
+            if self._keyframe_interval_sec is not None:
+                self._update_state_locked(redundancy_key, encoded, referenced)
+            if self._chunk_bytes >= self._chunk_size_bytes:
+                self._flush_locked()
+
+    def insert_sleep(self, duration: float) -> None:
+        """Insert a sleep into the recorded file. This can be useful for
+        dynamic 3D data."""
+        assert not self._closed, "close() was already called!"
+        self._time += duration
+        if (
+            self._keyframe_interval_sec is not None
+            and self._time - self._keyframe_time >= self._keyframe_interval_sec
+        ):
+            with self._lock:
+                self._keyframe_time = self._time
+                # Skip keyframes that would be larger than the messages since
+                # the last keyframe. This bounds keyframes to at most double
+                # the file size, for example for static scenes with large
+                # point clouds.
+                if self._bytes_since_keyframe >= self._state_bytes:
+                    self._flush_locked()
+                    self._write_chunk(
+                        {
+                            "type": "keyframe",
+                            "time": self._time,
+                            "blobs": list(self._state_blobs.items()),
+                            "messages": [raw for raw, _ in self._state.values()],
+                        },
+                        seek_time=self._time,
+                    )
+                    self._blobs.written_ids = set(self._state_blobs)
+                    self._bytes_since_keyframe = 0
+
+    def flush(self) -> None:
+        """Write all recorded messages to the file."""
+        with self._lock:
+            self._flush_locked()
+            while len(self._pending) > 0:
+                self._write_pending_locked()
+            self._file.flush()
+
+    def close(self) -> None:
+        """Stop recording, and finish writing the file. Should only be called
+        once."""
+        assert not self._closed, "close() was already called!"
+        self._closed = True
+        if self._handler is not None:
+            self._handler._record_handle = None
+        with self._lock:
+            try:
+                self._flush_locked()
+                while len(self._pending) > 0:
+                    self._write_pending_locked()
+
+                # Index, followed by a fixed-size footer that points to it.
+                index_offset = self._offset
+                self._file.write(
+                    compress_chunk(
+                        msgspec.msgpack.encode(
+                            {
+                                "type": "end",
+                                "durationSeconds": self._time,
+                                "seekPoints": self._seek_points,
+                            }
+                        ),
+                        self._compresslevel,
+                    )
+                )
+                self._file.write(_footer(index_offset))
+            finally:
+                self._executor.shutdown()
+                self._file.close()
+
+    def __enter__(self) -> StreamingStateSerializer:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _update_state_locked(
+        self,
+        redundancy_key: str,
+        encoded: bytes,
+        referenced: dict[int, bytes | memoryview],
+    ) -> None:
+        old = self._state.pop(redundancy_key, None)
+        if old is not None:
+            self._state_bytes -= len(old[0])
+            for blob_id in old[1]:
+                self._state_blob_refs[blob_id] -= 1
+                if self._state_blob_refs[blob_id] == 0:
+                    del self._state_blob_refs[blob_id]
+                    self._state_bytes -= len(self._state_blobs.pop(blob_id))
+
+        self._state[redundancy_key] = (msgspec.Raw(encoded), tuple(referenced))
+        self._state_bytes += len(encoded)
+        for blob_id, blob in referenced.items():
+            if blob_id not in self._state_blobs:
+                self._state_blobs[blob_id] = bytes(blob)
+                # For memoryviews of arrays, len() is the length of the first
+                # axis instead of the number of bytes.
+                self._state_bytes += memoryview(blob).nbytes
+            self._state_blob_refs[blob_id] = self._state_blob_refs.get(blob_id, 0) + 1
+
+    def _flush_locked(self) -> None:
+        if len(self._chunk) == 0:
+            return
+        self._write_chunk(
+            {
+                "type": "messages",
+                "blobs": self._blobs.new_blobs,
+                "messages": self._chunk,
+            }
+        )
+        self._blobs.new_blobs = []
+        self._chunk = []
+        self._chunk_bytes = 0
+
+    def _write_chunk(
+        self, chunk: dict[str, Any], seek_time: float | None = None
+    ) -> None:
+        data = msgspec.msgpack.encode(chunk)
+        self._pending.append(
+            (
+                self._executor.submit(compress_chunk, data, self._compresslevel),
+                seek_time,
+            )
+        )
+
+        # Write chunks that have finished compressing, and wait for the oldest
+        # chunks if too many are pending.
+        while len(self._pending) > 0 and (
+            self._pending[0][0].done() or len(self._pending) > self._num_workers
+        ):
+            self._write_pending_locked()
+
+    def _write_pending_locked(self) -> None:
+        future, seek_time = self._pending.popleft()
+        member = future.result()
+        self._file.write(member)
+        if seek_time is not None:
+            self._seek_points.append((seek_time, self._offset))
+        self._offset += len(member)
+
+
+_MESSAGE_OVERHEAD_BYTES = 256
+"""Approximate memory used by a message, excluding its payloads."""
+
+
+class FlightRecorder:
+    """Keeps recently sent messages in a bounded ring buffer, so recent history
+    can be written to a ``.viser`` file at any time.
+
+    Messages that are evicted from the ring are compacted into the scene state
+    at the ring's start, by keeping only the latest message for each
+    redundancy key. Messages are kept by reference and only encoded when
+    dumped, so recording them is cheap.
+    """
+
+    def __init__(
+        self,
+        filter: Callable[[Message], bool],
+        max_seconds: float | None,
+        max_bytes: int | None,
+    ) -> None:
+        self._filter = filter
+        self._max_seconds = max_seconds
+        self._max_bytes = max_bytes
+        self._start_time = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._ring: deque[tuple[float, Message, int]] = deque()
+        self._ring_bytes = 0
+        self._state: dict[str, Message] = {}
+        self._state_time = 0.0
+
+    def _insert_message(self, message: Message, payload_nbytes: int) -> None:
+        """Insert a message into the ring buffer. `payload_nbytes` is the size of
+        its array and bytes payloads, as counted by the message buffer."""
+        if not self._filter(message):
+            return
+
+        t = time.monotonic() - self._start_time
+        nbytes = payload_nbytes + _MESSAGE_OVERHEAD_BYTES
+        with self._lock:
+            self._ring.append((t, message, nbytes))
+            self._ring_bytes += nbytes
+            while len(self._ring) > 0 and (
+                (self._max_bytes is not None and self._ring_bytes > self._max_bytes)
+                or (
+                    self._max_seconds is not None
+                    and t - self._ring[0][0] > self._max_seconds
+                )
+            ):
+                self._state_time, old_message, old_nbytes = self._ring.popleft()
+                self._ring_bytes -= old_nbytes
+                self._state[old_message.redundancy_key()] = old_message
+
+    def dump(
+        self,
+        path: Path,
+        compresslevel: int = 6,
+        keyframe_interval_sec: float | None = 10.0,
+    ) -> None:
+        """Write the scene state at the start of the ring buffer, followed by
+        the messages in it, to a chunked ``.viser`` file. Recording continues
+        while the file is written.
+
+        Args:
+            path: Path to write the recording to.
+            compresslevel: gzip compression level, from 0 to 9.
+            keyframe_interval_sec: Minimum recording time between keyframes.
+                None to disable keyframes.
+        """
+        with self._lock:
+            state = list(self._state.values())
+            ring = list(self._ring)
+            start_time = self._state_time
+        end_time = time.monotonic() - self._start_time
+
+        with StreamingStateSerializer(
+            None,
+            lambda _: True,
+            path,
+            chunk_size_bytes=4 * 1024 * 1024,
+            compresslevel=compresslevel,
+            keyframe_interval_sec=keyframe_interval_sec,
+        ) as serializer:
+            for message in state:
+                serializer._insert_message(message)
+            for t, message, _ in ring:
+                if t - start_time > serializer._time:
+                    serializer.insert_sleep(t - start_time - serializer._time)
+                serializer._insert_message(message)
+            serializer.insert_sleep(max(end_time - start_time - serializer._time, 0.0))
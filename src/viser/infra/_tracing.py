@@ -0,0 +1,177 @@
+"""Message lifecycle tracing. Traces are exported in the Chrome trace-event
+format, and can be viewed in `chrome://tracing` or https://ui.perfetto.dev."""
+
+from __future__ import annotations
+
+import collections
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Sequence, Tuple
+
+from ._messages import Message
+
+_CLIENT_TID_OFFSET = 1_000_000
+"""Offset for thread IDs in the trace that represent clients."""
+
+
+def now_us() -> float:
+    """Timestamp for trace events, in microseconds. Uses the same clock as
+    `time.perf_counter()`."""
+    return time.perf_counter() * 1e6
+
+
+class MessageTracer:
+    """Records the lifecycle of messages: when they're queued by the caller,
+    assembled into a window for each client, encoded, and sent.
+
+    Messages are sampled when they're queued, so tracing can be left enabled
+    with a low `sample_rate`. Only the most recent `max_events` trace events
+    are kept.
+
+    Args:
+        sample_rate: Fraction of messages to trace, between 0 and 1.
+        max_events: Maximum number of trace events to keep.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_events: int = 100_000) -> None:
+        assert 0.0 <= sample_rate <= 1.0
+        self.sample_rate = sample_rate
+        self._events: Deque[Dict[str, Any]] = collections.deque(maxlen=max_events)
+        self._trace_ids = itertools.count()
+        self._pid = os.getpid()
+        self._thread_names: Dict[int, str] = {}
+
+        # Sampled messages are tracked by identity until they're garbage
+        # collected.
+        self._trace_from_message_id: Dict[int, Tuple[weakref.ref, int, float]] = {}
+
+    def record_push(
+        self, message: Message, start_us: float, locked_us: float, end_us: float
+    ) -> None:
+        """Record a message being pushed to a buffer. Called by the buffer."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+
+        trace_id = next(self._trace_ids)
+        key = id(message)
+        self._trace_from_message_id[key] = (
+            weakref.ref(
+                message,
+                lambda _: self._trace_from_message_id.pop(key, None),
+            ),
+            trace_id,
+            start_us,
+        )
+
+        thread = threading.current_thread()
+        self._thread_names[thread.ident or 0] = thread.name
+        self._events.append(
+            {
+                "name": "queue_message",
+                "cat": "push",
+                "ph": "X",
+                "ts": start_us,
+                "dur": end_us - start_us,
+                "pid": self._pid,
+                "tid": thread.ident or 0,
+                "args": {
+                    "type": type(message).__name__,
+                    "trace_id": trace_id,
+                    "lock_wait_us": locked_us - start_us,
+                },
+            }
+        )
+
+    def record_window(
+        self,
+        client_id: int,
+        messages: Sequence[Message],
+        window_us: float,
+        encoded_us: float,
+        sent_us: float,
+    ) -> None:
+        """Record a window of messages being encoded and sent to a client.
+        Called by message producers."""
+        traced: List[Tuple[str, int, float]] = []
+        for message in messages:
+            trace = self._trace_from_message_id.get(id(message), None)
+            if trace is not None and trace[0]() is message:
+                traced.append((type(message).__name__, trace[1], trace[2]))
+        if len(traced) == 0:
+            return
+
+        tid = _CLIENT_TID_OFFSET + client_id
+        self._thread_names[tid] = f"client {client_id}"
+        args = {"messages": len(messages), "trace_ids": [t[1] for t in traced]}
+        for name, start_us, end_us in (
+            ("encode", window_us, encoded_us),
+            ("send", encoded_us, sent_us),
+        ):
+            self._events.append(
+                {
+                    "name": name,
+                    "cat": "window",
+                    "ph": "X",
+                    "ts": start_us,
+                    "dur": end_us - start_us,
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+        # Each message gets an async span for each client, with nested spans
+        # for time spent in the buffer, encoding, and sending.
+        for type_name, trace_id, push_us in traced:
+            span_id = f"{trace_id}:{client_id}"
+            for name, phase, ts in (
+                (type_name, "b", push_us),
+                ("buffered", "b", push_us),
+                ("buffered", "e", window_us),
+                ("encode", "b", window_us),
+                ("encode", "e", encoded_us),
+                ("send", "b", encoded_us),
+                ("send", "e", sent_us),
+                (type_name, "e", sent_us),
+            ):
+                self._events.append(
+                    {
+                        "name": name,
+                        "cat": "message",
+                        "ph": phase,
+                        "id": span_id,
+                        "ts": ts,
+                        "pid": self._pid,
+                        "tid": tid,
+                        "args": {"client_id": client_id, "trace_id": trace_id}
+                        if phase == "b"
+                        else {},
+                    }
+                )
+
+    def get_trace(self) -> Dict[str, Any]:
+        """Get recorded events as a Chrome trace-event JSON object."""
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in tuple(self._thread_names.items())
+        ]
+        return {
+            "traceEvents": metadata + list(self._events),
+            "displayTimeUnit": "ms",
+        }
+
+    def save(self, path: str | Path) -> None:
+        """Write recorded events to a JSON file."""
+        Path(path).write_text(json.dumps(self.get_trace()))
@@ -0,0 +1,28 @@
+import json
+from pathlib import Path
+
+import viser._client_autobuild
+from viser._bench import run_benchmark
+
+
+def test_bench(tmp_path: Path) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    run_benchmark(
+        duration_sec=1.0,
+        clients=2,
+        frames=10,
+        points_per_cloud=1000,
+        point_cloud_rate_hz=5.0,
+        splats=100,
+        gui_elements=2,
+        port=8110,
+        output=tmp_path / "bench.json",
+    )
+    results = json.loads((tmp_path / "bench.json").read_text())
+    assert results["config"]["clients"] == 2
+    assert len(results["clients"]) == 2
+    assert results["latency_ms"]["count"] > 0
+    assert results["throughput"]["messages_per_sec"] > 0
+    assert results["server"]["rss_bytes_peak"] > 0
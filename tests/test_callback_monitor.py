@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+import pytest
+
+from viser.infra import CallbackMonitor
+
+
+def test_slow_callback_warning() -> None:
+    monitor = CallbackMonitor(threshold_sec=0.05)
+
+    async def blocking_cb(x: int) -> int:
+        time.sleep(0.1)
+        return x
+
+    async def awaiting_cb() -> int:
+        # Awaiting doesn't block the event loop, and blocking in a nested
+        # callback is attributed to the nested callback.
+        await asyncio.sleep(0.1)
+        return await monitor.run(blocking_cb, 3)
+
+    with pytest.warns(UserWarning, match="blocking_cb blocked the event loop"):
+        assert asyncio.run(monitor.run(awaiting_cb)) == 3
+    assert monitor.slow_callbacks == 1
+
+    with pytest.warns(UserWarning, match="<lambda> blocked the event loop"):
+        monitor.call(lambda: time.sleep(0.1))
+    assert monitor.slow_callbacks == 2
+
+    monitor.threshold_sec = None
+    assert asyncio.run(monitor.run(blocking_cb, 5)) == 5
+    assert monitor.slow_callbacks == 2
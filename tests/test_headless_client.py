@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import numpy as np
+
+import viser
+import viser._client_autobuild
+
+
+def test_headless_clients() -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(port=8100, verbose=False)
+    frame = server.scene.add_frame("/frame", position=(1.0, 2.0, 3.0))
+    server.scene.add_point_cloud(
+        "/points", points=np.zeros((10, 3)), colors=(255, 0, 0)
+    )
+    slider = server.gui.add_slider(
+        "Slider", min=0.0, max=10.0, step=1.0, initial_value=0.0
+    )
+    controls = server.scene.add_transform_controls("/controls")
+
+    connected = threading.Semaphore(0)
+    server.on_client_connect(lambda _: connected.release())
+
+    async def main() -> None:
+        clients = [
+            viser.HeadlessClient(f"ws://localhost:{server.get_port()}")
+            for _ in range(3)
+        ]
+        await asyncio.gather(*[client.connect() for client in clients])
+        for client in clients:
+            await client.wait_until(
+                lambda: "/points" in client.scene_nodes and len(client.gui) > 0,
+                timeout=5.0,
+            )
+            assert client.scene_nodes["/frame"].position == (1.0, 2.0, 3.0)
+            assert client.scene_nodes["/points"].message_type == "PointCloudMessage"
+
+        # Changes from the server are mirrored by clients.
+        frame.visible = False
+        await clients[0].wait_until(
+            lambda: not clients[0].scene_nodes["/frame"].visible, timeout=5.0
+        )
+
+        # Changes from clients are applied to the server.
+        await clients[1].update_gui(clients[1].find_gui("Slider"), 5.0)
+        await clients[1].update_transform_controls(
+            "/controls", (1.0, 0.0, 0.0, 0.0), (0.0, 0.0, 1.0)
+        )
+        await clients[2].wait_until(
+            lambda: clients[2].gui[slider._impl.uuid].value == 5.0, timeout=5.0
+        )
+        for _ in range(500):
+            if np.allclose(controls.position, (0.0, 0.0, 1.0)):
+                break
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[client.close() for client in clients])
+
+    asyncio.run(main())
+    for _ in range(3):
+        assert connected.acquire(timeout=5.0)
+    assert slider.value == 5.0
+    assert np.allclose(controls.position, (0.0, 0.0, 1.0))
+    server.stop()
@@ -0,0 +1,31 @@
+import urllib.request
+
+import numpy as np
+
+import viser
+import viser._client_autobuild
+
+
+def test_metrics_endpoint() -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(metrics_endpoint=True)
+    handle = server.scene.add_point_cloud(
+        "/points", points=np.zeros((10, 3)), colors=(0, 0, 0)
+    )
+    handle.point_size = 0.2
+    handle.point_size = 0.3
+
+    stats = server.get_stats()
+    assert stats.messages_pushed >= 3
+    assert stats.messages_culled >= 1
+    assert stats.connected_clients == 0
+    assert stats.gauges["thread_pool_queue_depth"] == 0
+
+    with urllib.request.urlopen(f"http://localhost:{server.get_port()}/metrics") as f:
+        text = f.read().decode("utf-8")
+    assert f"viser_messages_pushed_total {float(stats.messages_pushed)!r}" in text
+    assert "# TYPE viser_send_seconds summary" in text
+    assert "viser_thread_pool_queue_depth 0.0" in text
+    server.stop()
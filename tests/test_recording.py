@@ -0,0 +1,390 @@
+import asyncio
+import gzip
+import json
+from pathlib import Path
+from typing import Union
+
+import msgspec
+import numpy as np
+import pytest
+
+import viser
+import viser._client_autobuild
+import viser.infra
+from viser._recording_analyzer import analyze_recording
+from viser.infra._recording import (
+    StreamingStateSerializer,
+    iter_chunks,
+    read_index,
+    read_member_size,
+    resolve_blobs,
+)
+
+
+def test_streaming_scene_serializer(tmp_path: Path) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(port=8120, verbose=False)
+    server.scene.add_point_cloud(
+        "/points", points=np.zeros((1000, 3)), colors=(255, 0, 0)
+    )
+    server.gui.add_button("Button")
+    frame = server.scene.add_frame("/frame")
+
+    path = tmp_path / "recording.viser"
+    with server.get_streaming_scene_serializer(
+        path, chunk_size_bytes=1024
+    ) as serializer:
+        for i in range(100):
+            frame.position = (float(i), 0.0, 0.0)
+            serializer.insert_sleep(0.1)
+    server.stop()
+
+    with path.open("rb") as f:
+        chunks = [chunk for _, chunk in iter_chunks(f)]
+    assert chunks[0]["type"] == "header"
+    assert chunks[0]["viserVersion"] == viser.__version__
+    assert chunks[-2]["type"] == "end"
+    assert np.isclose(chunks[-2]["durationSeconds"], 10.0)
+    assert chunks[-1]["type"] == "footer"
+    assert len(chunks) > 4
+
+    messages = [
+        m for chunk in chunks if chunk["type"] == "messages" for m in chunk["messages"]
+    ]
+    assert not any("Gui" in message["type"] for _, message in messages)
+    positions = [
+        message["position"]
+        for _, message in messages
+        if message["type"] == "SetPositionMessage"
+    ]
+    assert positions[-1] == [99.0, 0.0, 0.0]
+
+    # Chunks are gzip members, so the file is also a valid gzip stream.
+    assert len(gzip.decompress(path.read_bytes())) > 0
+
+
+def test_streaming_scene_serializer_keyframes(tmp_path: Path) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(port=8121, verbose=False)
+    frame = server.scene.add_frame("/frame")
+
+    path = tmp_path / "recording.viser"
+    with server.get_streaming_scene_serializer(
+        path, chunk_size_bytes=1024, keyframe_interval_sec=1.0
+    ) as serializer:
+        for i in range(100):
+            frame.position = (float(i), 0.0, 0.0)
+            serializer.insert_sleep(0.1)
+    server.stop()
+
+    with path.open("rb") as f:
+        index = read_index(f)
+        assert index is not None
+        assert np.isclose(index["durationSeconds"], 10.0)
+
+        # The first seek point replays the recording from the start.
+        seek_points = index["seekPoints"]
+        assert len(seek_points) > 5
+        assert seek_points[0][0] == 0.0
+
+        # Keyframes contain the compacted scene state.
+        seek_time, offset = seek_points[-1]
+        f.seek(offset)
+        _, keyframe = next(iter_chunks(f))
+        assert keyframe["type"] == "keyframe"
+        assert keyframe["time"] == seek_time
+        positions = [
+            message["position"]
+            for _, message in keyframe["messages"]
+            if message["type"] == "SetPositionMessage"
+        ]
+        assert positions == [[round(seek_time / 0.1) - 1, 0.0, 0.0]]
+
+        # Sequential reads also see the keyframes, index, and footer.
+        f.seek(0)
+        types = [chunk["type"] for _, chunk in iter_chunks(f)]
+        assert types.count("keyframe") == len(seek_points) - 1
+        assert types[-2:] == ["end", "footer"]
+
+
+def test_scene_serializer_deduplicates_payloads() -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(port=8122, verbose=False)
+    points = np.random.default_rng(0).normal(size=(10_000, 3)).astype(np.float16)
+    cloud = server.scene.add_point_cloud("/points", points=points, colors=(0, 0, 0))
+
+    serializer = server.get_scene_serializer()
+    for i in range(20):
+        # Alternate between two point clouds.
+        cloud.points = points if i % 2 == 0 else points * 2.0
+        serializer.insert_sleep(0.1)
+
+    # Recorded payloads are snapshots.
+    points[:] = 0.0
+    data = msgspec.msgpack.decode(gzip.decompress(serializer.serialize()))
+    server.stop()
+
+    # Two point clouds, and one array of colors.
+    assert len(data["blobs"]) == 3
+    blobs = dict(data["blobs"])
+    clouds = [
+        np.frombuffer(
+            resolve_blobs(message, blobs)["updates"]["points"], dtype=np.float16
+        )
+        for _, message in data["messages"]
+        if message["type"] == "SceneNodeUpdateMessage"
+    ]
+    assert len(clouds) > 10
+    assert np.all(clouds[-1] != 0.0)
+
+
+def test_streaming_scene_serializer_blobs_after_keyframes(tmp_path: Path) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(port=8123, verbose=False)
+    rng = np.random.default_rng(0)
+    clouds = [rng.normal(size=(1000, 3)).astype(np.float16) for _ in range(3)]
+    handle = server.scene.add_point_cloud("/points", points=clouds[0], colors=(0, 0, 0))
+
+    path = tmp_path / "recording.viser"
+    with server.get_streaming_scene_serializer(
+        path, chunk_size_bytes=1024, keyframe_interval_sec=1.0
+    ) as serializer:
+        for i in range(100):
+            handle.points = clouds[i % 3]
+            serializer.insert_sleep(0.1)
+
+        # Size of the compacted state, which is used to schedule keyframes.
+        assert serializer._state_bytes == sum(
+            len(encoded) for encoded, _ in serializer._state.values()
+        ) + sum(len(blob) for blob in serializer._state_blobs.values())
+    server.stop()
+
+    with path.open("rb") as f:
+        index = read_index(f)
+        assert index is not None
+
+        # Playback from any seek point only needs blobs after it.
+        for _, offset in index["seekPoints"]:
+            f.seek(offset)
+            blobs: dict[int, bytes] = {}
+            for _, chunk in iter_chunks(f):
+                if chunk["type"] not in ("messages", "keyframe"):
+                    break
+                blobs.update(dict(chunk["blobs"]))
+                for _, message in chunk["messages"]:
+                    resolve_blobs(message, blobs)
+
+    # Each point cloud is written much less often than it's recorded.
+    assert path.stat().st_size < 100 * clouds[0].nbytes / 4
+
+
+def test_scene_serializer_parallel_compression() -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(port=8124, verbose=False)
+    rng = np.random.default_rng(0)
+    serializer = server.get_scene_serializer()
+    for i in range(10):
+        server.scene.add_point_cloud(
+            f"/points_{i}",
+            points=rng.normal(size=(5_000, 3)).astype(np.float32),
+            colors=(0, 0, 0),
+        )
+        serializer.insert_sleep(0.1)
+
+    data = serializer.serialize(chunk_size_bytes=64 * 1024, num_workers=4)
+    server.stop()
+
+    # The recording is a multi-member gzip stream, with a size in each header.
+    member_sizes = []
+    offset = 0
+    while offset < len(data):
+        member_size = read_member_size(data[offset:], b"VS")
+        assert member_size is not None
+        member_sizes.append(member_size)
+        offset += member_size
+    assert offset == len(data)
+    assert len(member_sizes) > 1
+
+    decompressed = gzip.decompress(data)
+    assert len(decompressed) > 10 * 5_000 * 3 * 2
+    assert len(msgspec.msgpack.decode(decompressed)["messages"]) >= 20
+
+
+def test_recording_player(tmp_path: Path) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(port=8125, verbose=False)
+    frame = server.scene.add_frame("/frame")
+    path = tmp_path / "recording.viser"
+    with server.get_streaming_scene_serializer(
+        path, keyframe_interval_sec=0.5
+    ) as serializer:
+        for i in range(20):
+            frame.position = (float(i), 0.0, 0.0)
+            serializer.insert_sleep(0.1)
+    server.stop()
+
+    player = viser.load_recording(path)
+    assert player.duration_seconds is not None
+    assert np.isclose(player.duration_seconds, 2.0)
+
+    playback_server = viser.ViserServer(port=8126, verbose=False)
+    player.play(playback_server, rate=10.0)
+    assert player.wait(timeout=5.0)
+    assert np.isclose(player.time, 2.0)
+
+    async def wait_for_position(x: float) -> None:
+        async with viser.HeadlessClient(
+            f"ws://localhost:{playback_server.get_port()}"
+        ) as client:
+            await client.wait_until(
+                lambda: (
+                    "/frame" in client.scene_nodes
+                    and client.scene_nodes["/frame"].position == (x, 0.0, 0.0)
+                ),
+                timeout=5.0,
+            )
+
+    asyncio.run(wait_for_position(19.0))
+
+    # Seeking while paused replays the scene up to the seek time.
+    player.pause()
+    player.seek(1.05)
+    asyncio.run(wait_for_position(10.0))
+    assert player.time == 1.05
+
+    player.stop()
+    playback_server.stop()
+
+
+def test_analyze_recording(tmp_path: Path) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(port=8127, verbose=False)
+    points = np.random.default_rng(0).normal(size=(10_000, 3)).astype(np.float16)
+    cloud = server.scene.add_point_cloud("/points", points=points, colors=(0, 0, 0))
+    frame = server.scene.add_frame("/frame")
+
+    def record(
+        serializer: Union[viser.infra.StateSerializer, StreamingStateSerializer],
+    ) -> None:
+        for i in range(20):
+            # Alternate between two point clouds.
+            cloud.points = points if i % 2 == 0 else points * 2.0
+            frame.position = (float(i), 0.0, 0.0)
+            frame.position = (float(i), 1.0, 0.0)
+            serializer.insert_sleep(0.1)
+
+    with server.get_streaming_scene_serializer(tmp_path / "a.viser") as serializer:
+        record(serializer)
+    serializer = server.get_scene_serializer()
+    record(serializer)
+    (tmp_path / "b.viser").write_bytes(serializer.serialize(chunk_size_bytes=4096))
+    server.stop()
+
+    for name in ("a.viser", "b.viser"):
+        report = analyze_recording(tmp_path / name, output=tmp_path / "report.json")
+        assert json.loads((tmp_path / "report.json").read_text()) == report
+        assert np.isclose(report["duration_seconds"], 2.0)
+
+        by_node = {row["name"]: row for row in report["by_node"]}
+        assert report["by_node"][0]["name"] == "/points"
+        assert by_node["/frame"]["count"] >= 40
+        assert report["by_prop"][0]["name"] == "points"
+        assert report["largest_payloads"][0]["path"].endswith(".points")
+        assert len(report["timeline"]) == 2
+
+        # Point clouds are repeated, and one position per frame is superseded.
+        savings = report["savings"]
+        assert savings["dedup_saved_bytes"] > 8 * 10_000 * 3 * 2
+        assert savings["superseded_bytes"] > 0
+        assert savings["compacted_state_bytes"] < report["message_bytes"] / 5
+
+
+def test_flight_recording(tmp_path: Path) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    # Each frame update takes up 256 bytes in the ring buffer.
+    server = viser.ViserServer(port=8128, verbose=False, flight_recorder_bytes=256 * 10)
+    frame = server.scene.add_frame("/frame")
+    for i in range(100):
+        frame.position = (float(i), 0.0, 0.0)
+
+    path = tmp_path / "flight.viser"
+    server.dump_flight_recording(path)
+    server.stop()
+
+    with path.open("rb") as f:
+        assert read_index(f) is not None
+        f.seek(0)
+        messages = [
+            message
+            for _, chunk in iter_chunks(f)
+            if chunk["type"] == "messages"
+            for _, message in chunk["messages"]
+        ]
+
+    # Compacted state, followed by the last 10 messages.
+    assert "FrameMessage" in [message["type"] for message in messages]
+    positions = [
+        message["position"][0]
+        for message in messages
+        if message["type"] == "SetPositionMessage"
+    ]
+    assert positions == list(range(89, 100))
+
+
+def test_export_bundle(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+    monkeypatch.setattr(viser._client_autobuild, "build_dir", tmp_path / "build")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "index.html").write_text("<html></html>")
+
+    server = viser.ViserServer(port=8129, verbose=False)
+    points = np.random.default_rng(0).normal(size=(20_000, 3)).astype(np.float16)
+    cloud = server.scene.add_point_cloud("/points", points=points, colors=(0, 0, 0))
+
+    # Export two scenes with the same point clouds.
+    bundle_dir = tmp_path / "bundle"
+    for scene_name in ("a", "b"):
+        serializer = server.get_scene_serializer()
+        for i in range(4):
+            cloud.points = points if i % 2 == 0 else points * 2.0
+            serializer.insert_sleep(0.1)
+        serializer.export_bundle(bundle_dir, scene_name=scene_name)
+    server.stop()
+
+    # Payload files are named by content, and shared by both scenes.
+    assert (bundle_dir / "index.html").exists()
+    assert len(list((bundle_dir / "blobs").iterdir())) == 2
+    manifest = msgspec.msgpack.decode(
+        gzip.decompress((bundle_dir / "b.viser").read_bytes())
+    )
+    assert len(manifest["blobFiles"]) == 2
+    for _, name, size in manifest["blobFiles"]:
+        assert (bundle_dir / name).stat().st_size == size
+    assert (bundle_dir / "b.viser").stat().st_size < 20_000
+
+    # Bundles can be loaded from Python too.
+    player = viser.load_recording(bundle_dir / "b.viser")
+    clouds = [
+        np.frombuffer(message["updates"]["points"], dtype=np.float16)
+        for _, message in player._recording.iter_messages(0.0)
+        if message["type"] == "SceneNodeUpdateMessage"
+    ]
+    assert len(clouds) == 5
+    np.testing.assert_allclose(clouds[0], (points * 2.0).astype(np.float16).ravel())
@@ -0,0 +1,433 @@
+import time
+
+import imageio.v3 as iio
+import msgspec
+import numpy as np
+
+import viser
+import viser._client_autobuild
+import viser._messages
+from viser._scene_api import _encode_depth_binary
+from viser.infra._async_message_buffer import _payload_fields
+
+
+def test_depth_image_encoding() -> None:
+    """Check that fixed-point depth images decode to the original depths."""
+    depth = np.random.uniform(0.0, 10.0, size=(48, 64)).astype(np.float32)
+
+    decoded = iio.imread(_encode_depth_binary(depth), extension=".png")
+    assert decoded.shape == (48, 64, 3)
+    decoded = decoded.astype(np.float64)
+    depth_decoded = (
+        decoded[..., 0] + decoded[..., 1] * 2**8 + decoded[..., 2] * 2**16
+    ) / 100_000
+    np.testing.assert_allclose(depth_decoded, depth, atol=1e-5)
+
+
+def test_depth_image_point_cloud() -> None:
+    """Check that depth image point clouds can be added and updated."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    handle = server.scene.add_depth_image_point_cloud(
+        "/depth",
+        depth=np.ones((24, 32), dtype=np.float32),
+        rgb=np.zeros((48, 64, 3), dtype=np.uint8),
+        K=np.array([[50.0, 0.0, 32.0], [0.0, 50.0, 24.0], [0.0, 0.0, 1.0]]),
+    )
+    assert handle.K[0] == (50.0, 0.0, 32.0)
+
+    depth_data = handle._depth_data
+    handle.depth = np.full((24, 32), 2.0)
+    assert handle._depth_data != depth_data
+    server.stop()
+
+
+def test_batched_meshes() -> None:
+    """Check that per-instance arrays are canonicalized and can be reassigned."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    num_instances = 5
+    handle = server.scene.add_batched_meshes(
+        "/meshes",
+        vertices=np.random.uniform(size=(4, 3)),
+        faces=np.array([[0, 1, 2], [0, 2, 3]]),
+        batched_wxyzs=np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (num_instances, 1)),
+        batched_positions=np.zeros((num_instances, 3)),
+        batched_scales=np.arange(num_instances),
+    )
+    assert handle.batched_scales.shape == (num_instances, 3)
+    assert handle.batched_scales.dtype == np.float32
+    assert handle.batched_colors.shape == (num_instances, 3)
+    np.testing.assert_allclose(handle.batched_scales[:, 1], np.arange(num_instances))
+
+    # Change the number of instances.
+    with server.atomic():
+        handle.batched_wxyzs = np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (2, 1))
+        handle.batched_positions = np.ones((2, 3), dtype=np.float32)
+        handle.batched_scales = np.ones((2, 3))
+        handle.batched_colors = np.zeros((2, 3), dtype=np.uint8)
+    assert handle.batched_positions.shape == (2, 3)
+    assert handle.batched_positions.dtype == np.float32
+
+    # Scales are broadcast when assigned, like in `add_batched_meshes()`.
+    handle.batched_scales = 3.0
+    np.testing.assert_allclose(handle.batched_scales, np.full((2, 3), 3.0))
+    handle.batched_scales = np.array([1.0, 2.0])
+    np.testing.assert_allclose(handle.batched_scales[:, 2], [1.0, 2.0])
+    assert handle.batched_scales.dtype == np.float32
+    server.stop()
+
+
+def test_batched_camera_frustums() -> None:
+    """Check that frustum images are packed into a single atlas."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    num_frustums = 5
+    handle = server.scene.add_batched_camera_frustums(
+        "/frustums",
+        fovs=1.0,
+        aspects=np.full((num_frustums,), 4.0 / 3.0),
+        batched_wxyzs=np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (num_frustums, 1)),
+        batched_positions=np.zeros((num_frustums, 3)),
+        images=np.zeros((num_frustums, 30, 40, 3), dtype=np.uint8),
+        thumbnail_size=(12, 16),
+        format="png",
+    )
+    assert handle.atlas_grid == (3, 2)
+    assert handle._atlas_data is not None
+    atlas = iio.imread(handle._atlas_data, extension=".png")
+    assert atlas.shape == (2 * 12, 3 * 16, 3)
+    assert handle.batched_fovs.shape == (num_frustums,)
+
+    # Highlight and hide individual frustums.
+    colors = handle.batched_colors.copy()
+    colors[2] = (255, 0, 0)
+    handle.batched_colors = colors
+    visible = handle.batched_visible.copy()
+    visible[0] = False
+    handle.batched_visible = visible
+    assert handle.batched_visible.dtype == np.bool_
+    assert not handle.batched_visible[0]
+
+    handle.images = None
+    assert handle._atlas_data is None
+    assert handle.atlas_media_type is None
+    assert handle.atlas_grid == (0, 0)
+    server.stop()
+
+
+def test_props_shared_with_buffered_message() -> None:
+    """Check that handles don't copy prop arrays, and copy on write instead."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    points = np.random.uniform(size=(100, 3)).astype(np.float16)
+    handle = server.scene.add_point_cloud(
+        "/points", points=points, colors=(255, 0, 0), transfer_ownership=True
+    )
+    buffer = server._websock_server.get_message_buffer()
+    message = next(
+        message
+        for message in buffer.message_from_id.values()
+        if isinstance(message, viser._messages.PointCloudMessage)
+    )
+    assert np.shares_memory(handle.points, points)
+    assert np.shares_memory(handle.points, message.props.points)
+    assert not handle.points.flags.writeable
+
+    handle.points = np.zeros((100, 3), dtype=np.float16)
+    assert not np.shares_memory(handle.points, points)
+    np.testing.assert_array_equal(message.props.points, points)
+    server.stop()
+
+
+def test_buffer_spill() -> None:
+    """Check that large payloads are spilled to disk once over the memory limit."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer(buffer_memory_limit=0)
+    buffer = server._websock_server.get_message_buffer()
+    points = np.random.uniform(size=(200_000, 3)).astype(np.float16)
+    handle = server.scene.add_point_cloud("/points", points=points, colors=(0, 0, 0))
+    assert isinstance(handle.points, np.memmap)
+    np.testing.assert_array_equal(handle.points, points)
+    assert buffer.spilled_bytes == points.nbytes
+
+    # Assigned arrays are spilled too, and replace the old ones.
+    handle.points = points * 2.0
+    assert isinstance(handle.points, np.memmap)
+    assert buffer.spilled_bytes == 2 * points.nbytes
+
+    message = next(
+        message
+        for message in buffer.message_from_id.values()
+        if isinstance(message, viser._messages.PointCloudMessage)
+    )
+    assert len(msgspec.msgpack.encode(message.as_serializable_dict())) > points.nbytes
+
+    handle.remove()
+    server._run_garbage_collector(force=True)
+    assert buffer.spilled_bytes == 0
+    server.stop()
+
+
+def test_payload_fields() -> None:
+    """Check which message fields are searched for payloads."""
+    assert _payload_fields(viser._messages.SetPositionMessage) == ()
+    assert _payload_fields(viser._messages.PointCloudMessage) == ("props",)
+    assert _payload_fields(viser._messages.BackgroundImageMessage) == (
+        "rgb_data",
+        "depth_data",
+    )
+
+
+def test_memory_report() -> None:
+    """Check that buffered bytes are attributed to scene nodes and message types."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    points = np.random.uniform(size=(1000, 3)).astype(np.float16)
+    handle = server.scene.add_point_cloud("/points", points=points, colors=(0, 0, 0))
+    report = server.scene.get_memory_report()
+    assert report.bytes_from_scene_node["/points"] == 1000 * 3 * (2 + 1)
+    assert report.bytes_from_message_type["PointCloudMessage"] == 1000 * 3 * (2 + 1)
+    assert report.total_bytes >= 1000 * 3 * (2 + 1)
+    assert report.bytes_sent_from_client == {}
+
+    # Updates replace each other, and are removed with the node.
+    handle.points = points * 2.0
+    handle.points = points * 3.0
+    report = server.scene.get_memory_report()
+    assert report.bytes_from_scene_node["/points"] == 1000 * 3 * (2 + 2 + 1)
+
+    # Messages without payloads aren't tracked.
+    buffer = server._websock_server.get_message_buffer()
+    handle.position = (1.0, 2.0, 3.0)
+    assert buffer.message_counter - 1 not in buffer.nbytes_from_id
+    assert server.scene.get_memory_report() == report
+
+    handle.remove()
+    server._run_garbage_collector(force=True)
+    assert "/points" not in server.scene.get_memory_report().bytes_from_scene_node
+    server.stop()
+
+
+def test_set_poses() -> None:
+    """Check that poses are packed into a single message, which replaces
+    previous ones for the same nodes."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    frames = [server.scene.add_frame(f"/frame_{i}") for i in range(4)]
+    positions = np.zeros((4, 3))
+    positions[1] = (1.0, 2.0, 3.0)
+
+    buffer = server._websock_server.get_message_buffer()
+    num_messages = len(buffer.message_from_id)
+    server.scene.set_poses(
+        ["/frame_0", *frames[1:]],
+        wxyzs=np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (4, 1)),
+        positions=positions,
+    )
+    assert len(buffer.message_from_id) == num_messages + 1
+    message = list(buffer.message_from_id.values())[-1]
+    assert isinstance(message, viser._messages.SetPosesMessage)
+    assert message.names == tuple(f"/frame_{i}" for i in range(4))
+    np.testing.assert_allclose(frames[1].position, (1.0, 2.0, 3.0))
+
+    # Changing a different subset of nodes replaces the buffered message.
+    for i in (2, 3, 0):
+        positions[i] += 1.0
+        server.scene.set_poses(
+            frames, np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (4, 1)), positions
+        )
+    assert len(buffer.message_from_id) == num_messages + 1
+    server.stop()
+
+
+def test_set_bone_poses() -> None:
+    """Check that bone poses are sent as one message, even inside atomic()."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    num_bones = 4
+    handle = server.scene.add_mesh_skinned(
+        "/skinned",
+        vertices=np.random.uniform(size=(4, 3)),
+        faces=np.array([[0, 1, 2], [0, 2, 3]]),
+        bone_wxyzs=np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (num_bones, 1)),
+        bone_positions=np.zeros((num_bones, 3)),
+        skin_weights=np.random.uniform(size=(4, num_bones)),
+    )
+
+    buffer = server._websock_server.get_message_buffer()
+    num_messages = len(buffer.message_from_id)
+    with server.atomic():
+        handle.set_bone_poses(
+            np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (num_bones, 1)),
+            np.ones((num_bones, 3)),
+        )
+    assert len(buffer.message_from_id) == num_messages + 1
+    message = list(buffer.message_from_id.values())[-1]
+    assert isinstance(message, viser._messages.SetBonePosesMessage)
+    assert message.poses.shape == (num_bones, 7)
+    np.testing.assert_allclose(handle.bones[3].position, (1.0, 1.0, 1.0))
+    server.stop()
+
+
+def test_mesh_update_vertices() -> None:
+    """Check that delta-encoded vertex updates track the true positions."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    vertices = np.random.uniform(size=(100, 3)).astype(np.float32)
+    handle = server.scene.add_mesh_simple(
+        "/mesh", vertices=vertices, faces=np.array([[0, 1, 2]])
+    )
+
+    buffer = server._websock_server.get_message_buffer()
+    for i in range(40):
+        vertices = vertices + np.random.normal(scale=0.01, size=vertices.shape)
+        handle.update_vertices(vertices, encoding="delta")
+        np.testing.assert_allclose(handle.vertices, vertices, atol=1e-4)
+
+    # Deltas before the most recent keyframe should no longer be buffered.
+    messages = [
+        message
+        for message in buffer.message_from_id.values()
+        if isinstance(message, viser._messages.MeshVerticesMessage)
+    ]
+    assert [message.delta_index for message in messages] == list(range(11))
+    assert messages[0].encoding == "float32"
+    assert messages[1].encoding == "delta_int16"
+    assert len(messages[1].data) == vertices.size * 2
+    server.stop()
+
+
+def test_skinned_mesh_animation() -> None:
+    """Check that animation clips are uploaded once and controlled by time."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    num_bones = 4
+    num_frames = 10
+    handle = server.scene.add_mesh_skinned(
+        "/skinned",
+        vertices=np.random.uniform(size=(4, 3)),
+        faces=np.array([[0, 1, 2], [0, 2, 3]]),
+        bone_wxyzs=np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (num_bones, 1)),
+        bone_positions=np.zeros((num_bones, 3)),
+        skin_weights=np.random.uniform(size=(4, num_bones)),
+    )
+    handle.set_animation(
+        timestamps=np.arange(num_frames) / 10.0,
+        bone_wxyzs=np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (num_frames, num_bones, 1)),
+        bone_positions=np.zeros((num_frames, num_bones, 3)),
+        play=False,
+    )
+    assert handle.animation_time == 0.0
+    handle.seek(0.5)
+    assert handle.animation_time == 0.5
+    handle.seek(5.0)
+    assert handle.animation_time == np.float32(0.9)
+
+    # Only the clip and latest playback state are kept for new clients.
+    handle.play(rate=2.0)
+    messages = [
+        message
+        for message in server._websock_server.get_message_buffer().message_from_id.values()
+        if isinstance(
+            message,
+            (
+                viser._messages.SkinnedMeshAnimationMessage,
+                viser._messages.SkinnedMeshAnimationPlaybackMessage,
+            ),
+        )
+    ]
+    assert len(messages) == 2
+
+    # Clients that connect mid-playback get the current clip time, without
+    # anything being resent to connected clients.
+    buffer = server._websock_server.get_message_buffer()
+    handle.seek(0.0)
+    message_counter = buffer.message_counter
+    time.sleep(0.05)
+    server.scene._sync_playback_clocks()
+    assert buffer.message_counter == message_counter
+    message = buffer.message_from_id[message_counter - 1]
+    assert isinstance(message, viser._messages.SkinnedMeshAnimationPlaybackMessage)
+    assert message.playing and message.time >= 0.1
+
+    handle.clear_animation()
+    assert handle.animation_time is None
+    server.stop()
+
+
+def test_timeline() -> None:
+    """Check that timeline frames are buffered for new clients until removal."""
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    timeline = server.scene.add_timeline(playing=False, loop=False)
+    for i in range(3):
+        frame = server.scene.add_frame(f"/frames/t{i}")
+        assert timeline.add_frame(i / 10.0, [frame]) == i
+    timeline.seek(0.1)
+    timeline.play(rate=2.0)
+
+    buffer = server._websock_server.get_message_buffer()
+
+    def count_timeline_messages() -> int:
+        return sum(
+            isinstance(
+                message,
+                (
+                    viser._messages.TimelineMessage,
+                    viser._messages.TimelineFrameMessage,
+                ),
+            )
+            for message in buffer.message_from_id.values()
+        )
+
+    # Three frames + the latest configuration.
+    assert count_timeline_messages() == 4
+
+    # Config changes keep the current playback time, instead of rewinding to
+    # the last seek.
+    time.sleep(0.05)
+    timeline.on_time_change(lambda _: None)
+    timeline.pause()
+    message = list(buffer.message_from_id.values())[-1]
+    assert isinstance(message, viser._messages.TimelineMessage)
+    assert not message.playing and 0.15 < message.time <= 0.3
+
+    # Playing timelines are updated in the buffer for connecting clients.
+    timeline.seek(0.0)
+    timeline.play()
+    message_counter = buffer.message_counter
+    time.sleep(0.05)
+    server.scene._sync_playback_clocks()
+    assert buffer.message_counter == message_counter
+    message = buffer.message_from_id[message_counter - 1]
+    assert isinstance(message, viser._messages.TimelineMessage)
+    assert message.playing and message.time >= 0.05
+
+    # Replacing the timeline removes the old frames.
+    server.scene.add_timeline()
+    assert timeline._impl.removed
+    assert count_timeline_messages() == 1
+    server.stop()
@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+import viser
+import viser._client_autobuild
+import viser._messages
+from viser.infra import MessageTracer
+
+
+def test_message_trace(tmp_path: Path) -> None:
+    # Mock the client autobuild to avoid building the client.
+    viser._client_autobuild.ensure_client_is_built = lambda: None
+
+    server = viser.ViserServer()
+    tracer = server.start_message_trace()
+    server.scene.add_frame("/frame")
+    server.stop_message_trace()
+    server.scene.add_frame("/untraced")
+
+    # Simulate sending the buffered message to a client.
+    buffer = server._websock_server.get_message_buffer()
+    (message,) = [
+        m
+        for m in buffer.message_from_id.values()
+        if isinstance(m, viser._messages.FrameMessage) and m.name == "/frame"
+    ]
+    tracer.record_window(3, [message], window_us=1e12, encoded_us=2e12, sent_us=3e12)
+
+    tracer.save(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    pushed = [e["args"]["type"] for e in events if e["name"] == "queue_message"]
+    assert "FrameMessage" in pushed
+    spans = [e for e in events if e.get("cat") == "message"]
+    assert [(e["name"], e["ph"]) for e in spans][:2] == [
+        ("FrameMessage", "b"),
+        ("buffered", "b"),
+    ]
+    assert spans[-1]["ts"] == 3e12
+    assert {"name": "client 3"} in [e["args"] for e in events if e["ph"] == "M"]
+    server.stop()
+
+
+def test_message_trace_sampling() -> None:
+    tracer = MessageTracer(sample_rate=0.0)
+    message = viser._messages.RemoveSceneNodeMessage("/a")
+    tracer.record_push(message, 0.0, 0.0, 1.0)
+    tracer.record_window(0, [message], 1.0, 2.0, 3.0)
+    assert tracer.get_trace()["traceEvents"] == []